@@ -0,0 +1,200 @@
+"""Compare word error rate and speed across model precisions on a reference set.
+
+    python -m paratran.benchmark REFERENCE_DIR --precision bf16 int8 int4
+
+The reference set is a directory of audio files, each next to a ``.txt``
+transcript with the same stem. Every precision transcribes every file; the
+report gives its WER against the references, its inference speed as a multiple
+of real time, and how long the model took to load.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from paratran.contracts import (
+    ALLOWED_EXTENSIONS,
+    DECODING_METHODS,
+    DEFAULT_DECODING,
+    DEFAULT_MODEL,
+    PRECISIONS,
+    TranscriptionOptions,
+    TranscriptionResult,
+)
+
+_WORD_PATTERN = re.compile(r"[\w']+")
+
+
+@dataclass(frozen=True, slots=True)
+class BenchmarkRow:
+    precision: str
+    files: int
+    word_errors: int
+    reference_words: int
+    audio_seconds: float
+    processing_seconds: float
+    load_seconds: float
+
+    @property
+    def wer(self) -> float:
+        return self.word_errors / self.reference_words if self.reference_words else 0.0
+
+    @property
+    def realtime_factor(self) -> float:
+        return self.audio_seconds / self.processing_seconds if self.processing_seconds else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "precision": self.precision,
+            "files": self.files,
+            "wer": round(self.wer, 4),
+            "audio_seconds": round(self.audio_seconds, 3),
+            "processing_seconds": round(self.processing_seconds, 3),
+            "realtime_factor": round(self.realtime_factor, 1),
+            "load_seconds": round(self.load_seconds, 3),
+        }
+
+
+def normalize_words(text: str) -> list[str]:
+    """Lower-case words without punctuation, so WER counts only word changes."""
+
+    return _WORD_PATTERN.findall(text.lower())
+
+
+def word_errors(reference: str, hypothesis: str) -> tuple[int, int]:
+    """Word-level edit distance and the number of reference words."""
+
+    expected = normalize_words(reference)
+    actual = normalize_words(hypothesis)
+    previous = list(range(len(actual) + 1))
+    for row, word in enumerate(expected, start=1):
+        current = [row]
+        for column, candidate in enumerate(actual, start=1):
+            current.append(
+                min(
+                    previous[column] + 1,
+                    current[column - 1] + 1,
+                    previous[column - 1] + (word != candidate),
+                )
+            )
+        previous = current
+    return previous[-1], len(expected)
+
+
+def reference_set(directory: Path) -> list[tuple[Path, str]]:
+    """Audio files in ``directory`` that have a reference transcript."""
+
+    return [
+        (path, path.with_suffix(".txt").read_text())
+        for path in sorted(directory.iterdir())
+        if path.suffix.lower() in ALLOWED_EXTENSIONS and path.with_suffix(".txt").is_file()
+    ]
+
+
+def run_benchmark(
+    samples: Sequence[tuple[Path, str]],
+    precisions: Sequence[str],
+    options: TranscriptionOptions,
+    *,
+    transcribe: Callable[[str, TranscriptionOptions], TranscriptionResult] | None = None,
+    load: Callable[[str], object] | None = None,
+) -> list[BenchmarkRow]:
+    if transcribe is None or load is None:
+        from paratran.transcribe import get_model, transcribe_file
+
+        transcribe = transcribe or (lambda path, opts: transcribe_file(path, options=opts))
+        load = load or (lambda precision: get_model(precision=precision))
+
+    rows = []
+    for precision in precisions:
+        started = time.perf_counter()
+        load(precision)
+        load_seconds = time.perf_counter() - started
+        variant = TranscriptionOptions(**{**options.to_dict(), "precision": precision})
+        errors = words = 0
+        audio_seconds = processing_seconds = 0.0
+        for path, reference in samples:
+            result = transcribe(str(path), variant)
+            file_errors, file_words = word_errors(reference, result.text)
+            errors += file_errors
+            words += file_words
+            audio_seconds += result.duration
+            processing_seconds += result.processing_time
+        rows.append(
+            BenchmarkRow(
+                precision=precision,
+                files=len(samples),
+                word_errors=errors,
+                reference_words=words,
+                audio_seconds=audio_seconds,
+                processing_seconds=processing_seconds,
+                load_seconds=load_seconds,
+            )
+        )
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m paratran.benchmark",
+        description="Compare WER and speed of model precisions on a reference set.",
+    )
+    parser.add_argument(
+        "references", type=Path, help="Directory of audio files with .txt transcripts"
+    )
+    parser.add_argument(
+        "--precision",
+        nargs="+",
+        choices=PRECISIONS,
+        default=list(PRECISIONS),
+        help="Precisions to compare (default: all)",
+    )
+    parser.add_argument(
+        "--model",
+        default=os.environ.get("PARATRAN_MODEL", DEFAULT_MODEL),
+        help=f"HF model ID or local path (default: {DEFAULT_MODEL})",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=os.environ.get("PARATRAN_MODEL_DIR"),
+        help="Directory for HuggingFace model cache",
+    )
+    parser.add_argument(
+        "--decoding",
+        default=DEFAULT_DECODING,
+        choices=DECODING_METHODS,
+        help=f"Decoding method (default: {DEFAULT_DECODING})",
+    )
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    samples = reference_set(args.references) if args.references.is_dir() else []
+    if not samples:
+        parser.error(f"no audio files with .txt references in {args.references}")
+    os.environ["PARATRAN_MODEL"] = args.model
+    if args.cache_dir:
+        os.environ["PARATRAN_MODEL_DIR"] = args.cache_dir
+
+    rows = run_benchmark(samples, args.precision, TranscriptionOptions(decoding=args.decoding))
+    if args.json:
+        print(json.dumps([row.to_dict() for row in rows], indent=2))
+        return 0
+    print(f"{'precision':<10} {'WER':>7} {'xRT':>7} {'load s':>7}  ({len(samples)} files)")
+    for row in rows:
+        print(
+            f"{row.precision:<10} {row.wer:>7.2%} {row.realtime_factor:>7.1f} "
+            f"{row.load_seconds:>7.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,34 +3,47 @@
 from __future__ import annotations
 
 import argparse
-import http.client
-import io
-import json
-import mimetypes
 import os
+import shutil
 import sys
-import uuid
 from pathlib import Path
-from typing import Any
-from urllib.error import HTTPError, URLError
-from urllib.parse import urlsplit, urlunsplit
+from typing import TYPE_CHECKING, Any
 
 from paratran.contracts import (
+    DECODING_METHODS,
     DEFAULT_BEAM_SIZE,
     DEFAULT_CHUNK_DURATION,
+    DEFAULT_CONFIDENCE_THRESHOLD,
+    DEFAULT_DAEMON_IDLE_TIMEOUT,
     DEFAULT_DECODING,
     DEFAULT_DURATION_REWARD,
     DEFAULT_HTTP_TIMEOUT,
     DEFAULT_LENGTH_PENALTY,
     DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_QUEUE,
+    DEFAULT_MAX_QUEUED_AUDIO_SECONDS,
     DEFAULT_MAX_UPLOAD_MB,
     DEFAULT_MODEL,
     DEFAULT_OVERLAP_DURATION,
     DEFAULT_PATIENCE,
+    DEFAULT_PRECISION,
+    DEFAULT_UPLOAD_CHUNK_MB,
     OUTPUT_FORMATS,
+    PRECISIONS,
+    PRIORITIES,
+    TRANSCODE_FORMATS,
     TranscriptionOptions,
+    TranscriptionProgress,
 )
-from paratran.serializers import from_openai_verbose_json, write_outputs
+
+# Each mode imports what it needs when it runs: HTTP client code for --server,
+# the model or daemon client for local runs, and uvicorn for serve/route. Keep
+# module-level imports cheap so `paratran --help` and daemon runs start fast.
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from concurrent.futures import Future
+
+    from paratran.client import BackendPool
 
 
 def _add_transcription_arguments(parser: argparse.ArgumentParser) -> None:
@@ -58,8 +71,9 @@ def _add_transcription_arguments(parser: argparse.ArgumentParser) -> None:
     parser.add_argument(
         "--decoding",
         default=DEFAULT_DECODING,
-        choices=["greedy", "beam"],
-        help=f"Decoding method (default: {DEFAULT_DECODING})",
+        choices=DECODING_METHODS,
+        help=f"Decoding method; hybrid re-decodes low-confidence words with beam search "
+        f"(default: {DEFAULT_DECODING})",
     )
     parser.add_argument(
         "--chunk-duration",
@@ -97,6 +111,24 @@ def _add_transcription_arguments(parser: argparse.ArgumentParser) -> None:
         default=DEFAULT_DURATION_REWARD,
         help=f"Duration reward (default: {DEFAULT_DURATION_REWARD})",
     )
+    parser.add_argument(
+        "--confidence-threshold",
+        type=float,
+        default=DEFAULT_CONFIDENCE_THRESHOLD,
+        help="Token confidence below which hybrid decoding re-decodes a word "
+        f"(default: {DEFAULT_CONFIDENCE_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--diarize",
+        action="store_true",
+        help="Label sentences with speakers (SPEAKER_00, SPEAKER_01, ...)",
+    )
+    parser.add_argument(
+        "--num-speakers",
+        type=int,
+        default=None,
+        help="Number of speakers to diarize into (default: estimated)",
+    )
     parser.add_argument("--max-words", type=int, default=None, help="Max words per sentence")
     parser.add_argument(
         "--silence-gap",
@@ -115,6 +147,12 @@ def _add_transcription_arguments(parser: argparse.ArgumentParser) -> None:
         action="store_true",
         help="Use FP32 precision instead of BF16",
     )
+    parser.add_argument(
+        "--precision",
+        choices=PRECISIONS,
+        default=DEFAULT_PRECISION,
+        help=f"Model weight precision; int8/int4 are quantized (default: {DEFAULT_PRECISION})",
+    )
 
 
 def _options_from_args(
@@ -134,6 +172,10 @@ def _options_from_args(
             chunk_duration=args.chunk_duration if args.chunk_duration > 0 else None,
             overlap_duration=args.overlap_duration,
             fp32=args.fp32,
+            precision=args.precision,
+            confidence_threshold=args.confidence_threshold,
+            diarize=args.diarize or args.num_speakers is not None,
+            num_speakers=args.num_speakers,
         )
     except ValueError as exc:
         parser.error(str(exc))
@@ -143,12 +185,24 @@ def _options_from_args(
 def main() -> int:
     if len(sys.argv) > 1 and sys.argv[1] == "serve":
         return _serve(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "route":
+        return _route(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "models":
+        return _models(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "index":
+        return _index(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "search":
+        return _search(sys.argv[2:])
 
     parser = argparse.ArgumentParser(
         description="Transcribe audio files using Parakeet MLX models.",
         usage=(
             "paratran [OPTIONS] AUDIOS...\n"
-            "       paratran serve [--host HOST] [--port PORT] [--model MODEL] [--cache-dir DIR]"
+            "       paratran serve [--host HOST] [--port PORT] [--model MODEL] [--cache-dir DIR]\n"
+            "       paratran route --backend URL [--backend URL ...] [--host HOST] [--port PORT]\n"
+            "       paratran models {fetch,verify,list,snapshot} ...\n"
+            "       paratran index [PATHS...] [--index DB]\n"
+            "       paratran search PHRASE [--index DB] [--limit N] [--json]"
         ),
     )
     parser.add_argument(
@@ -160,8 +214,12 @@ def main() -> int:
     parser.add_argument(
         "-s",
         "--server",
-        default=os.environ.get("PARATRAN_SERVER"),
-        help="URL of a running paratran server (e.g. http://localhost:8000)",
+        action="append",
+        default=None,
+        help=(
+            "URL of a running paratran server (e.g. http://localhost:8000); repeat to "
+            "balance files across several servers"
+        ),
     )
     parser.add_argument(
         "--api-key",
@@ -174,6 +232,62 @@ def main() -> int:
         default=DEFAULT_HTTP_TIMEOUT,
         help=f"Server request timeout in seconds (default: {DEFAULT_HTTP_TIMEOUT:g})",
     )
+    parser.add_argument(
+        "--transcode",
+        choices=TRANSCODE_FORMATS,
+        default=os.environ.get("PARATRAN_TRANSCODE", "none"),
+        help="Transcode to 16 kHz mono before uploading in client mode (default: none)",
+    )
+    parser.add_argument(
+        "--priority",
+        choices=PRIORITIES,
+        default="normal",
+        help="Scheduling class requested from the server (default: normal)",
+    )
+    parser.add_argument(
+        "--upload-chunk-mb",
+        type=int,
+        default=DEFAULT_UPLOAD_CHUNK_MB,
+        help=(
+            "Send files larger than this as resumable chunks in client mode, 0 to disable "
+            f"(default: {DEFAULT_UPLOAD_CHUNK_MB})"
+        ),
+    )
+    parser.add_argument(
+        "--no-daemon",
+        dest="daemon",
+        action="store_false",
+        default=os.environ.get("PARATRAN_DAEMON", "1") != "0",
+        help="Load the model in this process instead of using the background model daemon",
+    )
+    parser.add_argument(
+        "--daemon-idle-timeout",
+        type=float,
+        default=float(os.environ.get("PARATRAN_DAEMON_IDLE_TIMEOUT", DEFAULT_DAEMON_IDLE_TIMEOUT)),
+        help=(
+            "Seconds the model daemon stays up without requests "
+            f"(default: {DEFAULT_DAEMON_IDLE_TIMEOUT:g})"
+        ),
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Re-transcribe only audio that changed since the last JSON output",
+    )
+    parser.add_argument(
+        "--index",
+        type=Path,
+        default=None,
+        help="Add JSON outputs to this search index as they are written",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=(
+            "Write a CPU and memory profile of the run to PARATRAN_PROFILE_DIR or the output "
+            "directory; with --server, ask the server to profile each request"
+        ),
+    )
     parser.add_argument("-v", "--verbose", action="store_true", help="Print detailed progress")
     _add_transcription_arguments(parser)
     args = parser.parse_args()
@@ -181,8 +295,19 @@ def main() -> int:
     if not args.audios:
         parser.print_help()
         return 1
+    if args.server is None:
+        configured = os.environ.get("PARATRAN_SERVER", "")
+        args.server = [url.strip() for url in configured.split(",") if url.strip()]
     if args.timeout <= 0:
         parser.error("timeout must be greater than 0")
+    if args.daemon_idle_timeout <= 0:
+        parser.error("daemon-idle-timeout must be greater than 0")
+    if args.upload_chunk_mb < 0:
+        parser.error("upload-chunk-mb must be 0 or greater")
+    if args.transcode not in TRANSCODE_FORMATS:
+        parser.error(f"transcode must be one of: {', '.join(TRANSCODE_FORMATS)}")
+    if args.server and args.transcode != "none" and shutil.which("ffmpeg") is None:
+        parser.error("--transcode requires ffmpeg on PATH")
 
     options = _options_from_args(args, parser)
     output_dir = Path(args.output_dir)
@@ -192,6 +317,12 @@ def main() -> int:
         parser.error(f"Could not create output directory '{output_dir}': {exc}")
 
     formats = ["txt", "srt", "vtt", "json"] if args.output_format == "all" else [args.output_format]
+    if args.index is not None and "json" not in formats:
+        parser.error("--index needs --output-format json or all")
+    if args.incremental and "json" not in formats:
+        parser.error("--incremental needs --output-format json or all")
+    if args.incremental and args.server:
+        parser.error("--incremental transcribes locally and cannot be used with --server")
     if args.server:
         if args.model != DEFAULT_MODEL or args.cache_dir:
             print(
@@ -200,9 +331,31 @@ def main() -> int:
                 file=sys.stderr,
             )
         return _transcribe_via_server(args, options, output_dir, formats)
+    if args.profile:
+        return _transcribe_local_profiled(args, options, output_dir, formats)
     return _transcribe_local(args, options, output_dir, formats)
 
 
+def _transcribe_local_profiled(
+    args: argparse.Namespace,
+    options: TranscriptionOptions,
+    output_dir: Path,
+    formats: list[str],
+) -> int:
+    from paratran.profiling import PROFILE_DIR_ENV, Profiler
+
+    # The daemon would do the work in another process, out of the profile's sight.
+    args.daemon = False
+    directory = Path(os.environ.get(PROFILE_DIR_ENV) or output_dir)
+    capture = Profiler(directory, min_interval=0).start(
+        "paratran " + " ".join(args.audios), requested=True
+    )
+    try:
+        return _transcribe_local(args, options, output_dir, formats)
+    finally:
+        print(f"Profile: {capture.stop()}", file=sys.stderr)
+
+
 def _transcribe_local(
     args: argparse.Namespace,
     options: TranscriptionOptions,
@@ -213,176 +366,286 @@ def _transcribe_local(
     if args.cache_dir:
         os.environ["PARATRAN_MODEL_DIR"] = args.cache_dir
 
-    from paratran.transcribe import transcribe_file
-
+    submit = _local_transcriber(args)
+    show_progress = args.verbose and sys.stderr.isatty()
     failures = 0
+    pending = []
     for audio_path in args.audios:
         path = Path(audio_path)
         if not path.is_file():
             print(f"Error: Audio file not found: {audio_path}", file=sys.stderr)
             failures += 1
             continue
+        progress = _progress_bar() if show_progress else None
+        previous = None
+        if args.incremental:
+            from paratran.incremental import load_revision
 
+            previous = load_revision(output_dir, path.stem, args.model, options)
+        future = submit(str(path.resolve()), options, progress, previous)
+        pending.append((audio_path, path, future))
+
+    # Later files decode and infer while earlier results are written here.
+    for audio_path, path, future in pending:
         if args.verbose:
             print(f"Transcribing: {path.name}", file=sys.stderr)
 
         try:
-            result = transcribe_file(str(path), options=options)
+            outcome = future.result()
+            result = outcome.result if args.incremental else outcome
             if args.verbose:
                 print(
                     f"  Duration: {result.duration:.2f}s, "
                     f"Processing: {result.processing_time:.3f}s",
                     file=sys.stderr,
                 )
-            _write_output(result, path.stem, output_dir, formats, args.verbose)
+            _write_output(result, path.stem, output_dir, formats, args.verbose, args.index)
+            if args.incremental:
+                from paratran.incremental import save_revision
+
+                save_revision(output_dir, path.stem, args.model, options, outcome)
         except (OSError, RuntimeError, ValueError) as exc:
             print(f"Error: Could not transcribe {audio_path}: {exc}", file=sys.stderr)
             failures += 1
     return 1 if failures else 0
 
 
+def _local_transcriber(
+    args: argparse.Namespace,
+) -> Callable[[str, TranscriptionOptions, Callable | None, Any], Future]:
+    """Send files to the warm model daemon, or load the model here with --no-daemon.
+
+    Either way the returned function queues a file and returns a future, so
+    the next file is decoded while the current one runs through the model.
+    With --incremental the future holds a ``Revision`` of the previous one.
+    """
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    from paratran.pipeline import DEFAULT_QUEUE_SIZE, TranscriptionPipeline
+
+    if args.daemon:
+        from paratran.daemon import connect
+
+        try:
+            pool = connect(args.model, args.cache_dir, idle_timeout=args.daemon_idle_timeout)
+        except (OSError, RuntimeError) as exc:
+            print(
+                f"Warning: model daemon unavailable ({exc}); loading the model in-process.",
+                file=sys.stderr,
+            )
+        else:
+            # The daemon pipelines concurrent requests, so keep one file
+            # decoding there while another is inferred.
+            executor = ThreadPoolExecutor(max_workers=DEFAULT_QUEUE_SIZE)
+            if args.incremental:
+                return lambda path, options, progress, previous: executor.submit(
+                    pool.revise, path, options, previous, progress=progress
+                )
+            return lambda path, options, progress, _previous: executor.submit(
+                pool.transcribe, path, options, progress=progress
+            )
+
+    if args.incremental:
+        from paratran.transcribe import revise_file
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        return lambda path, options, progress, previous: executor.submit(
+            revise_file, path, previous, options, progress=progress
+        )
+    pipeline = TranscriptionPipeline()
+    return lambda path, options, progress, _previous: pipeline.submit(
+        path, options, progress=progress
+    )
+
+
+def _progress_bar(width: int = 30) -> Callable[[TranscriptionProgress], None]:
+    def show(update: TranscriptionProgress) -> None:
+        filled = round(update.fraction * width)
+        eta = update.eta_seconds
+        print(
+            f"\r  [{'#' * filled}{'.' * (width - filled)}] {update.fraction:4.0%} "
+            f"chunk {update.chunks_done}/{update.chunks_total}"
+            + ("" if eta is None else f", ETA {eta:.0f}s")
+            + " " * 4,
+            end="\n" if update.chunks_done >= update.chunks_total else "",
+            file=sys.stderr,
+            flush=True,
+        )
+
+    return show
+
+
 def _transcribe_via_server(
     args: argparse.Namespace,
     options: TranscriptionOptions,
     output_dir: Path,
     formats: list[str],
 ) -> int:
-    server_url = args.server.rstrip("/")
-    url = f"{server_url}/v1/audio/transcriptions"
+    from concurrent.futures import ThreadPoolExecutor
+    from urllib.error import HTTPError, URLError
+
+    from paratran.client import BackendPool
+
+    pool = BackendPool(args.server)
     fields: dict[str, str] = {
         "response_format": "verbose_json",
         **{key: str(value) for key, value in options.to_dict().items() if value is not None},
     }
     if options.chunk_duration is None:
         fields["chunk_duration"] = "0"
+    if args.priority != "normal":
+        fields["priority"] = args.priority
     headers = {"Authorization": f"Bearer {args.api_key}"} if args.api_key else {}
+    if args.profile:
+        headers["X-Paratran-Profile"] = "1"
+    servers = ", ".join(backend.url for backend in pool.backends)
 
-    failures = 0
-    for audio_path in args.audios:
+    def transcribe_one(audio_path: str) -> bool:
         path = Path(audio_path)
         if not path.is_file():
             print(f"Error: Audio file not found: {audio_path}", file=sys.stderr)
-            failures += 1
-            continue
-
-        if args.verbose:
-            print(f"Uploading to server: {path.name}", file=sys.stderr)
+            return False
 
         try:
-            response = _upload_file(
-                url,
-                path,
-                fields,
-                headers=headers,
-                timeout=args.timeout,
-            )
+            response = _request_with_failover(pool, path, fields, headers, args)
             result = _openai_to_internal(response)
             if args.verbose:
                 print(
-                    f"  Duration: {result.duration:.2f}s, "
+                    f"  {path.name}: Duration: {result.duration:.2f}s, "
                     f"Processing: {result.processing_time:.3f}s",
                     file=sys.stderr,
                 )
-            _write_output(result, path.stem, output_dir, formats, args.verbose)
+            _write_output(result, path.stem, output_dir, formats, args.verbose, args.index)
+            return True
         except HTTPError as exc:
             body = exc.read().decode(errors="replace") if exc.fp else ""
             print(f"Error: Server returned {exc.code}: {body}", file=sys.stderr)
-            failures += 1
-        except (URLError, OSError, ValueError, json.JSONDecodeError) as exc:
-            print(f"Error: Could not transcribe via {server_url}: {exc}", file=sys.stderr)
-            failures += 1
-    return 1 if failures else 0
-
+        except (URLError, OSError, ValueError) as exc:
+            print(f"Error: Could not transcribe via {servers}: {exc}", file=sys.stderr)
+        return False
 
-def _multipart_field(boundary: str, name: str, value: str) -> bytes:
-    return (
-        f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'
-    ).encode()
+    if len(pool.backends) == 1:
+        succeeded = [transcribe_one(audio_path) for audio_path in args.audios]
+    else:
+        # One upload in flight per server; the pool hands each file to the server
+        # with the least outstanding audio and fails over on transport errors.
+        with ThreadPoolExecutor(max_workers=len(pool.backends)) as executor:
+            succeeded = list(executor.map(transcribe_one, args.audios))
+    return 0 if all(succeeded) else 1
 
 
-def _upload_file(
-    url: str,
+def _request_with_failover(
+    pool: BackendPool,
     path: Path,
-    fields: dict[str, str] | None = None,
-    *,
-    headers: dict[str, str] | None = None,
-    timeout: float = DEFAULT_HTTP_TIMEOUT,
+    fields: dict[str, str],
+    headers: dict[str, str],
+    args: argparse.Namespace,
 ) -> dict[str, Any]:
-    """Stream a multipart upload without duplicating the audio in memory."""
+    from urllib.error import HTTPError, URLError
 
-    parsed = urlsplit(url)
-    if parsed.scheme not in {"http", "https"} or not parsed.netloc:
-        raise ValueError(f"Invalid server URL: {url}")
+    from paratran.client import RETRYABLE_STATUSES
 
-    file_size = path.stat().st_size
-    boundary = f"----ParatranBoundary{uuid.uuid4().hex}"
-    field_parts = [
-        _multipart_field(boundary, name, value) for name, value in (fields or {}).items()
-    ]
-    safe_filename = path.name.replace("\\", "_").replace('"', "'")
-    content_type = mimetypes.guess_type(str(path))[0] or "application/octet-stream"
-    file_header = (
-        f"--{boundary}\r\n"
-        f'Content-Disposition: form-data; name="file"; filename="{safe_filename}"\r\n'
-        f"Content-Type: {content_type}\r\n"
-        "\r\n"
-    ).encode()
-    closing = f"\r\n--{boundary}--\r\n".encode()
-    content_length = (
-        sum(len(part) for part in field_parts) + len(file_header) + file_size + len(closing)
-    )
-
-    target = urlunsplit(("", "", parsed.path or "/", parsed.query, ""))
-    connection_class = (
-        http.client.HTTPSConnection if parsed.scheme == "https" else http.client.HTTPConnection
-    )
-    connection = connection_class(parsed.netloc, timeout=timeout)
-    request_headers = {
-        "Content-Type": f"multipart/form-data; boundary={boundary}",
-        "Content-Length": str(content_length),
-        **(headers or {}),
-    }
+    # Clients have no ffprobe guarantee, so balance on a 128 kbps size estimate.
+    cost = path.stat().st_size / 16_000
+    tried: set[str] = set()
+    while (backend := pool.acquire(cost, tried)) is not None:
+        tried.add(backend.url)
+        has_fallback = len(tried) < len(pool.backends)
+        try:
+            response = _request_result(backend.url, path, fields, headers, args)
+        except HTTPError as exc:
+            retryable = exc.code in RETRYABLE_STATUSES
+            pool.release(backend, cost, ok=not retryable)
+            if retryable and has_fallback:
+                continue
+            raise
+        except URLError:
+            pool.release(backend, cost, ok=False)
+            if has_fallback:
+                if args.verbose:
+                    print(f"  {backend.url} unavailable, trying another server", file=sys.stderr)
+                continue
+            raise
+        pool.release(backend, cost, ok=True)
+        return response
+    raise URLError("No servers available")
 
-    try:
-        connection.putrequest("POST", target)
-        for name, value in request_headers.items():
-            connection.putheader(name, value)
-        connection.endheaders()
-        for part in field_parts:
-            connection.send(part)
-        connection.send(file_header)
-        with path.open("rb") as audio_file:
-            while chunk := audio_file.read(1024 * 1024):
-                connection.send(chunk)
-        connection.send(closing)
-        response = connection.getresponse()
-        body = response.read()
-        if response.status >= 400:
-            response_headers = {name: value for name, value in response.getheaders()}
-            raise HTTPError(
-                url,
-                response.status,
-                response.reason,
-                response_headers,
-                io.BytesIO(body),
-            )
-        return json.loads(body)
-    except HTTPError:
-        raise
-    except OSError as exc:
-        raise URLError(exc) from exc
-    finally:
-        connection.close()
+
+def _request_result(
+    server_url: str,
+    path: Path,
+    fields: dict[str, str],
+    headers: dict[str, str],
+    args: argparse.Namespace,
+) -> dict[str, Any]:
+    from paratran.client import lookup_result, resumable_upload, upload_file
+    from paratran.result_cache import file_sha256
+
+    if args.transcode == "none":
+        # Transcoded bytes are not known until they are produced, so only
+        # verbatim uploads can be matched against the server cache.
+        response = lookup_result(
+            f"{server_url}/v1/audio/lookup",
+            file_sha256(path),
+            fields,
+            headers=headers,
+            timeout=args.timeout,
+        )
+        if response is not None:
+            if args.verbose:
+                print(f"Server already has a result for: {path.name}", file=sys.stderr)
+            return response
+
+    if args.verbose:
+        print(f"Uploading to {server_url}: {path.name}", file=sys.stderr)
+    chunk_size = args.upload_chunk_mb * 1024 * 1024
+    if args.transcode == "none" and 0 < chunk_size < path.stat().st_size:
+        response = resumable_upload(
+            server_url,
+            path,
+            fields,
+            headers=headers,
+            timeout=args.timeout,
+            chunk_size=chunk_size,
+        )
+        if response is not None:
+            return response
+    return upload_file(
+        f"{server_url}/v1/audio/transcriptions",
+        path,
+        fields,
+        headers=headers,
+        timeout=args.timeout,
+        transcode=None if args.transcode == "none" else args.transcode,
+    )
 
 
 def _openai_to_internal(response: dict[str, Any]):
+    from paratran.serializers import from_openai_verbose_json
+
     return from_openai_verbose_json(response)
 
 
-def _write_output(result, stem: str, output_dir: Path, formats: list[str], verbose: bool) -> None:
+def _write_output(
+    result,
+    stem: str,
+    output_dir: Path,
+    formats: list[str],
+    verbose: bool,
+    index: Path | None = None,
+) -> None:
+    from paratran.serializers import write_outputs
+
     for path in write_outputs(result, stem, output_dir, formats):
         if verbose:
             print(f"  Saved: {path}", file=sys.stderr)
+        if index is not None and path.suffix == ".json":
+            from paratran.search import TranscriptIndex
+
+            # One connection per file: server mode writes from several threads.
+            with TranscriptIndex(index) as transcripts:
+                transcripts.add(path, result)
 
 
 def _is_loopback(host: str) -> bool:
@@ -423,16 +686,80 @@ def _serve(argv: list[str]) -> int:
         default=int(os.environ.get("PARATRAN_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
         help=f"Maximum concurrent transcriptions (default: {DEFAULT_MAX_CONCURRENCY})",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="HTTP worker processes; more than 1 enables supervisor mode (default: 1)",
+    )
+    parser.add_argument(
+        "--inference-workers",
+        type=int,
+        default=0,
+        help=(
+            "Dedicated model processes behind the HTTP workers; 0 keeps the model in the "
+            "HTTP process unless --workers > 1 (default: 0)"
+        ),
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=int(os.environ.get("PARATRAN_MAX_QUEUE", DEFAULT_MAX_QUEUE)),
+        help=f"Maximum queued transcriptions before shedding load, 0 for no limit "
+        f"(default: {DEFAULT_MAX_QUEUE})",
+    )
+    parser.add_argument(
+        "--max-queued-audio",
+        type=float,
+        default=float(
+            os.environ.get("PARATRAN_MAX_QUEUED_AUDIO_SECONDS", DEFAULT_MAX_QUEUED_AUDIO_SECONDS)
+        ),
+        help="Maximum seconds of queued audio before shedding load, 0 for no limit "
+        f"(default: {DEFAULT_MAX_QUEUED_AUDIO_SECONDS:g})",
+    )
+    parser.add_argument(
+        "--memory-budget-mb",
+        type=int,
+        default=int(os.environ.get("PARATRAN_MEMORY_BUDGET_MB", 0)),
+        help="Working memory for concurrent transcriptions, beyond the model; sizes chunks "
+        "and holds jobs that would not fit, 0 for no limit (default: 0)",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default=os.environ.get("PARATRAN_PROFILE_DIR"),
+        help="Enable request profiling and write profiles here (default: off)",
+    )
+    parser.add_argument(
+        "--profile-rate",
+        type=float,
+        default=float(os.environ.get("PARATRAN_PROFILE_RATE", 0)),
+        help="Fraction of transcription requests to profile unasked, rate-limited to one "
+        "per PARATRAN_PROFILE_MIN_INTERVAL seconds (default: 0)",
+    )
     args = parser.parse_args(argv)
 
     if args.port < 1 or args.port > 65535:
         parser.error("port must be between 1 and 65535")
+    if args.workers < 1:
+        parser.error("workers must be at least 1")
+    if args.inference_workers < 0:
+        parser.error("inference-workers must be 0 or greater")
+    if args.max_queue < 0:
+        parser.error("max-queue must be 0 or greater")
+    if args.max_queued_audio < 0:
+        parser.error("max-queued-audio must be 0 or greater")
+    if args.memory_budget_mb < 0:
+        parser.error("memory-budget-mb must be 0 or greater")
+    if not 0 <= args.profile_rate <= 1:
+        parser.error("profile-rate must be between 0 and 1")
+    if args.profile_rate and not args.profile_dir:
+        parser.error("--profile-rate needs --profile-dir")
     if args.max_upload_mb < 1:
         parser.error("max-upload-mb must be at least 1")
     if args.max_concurrency < 1:
         parser.error("max-concurrency must be at least 1")
-    if not _is_loopback(args.host) and not args.api_key:
-        parser.error("--api-key is required when binding a non-loopback host")
+    if not _is_loopback(args.host) and not (args.api_key or os.environ.get("PARATRAN_API_KEYS")):
+        parser.error("--api-key or PARATRAN_API_KEYS is required when binding a non-loopback host")
 
     os.environ["PARATRAN_MODEL"] = args.model
     if args.cache_dir:
@@ -443,14 +770,273 @@ def _serve(argv: list[str]) -> int:
         os.environ.pop("PARATRAN_API_KEY", None)
     os.environ["PARATRAN_MAX_UPLOAD_MB"] = str(args.max_upload_mb)
     os.environ["PARATRAN_MAX_CONCURRENCY"] = str(args.max_concurrency)
+    os.environ["PARATRAN_MAX_QUEUE"] = str(args.max_queue)
+    os.environ["PARATRAN_MAX_QUEUED_AUDIO_SECONDS"] = str(args.max_queued_audio)
+    os.environ["PARATRAN_MEMORY_BUDGET_MB"] = str(args.memory_budget_mb)
+    if args.profile_dir:
+        os.environ["PARATRAN_PROFILE_DIR"] = args.profile_dir
+        os.environ["PARATRAN_PROFILE_RATE"] = str(args.profile_rate)
 
     import uvicorn
 
+    if args.workers > 1 or args.inference_workers > 0:
+        from paratran.workers import Supervisor
+
+        supervisor = Supervisor(args.inference_workers or 1)
+        supervisor.start()
+        os.environ.update(supervisor.environment())
+        os.environ["PARATRAN_HTTP_WORKERS"] = str(args.workers)
+        try:
+            uvicorn.run(
+                "paratran.server:app",
+                host=args.host,
+                port=args.port,
+                workers=args.workers,
+            )
+        finally:
+            supervisor.stop()
+        return 0
+
     from paratran.server import app
 
     uvicorn.run(app, host=args.host, port=args.port)
     return 0
 
 
+def _route(argv: list[str]) -> int:
+    from paratran.router import DEFAULT_HEALTH_INTERVAL, DEFAULT_ROUTER_RETRIES
+
+    parser = argparse.ArgumentParser(
+        prog="paratran route",
+        description="Balance transcription requests across several Paratran servers.",
+    )
+    parser.add_argument(
+        "--backend",
+        action="append",
+        default=None,
+        help=(
+            "Backend server URL; repeat for each server "
+            "(default: comma-separated PARATRAN_BACKENDS)"
+        ),
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Bind host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="Bind port (default: 8080)")
+    parser.add_argument(
+        "--api-key",
+        default=os.environ.get("PARATRAN_API_KEY"),
+        help="Optional bearer token for router clients; required for non-loopback hosts",
+    )
+    parser.add_argument(
+        "--backend-api-key",
+        default=os.environ.get("PARATRAN_BACKEND_API_KEY"),
+        help="Bearer token sent to the backends",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=DEFAULT_ROUTER_RETRIES,
+        help=f"Other backends to try after a failure (default: {DEFAULT_ROUTER_RETRIES})",
+    )
+    parser.add_argument(
+        "--health-interval",
+        type=float,
+        default=DEFAULT_HEALTH_INTERVAL,
+        help=f"Seconds between backend health checks (default: {DEFAULT_HEALTH_INTERVAL:g})",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_HTTP_TIMEOUT,
+        help=f"Backend request timeout in seconds (default: {DEFAULT_HTTP_TIMEOUT:g})",
+    )
+    args = parser.parse_args(argv)
+
+    backends = args.backend or [
+        url.strip() for url in os.environ.get("PARATRAN_BACKENDS", "").split(",") if url.strip()
+    ]
+    if not backends:
+        parser.error("at least one --backend is required")
+    if args.port < 1 or args.port > 65535:
+        parser.error("port must be between 1 and 65535")
+    if args.retries < 0:
+        parser.error("retries must be 0 or greater")
+    if args.health_interval <= 0:
+        parser.error("health-interval must be greater than 0")
+    if not _is_loopback(args.host) and not (args.api_key or os.environ.get("PARATRAN_API_KEYS")):
+        parser.error("--api-key or PARATRAN_API_KEYS is required when binding a non-loopback host")
+
+    if args.api_key:
+        os.environ["PARATRAN_API_KEY"] = args.api_key
+    else:
+        os.environ.pop("PARATRAN_API_KEY", None)
+
+    import uvicorn
+
+    from paratran.router import create_router
+
+    router = create_router(
+        backends,
+        backend_api_key=args.backend_api_key,
+        retries=args.retries,
+        health_interval=args.health_interval,
+        timeout=args.timeout,
+    )
+    uvicorn.run(router, host=args.host, port=args.port)
+    return 0
+
+
+def _models(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="paratran models",
+        description="Pre-fetch, verify, list, and snapshot models in the model cache.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=os.environ.get("PARATRAN_MODEL_DIR"),
+        help="Directory for HuggingFace model cache",
+    )
+    actions = parser.add_subparsers(dest="action", required=True)
+    default_model = os.environ.get("PARATRAN_MODEL", DEFAULT_MODEL)
+    for action, help_text in (
+        ("fetch", "Download models and verify their checksums"),
+        ("verify", "Verify cached models against their checksums"),
+    ):
+        subparser = actions.add_parser(action, help=help_text)
+        subparser.add_argument(
+            "models",
+            nargs="*",
+            default=[default_model],
+            metavar="MODEL",
+            help=f"HF model IDs or local paths (default: {default_model})",
+        )
+    actions.add_parser("list", help="List cached models and their size on disk")
+    snapshot = actions.add_parser(
+        "snapshot", help="Save a converted local copy that loads without the hub"
+    )
+    snapshot.add_argument("output", type=Path, help="Directory to write the snapshot to")
+    snapshot.add_argument(
+        "--model", default=default_model, help=f"Model to convert (default: {default_model})"
+    )
+    args = parser.parse_args(argv)
+
+    from paratran import models
+
+    if args.action == "list":
+        for model in models.list_models(args.cache_dir):
+            state = "" if model.complete else "  (incomplete)"
+            print(f"{model.size_bytes / 1024**2:10.1f} MB  {model.name}{state}")
+        return 0
+    if args.action == "snapshot":
+        try:
+            path = models.save_snapshot(args.model, args.output, args.cache_dir)
+        except (OSError, RuntimeError, ValueError) as exc:
+            print(f"Error: Could not snapshot {args.model}: {exc}", file=sys.stderr)
+            return 1
+        print(f"Saved {args.model} to {path}; set PARATRAN_MODEL={path} to use it")
+        return 0
+
+    failures = 0
+    for name in args.models:
+        try:
+            if args.action == "fetch":
+                path = models.fetch_model(name, args.cache_dir)
+            else:
+                path = models.local_model_path(name, args.cache_dir)
+                if path is None:
+                    raise FileNotFoundError("not in the model cache; run 'paratran models fetch'")
+            problems = models.verify_model(path)
+        except (OSError, RuntimeError, ValueError) as exc:
+            print(f"Error: {name}: {exc}", file=sys.stderr)
+            failures += 1
+            continue
+        for problem in problems:
+            print(f"Error: {name}: {problem}", file=sys.stderr)
+        failures += bool(problems)
+        print(f"{name}: {'corrupted' if problems else 'ok'} ({path})")
+    return 1 if failures else 0
+
+
+def _index(argv: list[str]) -> int:
+    import sqlite3
+
+    from paratran.search import TranscriptIndex, default_index_path
+
+    parser = argparse.ArgumentParser(
+        prog="paratran index",
+        description="Add saved .json transcripts to the phrase search index.",
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        default=[Path(".")],
+        metavar="PATHS",
+        help="Transcript files or directories to index recursively (default: .)",
+    )
+    parser.add_argument(
+        "--index",
+        type=Path,
+        default=default_index_path(),
+        help="Index database (default: $PARATRAN_INDEX or ~/.cache/paratran/index.db)",
+    )
+    args = parser.parse_args(argv)
+
+    missing = [str(path) for path in args.paths if not path.exists()]
+    if missing:
+        parser.error(f"not found: {', '.join(missing)}")
+    try:
+        with TranscriptIndex(args.index) as transcripts:
+            stats = transcripts.update(args.paths)
+    except (OSError, sqlite3.Error) as exc:
+        print(f"Error: Could not update {args.index}: {exc}", file=sys.stderr)
+        return 1
+    print(
+        f"{stats.indexed} indexed, {stats.unchanged} unchanged, {stats.removed} removed, "
+        f"{stats.skipped} skipped ({args.index})"
+    )
+    return 0
+
+
+def _search(argv: list[str]) -> int:
+    from paratran.search import DEFAULT_SEARCH_LIMIT, TranscriptIndex, default_index_path
+    from paratran.serializers import format_timestamp
+
+    parser = argparse.ArgumentParser(
+        prog="paratran search",
+        description="Find where a phrase was said in the indexed transcripts.",
+    )
+    parser.add_argument("phrase", nargs="+", help="Words to search for, matched as a phrase")
+    parser.add_argument(
+        "--index",
+        type=Path,
+        default=default_index_path(),
+        help="Index database (default: $PARATRAN_INDEX or ~/.cache/paratran/index.db)",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=DEFAULT_SEARCH_LIMIT,
+        help=f"Maximum matches to print (default: {DEFAULT_SEARCH_LIMIT})",
+    )
+    parser.add_argument("--json", action="store_true", help="Print matches as JSON")
+    args = parser.parse_args(argv)
+
+    if not args.index.is_file():
+        parser.error(f"no index at {args.index}; run 'paratran index' first")
+    with TranscriptIndex(args.index) as transcripts:
+        hits = transcripts.search(" ".join(args.phrase), limit=args.limit)
+    if args.json:
+        import json
+
+        print(json.dumps([hit.to_dict() for hit in hits], indent=2, ensure_ascii=False))
+    else:
+        for hit in hits:
+            print(
+                f"{hit.path}  {format_timestamp(hit.start, '.')}-"
+                f"{format_timestamp(hit.end, '.')}  {hit.text}"
+            )
+    return 0 if hits else 1
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,427 @@
+"""HTTP client for Paratran servers, shared by CLI client mode and the router."""
+
+from __future__ import annotations
+
+import http.client
+import io
+import json
+import mimetypes
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode, urlsplit, urlunsplit
+
+from paratran.contracts import DEFAULT_HTTP_TIMEOUT, DEFAULT_UPLOAD_CHUNK_MB
+
+RESUME_ATTEMPTS = 5
+# Backend answers that another server may handle better; other errors (bad
+# options, undecodable audio) would fail the same way everywhere.
+RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+
+# The model decodes everything to 16 kHz mono, so the client can drop the extra
+# channels and sample rate before upload without changing the transcript.
+_TRANSCODE_CODECS: dict[str, tuple[str, str, list[str]]] = {
+    "flac": (".flac", "audio/flac", ["-sample_fmt", "s16", "-c:a", "flac", "-f", "flac"]),
+    "opus": (".opus", "audio/ogg", ["-c:a", "libopus", "-b:a", "32k", "-f", "ogg"]),
+}
+
+
+def _multipart_field(boundary: str, name: str, value: str) -> bytes:
+    return (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'
+    ).encode()
+
+
+def http_request(
+    method: str,
+    url: str,
+    body: bytes = b"",
+    *,
+    headers: dict[str, str] | None = None,
+    timeout: float = DEFAULT_HTTP_TIMEOUT,
+    allow_status: frozenset[int] = frozenset(),
+) -> tuple[int, http.client.HTTPMessage, bytes]:
+    """Send one small request; statuses >= 400 raise unless listed in ``allow_status``."""
+
+    parsed = urlsplit(url)
+    if parsed.scheme not in {"http", "https"} or not parsed.netloc:
+        raise ValueError(f"Invalid server URL: {url}")
+
+    target = urlunsplit(("", "", parsed.path or "/", parsed.query, ""))
+    connection_class = (
+        http.client.HTTPSConnection if parsed.scheme == "https" else http.client.HTTPConnection
+    )
+    connection = connection_class(parsed.netloc, timeout=timeout)
+    try:
+        connection.request(method, target, body=body, headers=headers or {})
+        response = connection.getresponse()
+        payload = response.read()
+        if response.status >= 400 and response.status not in allow_status:
+            raise HTTPError(
+                url,
+                response.status,
+                response.reason,
+                response.headers,
+                io.BytesIO(payload),
+            )
+        return response.status, response.headers, payload
+    except HTTPError:
+        raise
+    except OSError as exc:
+        raise URLError(exc) from exc
+    finally:
+        connection.close()
+
+
+def _form_headers(headers: dict[str, str] | None) -> dict[str, str]:
+    return {"Content-Type": "application/x-www-form-urlencoded", **(headers or {})}
+
+
+def lookup_result(
+    url: str,
+    sha256: str,
+    fields: dict[str, str] | None = None,
+    *,
+    headers: dict[str, str] | None = None,
+    timeout: float = DEFAULT_HTTP_TIMEOUT,
+) -> dict[str, Any] | None:
+    """Ask the server for a cached result; ``None`` means the audio must be uploaded."""
+
+    status, _, payload = http_request(
+        "POST",
+        url,
+        urlencode({**(fields or {}), "sha256": sha256}).encode(),
+        headers=_form_headers(headers),
+        timeout=timeout,
+        # Servers without the lookup route answer 404/405; both mean "upload it".
+        allow_status=frozenset({404, 405}),
+    )
+    if status in {404, 405}:
+        return None
+    return json.loads(payload)
+
+
+def resumable_upload(
+    server_url: str,
+    path: Path,
+    fields: dict[str, str] | None = None,
+    *,
+    headers: dict[str, str] | None = None,
+    timeout: float = DEFAULT_HTTP_TIMEOUT,
+    chunk_size: int = DEFAULT_UPLOAD_CHUNK_MB * 1024 * 1024,
+) -> dict[str, Any] | None:
+    """Upload in offset-addressed chunks, resuming from the server offset after failures.
+
+    Returns ``None`` when the server predates resumable uploads so the caller can
+    fall back to a single multipart request.
+    """
+
+    length = path.stat().st_size
+    status, created, _ = http_request(
+        "POST",
+        f"{server_url}/v1/uploads",
+        urlencode({"filename": path.name, "length": str(length)}).encode(),
+        headers=_form_headers(headers),
+        timeout=timeout,
+        allow_status=frozenset({404, 405}),
+    )
+    if status in {404, 405}:
+        return None
+    upload_url = f"{server_url}{created['Location']}"
+
+    offset: int | None = 0
+    failures = 0
+    with path.open("rb") as audio_file:
+        while offset is None or offset < length:
+            try:
+                if offset is None:
+                    _, state, _ = http_request("HEAD", upload_url, headers=headers, timeout=timeout)
+                else:
+                    audio_file.seek(offset)
+                    _, state, _ = http_request(
+                        "PATCH",
+                        upload_url,
+                        audio_file.read(chunk_size),
+                        headers={
+                            "Content-Type": "application/offset+octet-stream",
+                            "Upload-Offset": str(offset),
+                            **(headers or {}),
+                        },
+                        timeout=timeout,
+                    )
+                    failures = 0
+                offset = int(state["Upload-Offset"])
+            except HTTPError as exc:
+                # 409 means our offset is stale; anything else will not be fixed by retrying.
+                if exc.code != 409:
+                    raise
+                failures += 1
+                if failures > RESUME_ATTEMPTS:
+                    raise
+                offset = None
+            except URLError:
+                failures += 1
+                if failures > RESUME_ATTEMPTS:
+                    raise
+                offset = None
+                time.sleep(min(0.5 * 2**failures, 15.0))
+
+    _, _, payload = http_request(
+        "POST",
+        f"{upload_url}/transcriptions",
+        urlencode(fields or {}).encode(),
+        headers=_form_headers(headers),
+        timeout=timeout,
+    )
+    return json.loads(payload)
+
+
+def transcode_command(path: Path, codec: str) -> list[str]:
+    extra_args = _TRANSCODE_CODECS[codec][2]
+    # fmt: off
+    return [
+        shutil.which("ffmpeg") or "ffmpeg",
+        "-nostdin", "-nostats", "-v", "error",
+        "-i", str(path),
+        "-vn", "-ac", "1", "-ar", "16000",
+        *extra_args,
+        "pipe:1",
+    ]
+    # fmt: on
+
+
+def upload_file(
+    url: str,
+    path: Path,
+    fields: dict[str, str] | None = None,
+    *,
+    headers: dict[str, str] | None = None,
+    timeout: float = DEFAULT_HTTP_TIMEOUT,
+    transcode: str | None = None,
+) -> dict[str, Any]:
+    """Stream a multipart upload and decode the JSON response, raising ``HTTPError``."""
+
+    status, response_headers, body = post_multipart(
+        url,
+        path,
+        fields,
+        headers=headers,
+        timeout=timeout,
+        transcode=transcode,
+    )
+    if status >= 400:
+        reason = http.client.responses.get(status, "")
+        raise HTTPError(url, status, reason, response_headers, io.BytesIO(body))
+    return json.loads(body)
+
+
+def post_multipart(
+    url: str,
+    path: Path | BinaryIO,
+    fields: dict[str, str] | None = None,
+    *,
+    headers: dict[str, str] | None = None,
+    timeout: float = DEFAULT_HTTP_TIMEOUT,
+    transcode: str | None = None,
+    filename: str | None = None,
+) -> tuple[int, http.client.HTTPMessage, bytes]:
+    """Stream a multipart upload without duplicating the audio in memory.
+
+    With ``transcode`` set, ffmpeg output is piped straight into a chunked
+    request body so the converted audio never touches the disk. ``path`` may
+    also be a seekable binary file, sent from its start, in which case
+    ``filename`` is required and ``transcode`` is not supported. Returns the
+    raw status, headers, and body; connection failures raise ``URLError``.
+    """
+
+    parsed = urlsplit(url)
+    if parsed.scheme not in {"http", "https"} or not parsed.netloc:
+        raise ValueError(f"Invalid server URL: {url}")
+    if transcode is not None and transcode not in _TRANSCODE_CODECS:
+        raise ValueError(f"Unsupported transcode format '{transcode}'")
+    if not isinstance(path, Path) and (transcode is not None or filename is None):
+        raise ValueError("A file object upload needs a filename and cannot be transcoded")
+
+    boundary = f"----ParatranBoundary{uuid.uuid4().hex}"
+    field_parts = [
+        _multipart_field(boundary, name, value) for name, value in (fields or {}).items()
+    ]
+    filename = filename or path.name
+    if isinstance(path, Path):
+        size = path.stat().st_size if transcode is None else 0
+    else:
+        size = path.seek(0, io.SEEK_END)
+    if transcode is None:
+        content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    else:
+        suffix, content_type, _ = _TRANSCODE_CODECS[transcode]
+        filename = f"{Path(filename).stem}{suffix}"
+    safe_filename = filename.replace("\\", "_").replace('"', "'")
+    file_header = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{safe_filename}"\r\n'
+        f"Content-Type: {content_type}\r\n"
+        "\r\n"
+    ).encode()
+    closing = f"\r\n--{boundary}--\r\n".encode()
+
+    target = urlunsplit(("", "", parsed.path or "/", parsed.query, ""))
+    connection_class = (
+        http.client.HTTPSConnection if parsed.scheme == "https" else http.client.HTTPConnection
+    )
+    connection = connection_class(parsed.netloc, timeout=timeout)
+    request_headers = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    if transcode is None:
+        content_length = (
+            sum(len(part) for part in field_parts) + len(file_header) + size + len(closing)
+        )
+        request_headers["Content-Length"] = str(content_length)
+    else:
+        request_headers["Transfer-Encoding"] = "chunked"
+    request_headers.update(headers or {})
+
+    def send(data: bytes) -> None:
+        if transcode is None:
+            connection.send(data)
+        elif data:
+            connection.send(b"%x\r\n%s\r\n" % (len(data), data))
+
+    try:
+        connection.putrequest("POST", target)
+        for name, value in request_headers.items():
+            connection.putheader(name, value)
+        connection.endheaders()
+        for part in field_parts:
+            send(part)
+        send(file_header)
+        if isinstance(path, Path) and transcode is None:
+            with path.open("rb") as audio_file:
+                _send_file(audio_file, send)
+        elif transcode is None:
+            path.seek(0)
+            _send_file(path, send)
+        else:
+            _send_transcoded(path, transcode, send)
+        send(closing)
+        if transcode is not None:
+            connection.send(b"0\r\n\r\n")
+        response = connection.getresponse()
+        return response.status, response.headers, response.read()
+    except OSError as exc:
+        raise URLError(exc) from exc
+    finally:
+        connection.close()
+
+
+def _send_file(audio_file: BinaryIO, send) -> None:
+    while chunk := audio_file.read(1024 * 1024):
+        send(chunk)
+
+
+def _send_transcoded(path: Path, codec: str, send) -> None:
+    """Pipe ffmpeg output into ``send``; a failed encode aborts the request body."""
+
+    # Errors go to a file rather than a second pipe: nothing reads stderr
+    # until stdout ends, so a chatty encode could otherwise fill the pipe and
+    # stall both processes.
+    with tempfile.TemporaryFile() as errors:
+        process = subprocess.Popen(
+            transcode_command(path, codec),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=errors,
+        )
+        with process:
+            try:
+                for chunk in iter(lambda: process.stdout.read(1024 * 1024), b""):
+                    send(chunk)
+                process.wait()
+            except BaseException:
+                process.kill()
+                raise
+        if process.returncode != 0:
+            # The terminating chunk is never sent, so the server sees a truncated
+            # body instead of transcribing partial audio.
+            errors.seek(0)
+            message = errors.read().decode(errors="replace").strip()
+            message = message or f"exit code {process.returncode}"
+            raise ValueError(f"Could not transcode {path.name}: {message}")
+
+
+@dataclass(slots=True, eq=False)
+class Backend:
+    url: str
+    healthy: bool = True
+    outstanding_seconds: float = 0.0
+    in_flight: int = 0
+    failures: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding_seconds": round(self.outstanding_seconds, 3),
+            "in_flight": self.in_flight,
+            "failures": self.failures,
+        }
+
+
+class BackendPool:
+    """Least-outstanding-audio balancing with failover across Paratran servers."""
+
+    def __init__(self, urls: list[str]):
+        if not urls:
+            raise ValueError("At least one server URL is required")
+        self.backends = [Backend(url.rstrip("/")) for url in urls]
+        self._lock = threading.Lock()
+
+    def acquire(self, cost: float, exclude: set[str] | None = None) -> Backend | None:
+        """Reserve ``cost`` audio seconds on the least-loaded backend not in ``exclude``.
+
+        Healthy backends are preferred; an unhealthy one is only tried when
+        nothing else is left, since it may have recovered since it was marked.
+        """
+
+        exclude = exclude or set()
+        with self._lock:
+            candidates = [backend for backend in self.backends if backend.url not in exclude]
+            if not candidates:
+                return None
+            backend = min(
+                candidates,
+                key=lambda item: (
+                    not item.healthy,
+                    item.outstanding_seconds,
+                    item.in_flight,
+                    self.backends.index(item),
+                ),
+            )
+            backend.outstanding_seconds += cost
+            backend.in_flight += 1
+            return backend
+
+    def release(self, backend: Backend, cost: float, *, ok: bool) -> None:
+        with self._lock:
+            backend.outstanding_seconds = max(backend.outstanding_seconds - cost, 0.0)
+            backend.in_flight -= 1
+        self.mark(backend, ok)
+
+    def mark(self, backend: Backend, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                backend.healthy = True
+                backend.failures = 0
+            else:
+                backend.healthy = False
+                backend.failures += 1
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return [backend.to_dict() for backend in self.backends]
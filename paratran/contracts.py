@@ -7,26 +7,45 @@ from dataclasses import dataclass, field
 from typing import Any
 
 DEFAULT_MODEL = "mlx-community/parakeet-tdt-0.6b-v3"
-ALLOWED_EXTENSIONS = frozenset({".wav", ".mp3", ".flac", ".m4a", ".ogg", ".webm"})
+# Every Parakeet model consumes 16 kHz mono audio.
+SAMPLE_RATE = 16_000
+ALLOWED_EXTENSIONS = frozenset({".wav", ".mp3", ".flac", ".m4a", ".ogg", ".opus", ".webm"})
 RESPONSE_FORMATS = ("json", "text", "srt", "vtt", "verbose_json")
 OUTPUT_FORMATS = ("txt", "json", "srt", "vtt", "all")
+MCP_OUTPUT_MODES = ("json", "text", "sentences", "srt", "vtt", "tokens")
+PRIORITIES = ("high", "normal", "low")
+PRECISIONS = ("bf16", "int8", "int4")
+DECODING_METHODS = ("greedy", "beam", "hybrid")
+TRANSCODE_FORMATS = ("none", "flac", "opus")
 
 DEFAULT_DECODING = "greedy"
+DEFAULT_PRECISION = "bf16"
 DEFAULT_BEAM_SIZE = 5
 DEFAULT_LENGTH_PENALTY = 0.013
 DEFAULT_PATIENCE = 3.5
 DEFAULT_DURATION_REWARD = 0.67
+DEFAULT_CONFIDENCE_THRESHOLD = 0.5
 DEFAULT_CHUNK_DURATION = 120.0
 DEFAULT_OVERLAP_DURATION = 15.0
 DEFAULT_HTTP_TIMEOUT = 60.0
 DEFAULT_MAX_UPLOAD_MB = 512
 DEFAULT_MAX_CONCURRENCY = 1
+DEFAULT_MAX_QUEUE = 64
+DEFAULT_MAX_QUEUED_AUDIO_SECONDS = 4 * 3600.0
+DEFAULT_RESULT_CACHE_SIZE = 256
+DEFAULT_UPLOAD_CHUNK_MB = 16
+DEFAULT_TOKEN_PAGE_SIZE = 500
+DEFAULT_DAEMON_IDLE_TIMEOUT = 600.0
 
 
 class OptionValidationError(ValueError):
     """Raised when a transcription option violates the shared contract."""
 
 
+class TranscriptionCancelled(Exception):
+    """Raised between chunks once the caller no longer wants the result."""
+
+
 @dataclass(frozen=True, slots=True)
 class TranscriptionOptions:
     """Validated options shared by the CLI, REST interface, and MCP tool."""
@@ -42,11 +61,20 @@ class TranscriptionOptions:
     chunk_duration: float | None = DEFAULT_CHUNK_DURATION
     overlap_duration: float = DEFAULT_OVERLAP_DURATION
     fp32: bool = False
+    precision: str = DEFAULT_PRECISION
+    confidence_threshold: float = DEFAULT_CONFIDENCE_THRESHOLD
+    diarize: bool = False
+    num_speakers: int | None = None
 
     def __post_init__(self) -> None:
-        if self.decoding not in ("greedy", "beam"):
+        if self.decoding not in DECODING_METHODS:
+            raise OptionValidationError(
+                f"Invalid decoding method '{self.decoding}'. "
+                f"Must be one of: {', '.join(DECODING_METHODS)}"
+            )
+        if self.precision not in PRECISIONS:
             raise OptionValidationError(
-                f"Invalid decoding method '{self.decoding}'. Must be 'greedy' or 'beam'."
+                f"Invalid precision '{self.precision}'. Must be one of: {', '.join(PRECISIONS)}"
             )
         if self.beam_size < 1:
             raise OptionValidationError("beam_size must be at least 1")
@@ -58,6 +86,7 @@ class TranscriptionOptions:
             ("max_duration", self.max_duration),
             ("chunk_duration", self.chunk_duration),
             ("overlap_duration", self.overlap_duration),
+            ("confidence_threshold", self.confidence_threshold),
         ):
             if value is not None and not math.isfinite(value):
                 raise OptionValidationError(f"{name} must be finite")
@@ -67,6 +96,10 @@ class TranscriptionOptions:
             raise OptionValidationError("patience must be greater than 0")
         if not 0 <= self.duration_reward <= 1:
             raise OptionValidationError("duration_reward must be between 0 and 1")
+        if not 0 <= self.confidence_threshold <= 1:
+            raise OptionValidationError("confidence_threshold must be between 0 and 1")
+        if self.num_speakers is not None and self.num_speakers < 1:
+            raise OptionValidationError("num_speakers must be at least 1")
         if self.max_words is not None and self.max_words < 1:
             raise OptionValidationError("max_words must be at least 1")
         if self.silence_gap is not None and self.silence_gap <= 0:
@@ -96,6 +129,10 @@ class TranscriptionOptions:
             "chunk_duration": self.chunk_duration,
             "overlap_duration": self.overlap_duration,
             "fp32": self.fp32,
+            "precision": self.precision,
+            "confidence_threshold": self.confidence_threshold,
+            "diarize": self.diarize,
+            "num_speakers": self.num_speakers,
         }
 
 
@@ -119,6 +156,16 @@ class Token:
             value["confidence"] = self.confidence
         return value
 
+    @classmethod
+    def from_dict(cls, value: dict[str, Any]) -> Token:
+        return cls(
+            text=value["text"],
+            start=float(value["start"]),
+            end=float(value["end"]),
+            duration=value.get("duration"),
+            confidence=value.get("confidence"),
+        )
+
 
 @dataclass(frozen=True, slots=True)
 class Sentence:
@@ -126,14 +173,28 @@ class Sentence:
     start: float
     end: float
     tokens: tuple[Token, ...] = field(default_factory=tuple)
+    speaker: str | None = None
 
     def to_dict(self) -> dict[str, Any]:
-        return {
+        value: dict[str, Any] = {
             "text": self.text,
             "start": self.start,
             "end": self.end,
             "tokens": [token.to_dict() for token in self.tokens],
         }
+        if self.speaker is not None:
+            value["speaker"] = self.speaker
+        return value
+
+    @classmethod
+    def from_dict(cls, value: dict[str, Any]) -> Sentence:
+        return cls(
+            text=value["text"],
+            start=float(value["start"]),
+            end=float(value["end"]),
+            tokens=tuple(Token.from_dict(token) for token in value.get("tokens", ())),
+            speaker=value.get("speaker"),
+        )
 
 
 @dataclass(frozen=True, slots=True)
@@ -150,3 +211,63 @@ class TranscriptionResult:
             "processing_time": self.processing_time,
             "sentences": [sentence.to_dict() for sentence in self.sentences],
         }
+
+    @classmethod
+    def from_dict(cls, value: dict[str, Any]) -> TranscriptionResult:
+        """Rebuild a result from ``to_dict`` output, e.g. a saved ``.json`` file."""
+
+        return cls(
+            text=value["text"],
+            duration=float(value.get("duration", 0.0)),
+            processing_time=float(value.get("processing_time", 0.0)),
+            sentences=tuple(
+                Sentence.from_dict(sentence) for sentence in value.get("sentences", ())
+            ),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class TranscriptionProgress:
+    """How far one transcription has got, reported before each chunk and at the end."""
+
+    chunks_done: int
+    chunks_total: int
+    audio_seconds: float
+    total_audio_seconds: float
+    elapsed: float
+
+    @property
+    def fraction(self) -> float:
+        if self.total_audio_seconds <= 0:
+            return 0.0
+        return min(self.audio_seconds / self.total_audio_seconds, 1.0)
+
+    @property
+    def eta_seconds(self) -> float | None:
+        """Remaining time at the speed observed so far, unknown until a chunk finishes."""
+
+        if self.audio_seconds <= 0:
+            return None
+        remaining = max(self.total_audio_seconds - self.audio_seconds, 0.0)
+        return self.elapsed * remaining / self.audio_seconds
+
+    def to_dict(self) -> dict[str, Any]:
+        eta = self.eta_seconds
+        return {
+            "chunks_done": self.chunks_done,
+            "chunks_total": self.chunks_total,
+            "audio_seconds": round(self.audio_seconds, 3),
+            "total_audio_seconds": round(self.total_audio_seconds, 3),
+            "elapsed": round(self.elapsed, 3),
+            "eta_seconds": None if eta is None else round(eta, 3),
+        }
+
+    @classmethod
+    def from_dict(cls, value: dict[str, Any]) -> TranscriptionProgress:
+        return cls(
+            chunks_done=int(value["chunks_done"]),
+            chunks_total=int(value["chunks_total"]),
+            audio_seconds=float(value["audio_seconds"]),
+            total_audio_seconds=float(value["total_audio_seconds"]),
+            elapsed=float(value["elapsed"]),
+        )
@@ -0,0 +1,165 @@
+"""Background process that keeps a model loaded for local CLI runs.
+
+The first ``paratran file.wav`` starts a daemon for its model and cache
+directory. Later runs send their files to it over a Unix domain socket instead
+of loading the model again. The daemon exits after ``--idle-timeout`` seconds
+without a request.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fcntl
+import hashlib
+import os
+import secrets
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from multiprocessing import AuthenticationError
+from pathlib import Path
+
+from paratran.contracts import DEFAULT_DAEMON_IDLE_TIMEOUT
+from paratran.workers import InferencePool, InferenceServer, _load_model, request
+
+_READY_POLL_SECONDS = 0.2
+
+
+@dataclass(frozen=True, slots=True)
+class DaemonPaths:
+    socket: Path
+    key: Path
+    lock: Path
+    log: Path
+
+
+def daemon_paths(model: str, cache_dir: str | None) -> DaemonPaths:
+    """Per-user files for the daemon serving ``model`` from ``cache_dir``."""
+
+    # AF_UNIX paths are limited to ~104 bytes on macOS, so stay in /tmp rather
+    # than the long per-user temporary directory.
+    base = Path("/tmp" if os.path.isdir("/tmp") else os.path.expanduser("~/.cache"))
+    directory = base / f"paratran-{os.getuid()}"
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    status = directory.stat()
+    if status.st_uid != os.getuid() or status.st_mode & 0o077:
+        raise RuntimeError(f"Refusing to use {directory}: it must be private to the current user")
+    name = "daemon-" + hashlib.sha256(f"{model}\0{cache_dir or ''}".encode()).hexdigest()[:12]
+    return DaemonPaths(
+        socket=directory / f"{name}.sock",
+        key=directory / f"{name}.key",
+        lock=directory / f"{name}.lock",
+        log=directory / f"{name}.log",
+    )
+
+
+def _read_key(paths: DaemonPaths) -> bytes | None:
+    try:
+        return bytes.fromhex(paths.key.read_text().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def _ping(paths: DaemonPaths) -> bytes | None:
+    """The daemon's authkey if it is up and answering, otherwise ``None``."""
+
+    authkey = _read_key(paths)
+    if authkey is None or not paths.socket.exists():
+        return None
+    try:
+        request(str(paths.socket), authkey, {"op": "ping"})
+    except (AuthenticationError, EOFError, OSError, RuntimeError):
+        return None
+    return authkey
+
+
+def _spawn(paths: DaemonPaths, model: str, cache_dir: str | None, idle_timeout: float):
+    paths.socket.unlink(missing_ok=True)
+    descriptor = os.open(paths.key, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(descriptor, "w") as key_file:
+        key_file.write(secrets.token_hex(32))
+    environment = {**os.environ, "PARATRAN_MODEL": model}
+    if cache_dir:
+        environment["PARATRAN_MODEL_DIR"] = cache_dir
+    with paths.log.open("ab") as log:
+        return subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "paratran.daemon",
+                "--socket",
+                str(paths.socket),
+                "--idle-timeout",
+                str(idle_timeout),
+            ],
+            env=environment,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True,
+        )
+
+
+def connect(
+    model: str,
+    cache_dir: str | None,
+    *,
+    idle_timeout: float = DEFAULT_DAEMON_IDLE_TIMEOUT,
+) -> InferencePool:
+    """Attach to the daemon for ``model``, starting it first if none is running.
+
+    Raises ``RuntimeError`` if a new daemon exits before it is ready; its log
+    file is named in the message.
+    """
+
+    paths = daemon_paths(model, cache_dir)
+    if (authkey := _ping(paths)) is not None:
+        return InferencePool([str(paths.socket)], authkey)
+
+    with paths.lock.open("w") as lock:
+        # Concurrent first runs would otherwise each start a daemon.
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if (authkey := _ping(paths)) is not None:
+            return InferencePool([str(paths.socket)], authkey)
+        process = _spawn(paths, model, cache_dir, idle_timeout)
+        # A first run may download the model, so there is no deadline while
+        # the daemon is still alive.
+        while (authkey := _ping(paths)) is None:
+            if process.poll() is not None:
+                raise RuntimeError(
+                    f"Model daemon exited with code {process.returncode}; see {paths.log}"
+                )
+            time.sleep(_READY_POLL_SECONDS)
+    return InferencePool([str(paths.socket)], authkey)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m paratran.daemon",
+        description="Keep a Paratran model loaded for local CLI runs.",
+    )
+    parser.add_argument("--socket", required=True, help="Unix socket path to listen on")
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DEFAULT_DAEMON_IDLE_TIMEOUT,
+        help=f"Exit after this many idle seconds (default: {DEFAULT_DAEMON_IDLE_TIMEOUT:g})",
+    )
+    args = parser.parse_args(argv)
+
+    socket_path = Path(args.socket)
+    authkey = bytes.fromhex(socket_path.with_suffix(".key").read_text().strip())
+
+    _load_model()
+    server = InferenceServer(str(socket_path), authkey, idle_timeout=args.idle_timeout)
+    print(f"paratran daemon {os.getpid()} listening on {socket_path}", flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        socket_path.unlink(missing_ok=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
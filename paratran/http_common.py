@@ -0,0 +1,82 @@
+"""Upload limits and API-key checks shared by the REST server and the router."""
+
+from __future__ import annotations
+
+import hmac
+import os
+
+from fastapi import Header, HTTPException
+
+from paratran.contracts import DEFAULT_MAX_UPLOAD_MB
+
+
+def max_upload_bytes() -> int:
+    try:
+        megabytes = int(os.environ.get("PARATRAN_MAX_UPLOAD_MB", DEFAULT_MAX_UPLOAD_MB))
+    except ValueError:
+        megabytes = DEFAULT_MAX_UPLOAD_MB
+    return max(megabytes, 1) * 1024 * 1024
+
+
+# The client that callers of the single ``PARATRAN_API_KEY`` are scheduled as.
+SHARED_KEY_CLIENT = "api-key"
+
+
+def api_keys() -> dict[str, str]:
+    """Configured API keys, each mapped to the client it identifies.
+
+    ``PARATRAN_API_KEYS`` holds comma-separated ``client=key`` pairs; callers
+    of ``PARATRAN_API_KEY`` share the client ``api-key``.
+    """
+
+    keys = {}
+    for entry in os.environ.get("PARATRAN_API_KEYS", "").split(","):
+        client, _, key = entry.strip().partition("=")
+        if client.strip() and key.strip():
+            keys[key.strip()] = client.strip()
+    if shared := os.environ.get("PARATRAN_API_KEY"):
+        keys.setdefault(shared, SHARED_KEY_CLIENT)
+    return keys
+
+
+def _provided_api_key(
+    x_api_key: str | None,
+    authorization: str | None,
+) -> str | None:
+    if x_api_key:
+        return x_api_key
+    if authorization and authorization.lower().startswith("bearer "):
+        return authorization[7:].strip()
+    return None
+
+
+def authenticate(x_api_key: str | None, authorization: str | None) -> str | None:
+    """The client named by the caller's API key, or ``None`` when no key is configured.
+
+    Raises a ``401`` ``HTTPException`` for a missing or unknown key.
+    """
+
+    keys = api_keys()
+    if not keys:
+        return None
+    provided = _provided_api_key(x_api_key, authorization)
+    client = None
+    if provided:
+        # Compare against every key, so the time taken does not reveal which matched.
+        for key, name in keys.items():
+            if hmac.compare_digest(provided.encode(), key.encode()):
+                client = name
+    if client is None:
+        raise HTTPException(
+            status_code=401,
+            detail="A valid API key is required",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return client
+
+
+def require_api_key(
+    x_api_key: str | None = Header(default=None),
+    authorization: str | None = Header(default=None),
+) -> str | None:
+    return authenticate(x_api_key, authorization)
@@ -0,0 +1,88 @@
+"""Span selection and splicing for hybrid decoding.
+
+``decoding="hybrid"`` decodes the whole file greedily, then re-decodes only
+the words whose tokens fall below ``confidence_threshold`` with beam search.
+Each low-confidence word becomes a span of whole tokens; the beam pass decodes
+the span's audio plus ``CONTEXT_SECONDS`` either side, and only the beam tokens
+that land inside the span replace the greedy ones. Words near each other share
+one span, so a garbled phrase costs one beam pass rather than one per word.
+
+These functions work on any tokens with ``text``, ``start``, ``end`` and
+``confidence`` attributes, so they run on parakeet's tokens during inference
+and on ``contracts.Token`` in tests.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+# Audio decoded either side of a span, so the beam pass sees whole words and
+# enough acoustic context at the span's edges.
+CONTEXT_SECONDS = 2.0
+
+
+@dataclass(frozen=True, slots=True)
+class Span:
+    """Tokens ``first`` up to (not including) ``last``, covering ``start``..``end`` seconds."""
+
+    first: int
+    last: int
+    start: float
+    end: float
+
+
+def _starts_word(token: Any) -> bool:
+    # Parakeet's SentencePiece pieces mark the start of a word with a space.
+    return token.text.startswith(" ")
+
+
+def low_confidence_spans(
+    tokens: Sequence[Any], threshold: float, merge_gap: float = CONTEXT_SECONDS
+) -> list[Span]:
+    """Whole-word spans around tokens whose confidence is below ``threshold``.
+
+    Spans separated by at most ``merge_gap`` seconds are merged, since their
+    decoding windows would overlap anyway. Tokens without a confidence are
+    never selected.
+    """
+
+    spans: list[Span] = []
+    for index, token in enumerate(tokens):
+        if token.confidence is None or token.confidence >= threshold:
+            continue
+        if spans and index < spans[-1].last:
+            continue
+        first = index
+        while first > 0 and not _starts_word(tokens[first]):
+            first -= 1
+        last = index + 1
+        while last < len(tokens) and not _starts_word(tokens[last]):
+            last += 1
+        if spans and tokens[first].start - spans[-1].end <= merge_gap:
+            first = spans.pop().first
+        spans.append(Span(first, last, tokens[first].start, tokens[last - 1].end))
+    return spans
+
+
+def decode_window(span: Span, duration: float, context: float = CONTEXT_SECONDS):
+    """The ``(start, end)`` seconds of audio to re-decode for ``span``."""
+
+    return max(span.start - context, 0.0), min(span.end + context, duration)
+
+
+def splice(tokens: Sequence[Any], span: Span, replacement: Sequence[Any]) -> list[Any]:
+    """Replace ``span``'s tokens with the ``replacement`` tokens centred inside it.
+
+    ``replacement`` must already carry absolute timestamps. Tokens decoded from
+    the surrounding context are dropped, since the greedy tokens there stay.
+    If beam search finds nothing inside the span, the greedy tokens are kept.
+    """
+
+    inside = [
+        token for token in replacement if span.start <= (token.start + token.end) / 2 <= span.end
+    ]
+    if not inside:
+        return list(tokens)
+    return [*tokens[: span.first], *inside, *tokens[span.last :]]
@@ -0,0 +1,262 @@
+"""Re-transcribe only the part of a recording that changed since its last run.
+
+A ``Revision`` pairs a transcript with a fingerprint of the audio it came from:
+a hash of each ``FINGERPRINT_SECONDS`` block of decoded samples. When the
+recording changes, ``plan_splice`` hashes the new samples against those
+blocks twice. From the start it finds the unchanged prefix. From the end it
+finds the unchanged suffix, shifted by the change in length, which covers
+appended recordings as well as a single cut or insertion in the middle.
+
+Only the audio between the two is decoded again, widened to sentence
+boundaries of the previous transcript and padded with ``CONTEXT_SECONDS``
+either side. ``apply_splice`` then joins the previous sentences before the
+change, the new ones, and the previous sentences after it, moved by the shift.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from paratran.contracts import Sentence, TranscriptionOptions, TranscriptionResult
+
+FINGERPRINT_SECONDS = 5.0
+# Audio decoded either side of the changed region, so words at its edges are
+# transcribed with the same acoustic context as in a full run.
+CONTEXT_SECONDS = 2.0
+REVISION_SUFFIX = ".chunks.json"
+
+
+def _block_hash(samples: Any) -> str:
+    return hashlib.blake2b(samples.tobytes(), digest_size=16).hexdigest()
+
+
+@dataclass(frozen=True, slots=True)
+class AudioFingerprint:
+    sample_rate: int
+    block_samples: int
+    total_samples: int
+    blocks: tuple[str, ...]
+
+    def block_range(self, index: int) -> tuple[int, int]:
+        start = index * self.block_samples
+        return start, min(start + self.block_samples, self.total_samples)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "sample_rate": self.sample_rate,
+            "block_samples": self.block_samples,
+            "total_samples": self.total_samples,
+            "blocks": list(self.blocks),
+        }
+
+    @classmethod
+    def from_dict(cls, value: dict[str, Any]) -> AudioFingerprint:
+        return cls(
+            sample_rate=int(value["sample_rate"]),
+            block_samples=int(value["block_samples"]),
+            total_samples=int(value["total_samples"]),
+            blocks=tuple(value["blocks"]),
+        )
+
+
+def fingerprint_audio(
+    samples: Any, sample_rate: int, block_seconds: float = FINGERPRINT_SECONDS
+) -> AudioFingerprint:
+    """Hash ``samples`` (a NumPy array) in blocks of ``block_seconds``."""
+
+    block = max(int(block_seconds * sample_rate), 1)
+    return AudioFingerprint(
+        sample_rate=sample_rate,
+        block_samples=block,
+        total_samples=len(samples),
+        blocks=tuple(
+            _block_hash(samples[start : start + block]) for start in range(0, len(samples), block)
+        ),
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class Revision:
+    """A transcript and the fingerprint of the audio it was made from."""
+
+    result: TranscriptionResult
+    fingerprint: AudioFingerprint
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"result": self.result.to_dict(), "fingerprint": self.fingerprint.to_dict()}
+
+    @classmethod
+    def from_dict(cls, value: dict[str, Any]) -> Revision:
+        return cls(
+            result=TranscriptionResult.from_dict(value["result"]),
+            fingerprint=AudioFingerprint.from_dict(value["fingerprint"]),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Splice:
+    """Keep sentences ``[:before]`` and ``[after:]``; re-decode ``start``..``end``.
+
+    ``start`` and ``end`` are seconds in the new audio. The kept trailing
+    sentences move by ``shift`` seconds.
+    """
+
+    before: int
+    after: int
+    start: float
+    end: float
+    shift: float
+
+    def window(self, duration: float, context: float = CONTEXT_SECONDS) -> tuple[float, float]:
+        """The ``(start, end)`` seconds of new audio to decode, with context."""
+
+        return max(self.start - context, 0.0), min(self.end + context, duration)
+
+
+def _unchanged_samples(fingerprint: AudioFingerprint, samples: Any) -> tuple[int, int, int]:
+    """``(prefix_end, suffix_start, shift)``: unchanged samples at each end.
+
+    ``suffix_start`` is in the previous audio; the same samples start at
+    ``suffix_start + shift`` in ``samples``.
+    """
+
+    prefix_end = 0
+    for index, expected in enumerate(fingerprint.blocks):
+        start, end = fingerprint.block_range(index)
+        if end > len(samples) or _block_hash(samples[start:end]) != expected:
+            break
+        prefix_end = end
+    shift = len(samples) - fingerprint.total_samples
+    suffix_start = fingerprint.total_samples
+    for index in reversed(range(len(fingerprint.blocks))):
+        start, end = fingerprint.block_range(index)
+        if min(start, start + shift) < prefix_end:
+            break
+        if _block_hash(samples[start + shift : end + shift]) != fingerprint.blocks[index]:
+            break
+        suffix_start = start
+    return prefix_end, suffix_start, shift
+
+
+def plan_splice(previous: Revision, samples: Any, sample_rate: int) -> Splice | None:
+    """What to re-decode to bring ``previous`` up to date with ``samples``.
+
+    Returns ``None`` when the audio is unchanged. Sentences within
+    ``CONTEXT_SECONDS`` of a change are re-decoded too, since the last one
+    before an append may have been cut off mid-word. A fingerprint taken at
+    another sample rate matches nothing, so the whole file is re-decoded.
+    """
+
+    sentences = previous.result.sentences
+    duration = len(samples) / sample_rate
+    if previous.fingerprint.sample_rate != sample_rate:
+        return Splice(0, len(sentences), 0.0, duration, 0.0)
+    prefix_end, suffix_start, shift = _unchanged_samples(previous.fingerprint, samples)
+    if prefix_end == previous.fingerprint.total_samples and shift == 0:
+        return None
+    prefix_seconds = prefix_end / sample_rate - CONTEXT_SECONDS
+    suffix_seconds = suffix_start / sample_rate + CONTEXT_SECONDS
+
+    before = 0
+    while before < len(sentences) and sentences[before].end <= prefix_seconds:
+        before += 1
+    after = len(sentences)
+    while after > before and sentences[after - 1].start >= suffix_seconds:
+        after -= 1
+    shift_seconds = shift / sample_rate
+    return Splice(
+        before=before,
+        after=after,
+        start=sentences[before - 1].end if before else 0.0,
+        end=sentences[after].start + shift_seconds if after < len(sentences) else duration,
+        shift=shift_seconds,
+    )
+
+
+def _shifted(sentence: Sentence, shift: float) -> Sentence:
+    if not shift:
+        return sentence
+    return dataclasses.replace(
+        sentence,
+        start=sentence.start + shift,
+        end=sentence.end + shift,
+        tokens=tuple(
+            dataclasses.replace(token, start=token.start + shift, end=token.end + shift)
+            for token in sentence.tokens
+        ),
+    )
+
+
+def inside(splice: Splice, tokens: Sequence[Any]) -> list[Any]:
+    """The ``tokens`` (with absolute times) centred inside the re-decoded region."""
+
+    return [token for token in tokens if splice.start <= (token.start + token.end) / 2 < splice.end]
+
+
+def apply_splice(
+    previous: TranscriptionResult,
+    splice: Splice,
+    sentences: Sequence[Sentence],
+    duration: float,
+    processing_time: float,
+) -> TranscriptionResult:
+    """Join the kept previous sentences around the newly decoded ``sentences``."""
+
+    joined = (
+        *previous.sentences[: splice.before],
+        *sentences,
+        *(_shifted(sentence, splice.shift) for sentence in previous.sentences[splice.after :]),
+    )
+    return TranscriptionResult(
+        text="".join(sentence.text for sentence in joined).strip(),
+        duration=duration,
+        processing_time=processing_time,
+        sentences=joined,
+    )
+
+
+def revision_path(output_dir: Path, stem: str) -> Path:
+    return output_dir / f"{stem}{REVISION_SUFFIX}"
+
+
+def load_revision(
+    output_dir: Path, stem: str, model: str, options: TranscriptionOptions
+) -> Revision | None:
+    """The previous revision of ``stem``, if it was made with this model and these options."""
+
+    try:
+        state = json.loads(revision_path(output_dir, stem).read_text())
+        if state.get("model") != model or state.get("options") != options.to_dict():
+            return None
+        result = json.loads((output_dir / f"{stem}.json").read_text())
+        return Revision(
+            TranscriptionResult.from_dict(result),
+            AudioFingerprint.from_dict(state["fingerprint"]),
+        )
+    except (OSError, KeyError, TypeError, ValueError):
+        return None
+
+
+def save_revision(
+    output_dir: Path, stem: str, model: str, options: TranscriptionOptions, revision: Revision
+) -> Path:
+    """Write the fingerprint next to ``stem.json``, which holds the transcript."""
+
+    path = revision_path(output_dir, stem)
+    path.write_text(
+        json.dumps(
+            {
+                "model": model,
+                "options": options.to_dict(),
+                "fingerprint": revision.fingerprint.to_dict(),
+            }
+        )
+        + "\n"
+    )
+    return path
@@ -3,30 +3,51 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import contextlib
+import functools
 import hmac
 import json
 import logging
 import os
 import sys
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any
 
 from mcp.server.auth.provider import AccessToken
 from mcp.server.auth.settings import AuthSettings
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 
 from paratran.contracts import (
+    ALLOWED_EXTENSIONS,
     DEFAULT_BEAM_SIZE,
     DEFAULT_CHUNK_DURATION,
+    DEFAULT_CONFIDENCE_THRESHOLD,
     DEFAULT_DECODING,
     DEFAULT_DURATION_REWARD,
     DEFAULT_LENGTH_PENALTY,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_QUEUE,
     DEFAULT_MODEL,
     DEFAULT_OVERLAP_DURATION,
     DEFAULT_PATIENCE,
+    DEFAULT_PRECISION,
+    DEFAULT_TOKEN_PAGE_SIZE,
+    MCP_OUTPUT_MODES,
+    OUTPUT_FORMATS,
     TranscriptionOptions,
+    TranscriptionProgress,
+    TranscriptionResult,
 )
+from paratran.result_cache import ResultCache, file_sha256
+from paratran.scheduler import AdmissionError, TranscriptionScheduler, probe_audio_seconds
+from paratran.serializers import to_mcp_output, write_outputs
+
+MAX_BATCH_FILES = 1000
 
-logging.basicConfig(level=logging.INFO, stream=sys.stderr)
 logger = logging.getLogger("paratran-mcp")
 
 
@@ -55,6 +76,85 @@ def _server_url(host: str, port: int) -> str:
     return f"http://{display_host}:{port}"
 
 
+def _wants_progress(ctx: Context | None) -> bool:
+    if ctx is None:
+        return False
+    try:
+        meta = ctx.request_context.meta
+    except ValueError:
+        return False
+    return meta is not None and meta.progressToken is not None
+
+
+def _progress_reporter(ctx: Context | None):
+    """Forward library progress to the MCP client, if it asked for notifications."""
+
+    if not _wants_progress(ctx):
+        return None
+
+    loop = asyncio.get_running_loop()
+
+    def report(update: TranscriptionProgress) -> None:
+        # Called on the transcription thread; the notification is sent on the
+        # event loop without waiting for it.
+        asyncio.run_coroutine_threadsafe(
+            ctx.report_progress(
+                update.audio_seconds,
+                update.total_audio_seconds,
+                message=f"{update.chunks_done}/{update.chunks_total} chunks",
+            ),
+            loop,
+        )
+
+    return report
+
+
+def _resolve_path(value: str, root: Path | None, name: str) -> Path:
+    path = Path(value).expanduser()
+    if not path.is_absolute():
+        raise ValueError(f"{name} must be an absolute path")
+    resolved = path.resolve()
+    if root is not None and not resolved.is_relative_to(root):
+        raise ValueError(f"{name} must be inside the allowed root: {root}")
+    return resolved
+
+
+def _batch_files(
+    file_paths: list[str] | None, directory: str | None, recursive: bool, root: Path | None
+) -> list[tuple[Path, Path]]:
+    """Audio files for a batch, each paired with its output subdirectory."""
+
+    files = [
+        (_resolve_path(value, root, "file_paths entries"), Path()) for value in file_paths or ()
+    ]
+    if directory:
+        folder = _resolve_path(directory, root, "directory")
+        if not folder.is_dir():
+            raise ValueError(f"directory is not a directory: {folder}")
+        candidates = folder.rglob("*") if recursive else folder.glob("*")
+        files.extend(
+            (path, path.parent.relative_to(folder))
+            for path in sorted(candidates)
+            if path.is_file() and path.suffix.lower() in ALLOWED_EXTENSIONS
+        )
+    if not files:
+        raise ValueError("No audio files to transcribe; pass file_paths or directory")
+    if len(files) > MAX_BATCH_FILES:
+        raise ValueError(f"A batch may contain at most {MAX_BATCH_FILES} files, got {len(files)}")
+    return files
+
+
+def _session_name(ctx: Context | None) -> str:
+    """Fair-share identity: one client per MCP session."""
+
+    if ctx is None:
+        return "mcp"
+    try:
+        return f"session-{id(ctx.session):x}"
+    except ValueError:
+        return "mcp"
+
+
 def create_mcp(
     host: str = "127.0.0.1",
     port: int = 8000,
@@ -84,8 +184,54 @@ def create_mcp(
 
     mcp = FastMCP("paratran", host=host, port=port, **auth_kwargs)
 
+    # Tool calls are admitted by the same scheduler and limits as the REST
+    # server, and inference runs on a pool no larger than the concurrency
+    # limit, so the MCP event loop keeps serving other requests meanwhile.
+    scheduler = TranscriptionScheduler.from_environment()
+    executor = ThreadPoolExecutor(
+        max_workers=scheduler.max_concurrency, thread_name_prefix="paratran-mcp"
+    )
+    # Paging through tokens calls the tool again for the same file; answer
+    # those calls from memory instead of transcribing again.
+    results = ResultCache.from_environment()
+
+    async def run_transcription(
+        path: Path,
+        options: TranscriptionOptions,
+        client: str,
+        progress: Callable[[TranscriptionProgress], None] | None = None,
+    ) -> TranscriptionResult:
+        from paratran.transcribe import transcribe_file
+
+        audio_seconds = await asyncio.to_thread(probe_audio_seconds, path)
+        run_options, memory_bytes = scheduler.memory.plan(audio_seconds, options)
+        cancel = threading.Event()
+        work = functools.partial(
+            transcribe_file,
+            str(path),
+            options=run_options,
+            is_cancelled=cancel.is_set,
+            progress=progress,
+        )
+        try:
+            async with scheduler.slot(client, "normal", audio_seconds, memory_bytes=memory_bytes):
+                future = asyncio.get_running_loop().run_in_executor(executor, work)
+                try:
+                    return await asyncio.shield(future)
+                except asyncio.CancelledError:
+                    # The client cancelled the tool call; stop at the next chunk,
+                    # and keep the slot until inference has actually stopped so
+                    # cancelled calls cannot exceed max_concurrency.
+                    cancel.set()
+                    while not future.done():
+                        with contextlib.suppress(asyncio.CancelledError):
+                            await asyncio.wait({future})
+                    raise
+        except AdmissionError as exc:
+            raise ValueError(f"{exc}; retry in {exc.retry_after}s") from exc
+
     @mcp.tool()
-    def transcribe(
+    async def transcribe(
         file_path: str,
         decoding: str = DEFAULT_DECODING,
         beam_size: int = DEFAULT_BEAM_SIZE,
@@ -98,13 +244,22 @@ def create_mcp(
         chunk_duration: float | None = DEFAULT_CHUNK_DURATION,
         overlap_duration: float = DEFAULT_OVERLAP_DURATION,
         fp32: bool = False,
+        precision: str = DEFAULT_PRECISION,
+        confidence_threshold: float = DEFAULT_CONFIDENCE_THRESHOLD,
+        diarize: bool = False,
+        num_speakers: int | None = None,
+        output: str = "json",
+        token_offset: int = 0,
+        token_limit: int = DEFAULT_TOKEN_PAGE_SIZE,
+        ctx: Context | None = None,
     ) -> str:
-        """Transcribe an audio file to JSON with aligned word timestamps.
+        """Transcribe an audio file, by default to JSON with aligned word timestamps.
 
         Args:
             file_path: Absolute path to an audio file. If --allowed-root is set,
                 the path must be inside that directory.
-            decoding: Decoding method - 'greedy' or 'beam'.
+            decoding: Decoding method - 'greedy', 'beam', or 'hybrid' (greedy,
+                then beam search only over low-confidence words).
             beam_size: Beam size (beam decoding only).
             length_penalty: Length penalty (beam decoding only).
             patience: Patience (beam decoding only).
@@ -115,15 +270,22 @@ def create_mcp(
             chunk_duration: Chunk duration in seconds; 0 disables chunking.
             overlap_duration: Overlap between chunks (seconds).
             fp32: Use float32 instead of bfloat16.
+            precision: Model weights - 'bf16', or 'int8'/'int4' quantized for
+                less memory and faster decoding at a small accuracy cost.
+            confidence_threshold: Token confidence from 0.0 to 1.0 below which
+                hybrid decoding re-decodes a word.
+            diarize: Label each sentence with its speaker (SPEAKER_00, ...).
+            num_speakers: Number of speakers, if known; implies diarize.
+            output: 'json' (everything), 'text', 'sentences' (timed sentences
+                without tokens), 'srt', 'vtt', or 'tokens' (one page of
+                word-level data; repeat with next_offset for the next page).
+            token_offset: First token to return with output='tokens'.
+            token_limit: Maximum tokens per page with output='tokens'.
         """
 
-        path = Path(file_path).expanduser()
-        if not path.is_absolute():
-            raise ValueError("file_path must be an absolute path")
-        resolved_path = path.resolve()
-        if root is not None and not resolved_path.is_relative_to(root):
-            raise ValueError(f"file_path must be inside the allowed root: {root}")
-
+        if output not in MCP_OUTPUT_MODES:
+            raise ValueError(f"output must be one of: {', '.join(MCP_OUTPUT_MODES)}")
+        resolved_path = _resolve_path(file_path, root, "file_path")
         options = TranscriptionOptions(
             decoding=decoding,
             beam_size=beam_size,
@@ -136,17 +298,141 @@ def create_mcp(
             chunk_duration=chunk_duration,
             overlap_duration=overlap_duration,
             fp32=fp32,
+            precision=precision,
+            confidence_threshold=confidence_threshold,
+            diarize=diarize or num_speakers is not None,
+            num_speakers=num_speakers,
         )
-        from paratran.transcribe import transcribe_file
 
-        logger.info("Transcribing: %s", resolved_path)
-        result = transcribe_file(str(resolved_path), options=options)
-        return json.dumps(result.to_dict(), indent=2, ensure_ascii=False)
+        cache_key = (
+            await asyncio.to_thread(file_sha256, resolved_path),
+            os.environ.get("PARATRAN_MODEL", DEFAULT_MODEL),
+            options,
+        )
+        result = results.get(cache_key)
+        if result is None:
+            logger.info("Transcribing: %s", resolved_path)
+            result = await run_transcription(
+                resolved_path, options, _session_name(ctx), _progress_reporter(ctx)
+            )
+            results.put(cache_key, result)
+        return to_mcp_output(result, output, token_offset=token_offset, token_limit=token_limit)
+
+    @mcp.tool()
+    async def transcribe_batch(
+        file_paths: list[str] | None = None,
+        directory: str | None = None,
+        recursive: bool = False,
+        output_dir: str | None = None,
+        output_format: str = "txt",
+        decoding: str = DEFAULT_DECODING,
+        beam_size: int = DEFAULT_BEAM_SIZE,
+        max_words: int | None = None,
+        silence_gap: float | None = None,
+        max_duration: float | None = None,
+        chunk_duration: float | None = DEFAULT_CHUNK_DURATION,
+        overlap_duration: float = DEFAULT_OVERLAP_DURATION,
+        fp32: bool = False,
+        precision: str = DEFAULT_PRECISION,
+        confidence_threshold: float = DEFAULT_CONFIDENCE_THRESHOLD,
+        diarize: bool = False,
+        num_speakers: int | None = None,
+        ctx: Context | None = None,
+    ) -> str:
+        """Transcribe many audio files in one call and return one compact entry per file.
+
+        Each entry has the file, its duration, and either its text or, with
+        output_dir, the paths of the written transcripts. A file that fails
+        gets an "error" entry instead; the rest of the batch still runs.
+
+        Args:
+            file_paths: Absolute paths to audio files.
+            directory: Absolute path to a directory of audio files.
+            recursive: Include audio files in subdirectories of directory.
+            output_dir: Write transcripts here instead of returning text;
+                subdirectories of directory are mirrored.
+            output_format: txt, json, srt, vtt, or all (with output_dir).
+            decoding: Decoding method - 'greedy', 'beam', or 'hybrid' (greedy,
+                then beam search only over low-confidence words).
+            beam_size: Beam size (beam decoding only).
+            max_words: Max words per sentence.
+            silence_gap: Split sentence on silence gap (seconds).
+            max_duration: Max sentence duration (seconds).
+            chunk_duration: Chunk duration in seconds; 0 disables chunking.
+            overlap_duration: Overlap between chunks (seconds).
+            fp32: Use float32 instead of bfloat16.
+            precision: Model weights - 'bf16', or 'int8'/'int4' quantized for
+                less memory and faster decoding at a small accuracy cost.
+            confidence_threshold: Token confidence from 0.0 to 1.0 below which
+                hybrid decoding re-decodes a word.
+            diarize: Label each sentence with its speaker (SPEAKER_00, ...).
+            num_speakers: Number of speakers, if known; implies diarize.
+        """
+
+        files = _batch_files(file_paths, directory, recursive, root)
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"output_format must be one of: {', '.join(OUTPUT_FORMATS)}")
+        formats = ["txt", "srt", "vtt", "json"] if output_format == "all" else [output_format]
+        output_root = _resolve_path(output_dir, root, "output_dir") if output_dir else None
+        options = TranscriptionOptions(
+            decoding=decoding,
+            beam_size=beam_size,
+            max_words=max_words,
+            silence_gap=silence_gap,
+            max_duration=max_duration,
+            chunk_duration=chunk_duration,
+            overlap_duration=overlap_duration,
+            fp32=fp32,
+            precision=precision,
+            confidence_threshold=confidence_threshold,
+            diarize=diarize or num_speakers is not None,
+            num_speakers=num_speakers,
+        )
+        client = _session_name(ctx)
+        report = _wants_progress(ctx)
+        # Keep one file waiting behind every running one so inference never
+        # idles between files, without flooding the shared queue.
+        feed = asyncio.Semaphore(scheduler.max_concurrency + 1)
+        finished = 0
+
+        async def run_one(path: Path, subdirectory: Path) -> dict[str, Any]:
+            nonlocal finished
+            entry: dict[str, Any] = {"file": str(path)}
+            async with feed:
+                try:
+                    result = await run_transcription(path, options, client)
+                    entry["duration"] = result.duration
+                    if output_root is None:
+                        entry["text"] = result.text
+                    else:
+                        target = output_root / subdirectory
+                        target.mkdir(parents=True, exist_ok=True)
+                        written = await asyncio.to_thread(
+                            write_outputs, result, path.stem, target, formats
+                        )
+                        entry["outputs"] = [str(output) for output in written]
+                except (OSError, RuntimeError, ValueError) as exc:
+                    entry["error"] = str(exc)
+            finished += 1
+            if report:
+                await ctx.report_progress(finished, len(files), message=path.name)
+            return entry
+
+        logger.info("Transcribing batch of %d files", len(files))
+        entries = await asyncio.gather(*(run_one(*item) for item in files))
+        failed = sum("error" in entry for entry in entries)
+        return json.dumps(
+            {"files": entries, "succeeded": len(entries) - failed, "failed": failed},
+            ensure_ascii=False,
+        )
 
     return mcp
 
 
 def main() -> int:
+    # Configure logging only when running as the server, not whenever the
+    # module is imported by a host application or a test.
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
     parser = argparse.ArgumentParser(
         prog="paratran-mcp",
         description="Paratran MCP server for audio transcription.",
@@ -183,10 +469,36 @@ def main() -> int:
         default=os.environ.get("PARATRAN_API_KEY"),
         help="Require this value as an Authorization bearer token for HTTP",
     )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=int(os.environ.get("PARATRAN_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
+        help=f"Maximum concurrent transcriptions (default: {DEFAULT_MAX_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=int(os.environ.get("PARATRAN_MAX_QUEUE", DEFAULT_MAX_QUEUE)),
+        help=f"Maximum queued tool calls before rejecting, 0 for no limit "
+        f"(default: {DEFAULT_MAX_QUEUE})",
+    )
+    parser.add_argument(
+        "--memory-budget-mb",
+        type=int,
+        default=int(os.environ.get("PARATRAN_MEMORY_BUDGET_MB", 0)),
+        help="Working memory for concurrent transcriptions, beyond the model, 0 for no limit "
+        "(default: 0)",
+    )
     args = parser.parse_args()
 
     if args.port < 1 or args.port > 65535:
         parser.error("port must be between 1 and 65535")
+    if args.max_concurrency < 1:
+        parser.error("max-concurrency must be at least 1")
+    if args.max_queue < 0:
+        parser.error("max-queue must be 0 or greater")
+    if args.memory_budget_mb < 0:
+        parser.error("memory-budget-mb must be 0 or greater")
     if args.transport == "streamable-http" and not _is_loopback(args.host):
         if not args.allowed_root:
             parser.error("--allowed-root is required for non-loopback HTTP MCP servers")
@@ -200,6 +512,9 @@ def main() -> int:
         os.environ["PARATRAN_ALLOWED_ROOT"] = args.allowed_root
     if args.api_key:
         os.environ["PARATRAN_API_KEY"] = args.api_key
+    os.environ["PARATRAN_MAX_CONCURRENCY"] = str(args.max_concurrency)
+    os.environ["PARATRAN_MAX_QUEUE"] = str(args.max_queue)
+    os.environ["PARATRAN_MEMORY_BUDGET_MB"] = str(args.memory_budget_mb)
 
     mcp = create_mcp(
         host=args.host,
@@ -0,0 +1,141 @@
+"""Peak-memory estimates that size chunks and gate concurrent transcriptions.
+
+Encoder self-attention grows with the square of the audio in one window, so an
+unchunked hour of audio needs far more memory than the model itself. The
+governor estimates each job's peak from its duration, chunk size and dtype,
+shrinks the chunk until the job fits its share of ``PARATRAN_MEMORY_BUDGET_MB``,
+and the scheduler only starts jobs whose estimates fit next to the running ones.
+
+The constants describe Parakeet's FastConformer encoder (10 ms mel frames, 8x
+subsampling, 1024 hidden units, 8 heads). They aim to overestimate rather than
+predict exactly, for quantized models too; ``snapshot`` reports MLX's measured
+peak next to them.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import sys
+
+from paratran.contracts import (
+    DEFAULT_CHUNK_DURATION,
+    DEFAULT_OVERLAP_DURATION,
+    SAMPLE_RATE,
+    TranscriptionOptions,
+)
+
+MIN_CHUNK_DURATION = 30.0
+_FEATURE_FRAMES_PER_SECOND = 100
+_ENCODER_FRAMES_PER_SECOND = 12.5
+_MEL_BINS = 128
+_HIDDEN_SIZE = 1024
+_ATTENTION_HEADS = 8
+# Encoder activations alive at once per frame, in hidden-size units: the
+# feed-forward expansion, the convolution module and the residual stream.
+_ACTIVATION_WIDTH = 16
+# Content scores, relative-position scores and the softmax output per head.
+_ATTENTION_MATRICES = 3
+
+
+def estimate_peak_bytes(audio_seconds: float, chunk_duration: float | None, fp32: bool) -> int:
+    """Working memory for one transcription, on top of the loaded model.
+
+    The same for every ``precision``, as an upper bound: ``int8`` and
+    ``int4`` quantize the weights of linear layers, which the budget leaves
+    out, while activations and attention scores stay in the compute dtype
+    (bf16, or fp32 with ``fp32``). Quantized jobs are therefore sized like
+    bf16 ones, never smaller than they run.
+    """
+
+    dtype_bytes = 4 if fp32 else 2
+    audio_seconds = max(audio_seconds, 0.0)
+    window = min(audio_seconds, chunk_duration) if chunk_duration else audio_seconds
+    frames = window * _ENCODER_FRAMES_PER_SECOND
+    # The whole file is decoded to float32 samples before chunking.
+    waveform = audio_seconds * SAMPLE_RATE * 4
+    features = window * _FEATURE_FRAMES_PER_SECOND * _MEL_BINS * dtype_bytes
+    activations = frames * _HIDDEN_SIZE * _ACTIVATION_WIDTH * dtype_bytes
+    attention = _ATTENTION_HEADS * _ATTENTION_MATRICES * frames**2 * dtype_bytes
+    return int(waveform + features + activations + attention)
+
+
+def _mlx_memory() -> dict[str, int] | None:
+    # Only report when this process runs inference; an HTTP front end in
+    # supervisor mode must not import MLX just to read zeros.
+    mx = sys.modules.get("mlx.core")
+    if mx is None:
+        return None
+    source = mx if hasattr(mx, "get_peak_memory") else getattr(mx, "metal", None)
+    try:
+        return {
+            "active_bytes": int(source.get_active_memory()),
+            "peak_bytes": int(source.get_peak_memory()),
+        }
+    except (AttributeError, RuntimeError):
+        return None
+
+
+class MemoryGovernor:
+    """Fit each job's chunk size into ``budget_bytes / max_concurrency``.
+
+    A budget of ``0`` disables the governor: options pass through unchanged
+    and the scheduler admits jobs on concurrency alone.
+    """
+
+    def __init__(self, budget_bytes: int = 0, max_concurrency: int = 1):
+        self.budget_bytes = max(budget_bytes, 0)
+        self.max_concurrency = max(max_concurrency, 1)
+        self.resized = 0
+        self.largest_estimate_bytes = 0
+
+    def plan(
+        self, audio_seconds: float, options: TranscriptionOptions
+    ) -> tuple[TranscriptionOptions, int]:
+        """Options to run ``options`` within budget, and the estimated peak for them."""
+
+        estimate = estimate_peak_bytes(audio_seconds, options.chunk_duration, options.fp32)
+        share = self.budget_bytes // self.max_concurrency
+        if self.budget_bytes and estimate > share:
+            chunk = self._largest_fitting_chunk(audio_seconds, options, share)
+            if chunk is not None:
+                overlap = options.overlap_duration
+                if overlap >= chunk:
+                    overlap = chunk * DEFAULT_OVERLAP_DURATION / DEFAULT_CHUNK_DURATION
+                options = dataclasses.replace(
+                    options, chunk_duration=chunk, overlap_duration=overlap
+                )
+                estimate = estimate_peak_bytes(audio_seconds, chunk, options.fp32)
+                self.resized += 1
+        self.largest_estimate_bytes = max(self.largest_estimate_bytes, estimate)
+        return options, estimate
+
+    @staticmethod
+    def _largest_fitting_chunk(
+        audio_seconds: float, options: TranscriptionOptions, share: int
+    ) -> float | None:
+        low = MIN_CHUNK_DURATION
+        high = min(options.chunk_duration or audio_seconds, audio_seconds)
+        if high <= low:
+            return None
+        if estimate_peak_bytes(audio_seconds, low, options.fp32) > share:
+            # Even the smallest chunk is over; run with it and let the
+            # scheduler keep the job to itself.
+            return low
+        while high - low > 1.0:
+            middle = (low + high) / 2
+            if estimate_peak_bytes(audio_seconds, middle, options.fp32) <= share:
+                low = middle
+            else:
+                high = middle
+        return float(int(low))
+
+    def snapshot(self, reserved_bytes: int) -> dict[str, int | None]:
+        measured = _mlx_memory() or {}
+        return {
+            "budget_bytes": self.budget_bytes,
+            "reserved_bytes": reserved_bytes,
+            "largest_estimate_bytes": self.largest_estimate_bytes,
+            "resized_jobs": self.resized,
+            "active_bytes": measured.get("active_bytes"),
+            "peak_bytes": measured.get("peak_bytes"),
+        }
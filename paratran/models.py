@@ -0,0 +1,261 @@
+"""Model cache tooling behind ``paratran models``: fetch, verify, list, and snapshot.
+
+Hub models live in the Hugging Face cache layout
+(``models--org--name/snapshots/<revision>/``), whose files are symlinks to
+content-addressed blobs. That lets ``verify`` check a cached model offline: LFS
+blobs are named by their SHA-256 and regular files by their git blob SHA-1.
+Local snapshots written by ``snapshot`` carry a manifest of SHA-256 digests.
+
+Quantized variants (``int8``, ``int4``) are built from the bf16 weights on
+first use and kept under ``paratran-quantized/`` in the same cache, next to
+the hub repositories, so later loads skip the conversion.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from paratran.contracts import DEFAULT_PRECISION
+
+MODEL_FILES = ("config.json", "model.safetensors")
+SNAPSHOT_MANIFEST = "paratran-manifest.json"
+QUANTIZATION_GROUP_SIZE = 64
+_QUANTIZATION_BITS = {"int8": 8, "int4": 4}
+
+
+@dataclass(frozen=True, slots=True)
+class CachedModel:
+    name: str
+    path: Path
+    size_bytes: int
+    complete: bool
+
+
+def hub_cache_dir(cache_dir: str | None = None) -> Path:
+    """The directory ``huggingface_hub`` downloads into for ``cache_dir``."""
+
+    if cache_dir:
+        return Path(cache_dir).expanduser()
+    if hub_cache := os.environ.get("HF_HUB_CACHE") or os.environ.get("HUGGINGFACE_HUB_CACHE"):
+        return Path(hub_cache).expanduser()
+    hf_home = os.environ.get("HF_HOME") or os.path.join(
+        os.environ.get("XDG_CACHE_HOME", "~/.cache"), "huggingface"
+    )
+    return Path(hf_home).expanduser() / "hub"
+
+
+def _repo_dir(name: str, cache_dir: str | None) -> Path:
+    return hub_cache_dir(cache_dir) / ("models--" + name.replace("/", "--"))
+
+
+def local_model_path(name: str, cache_dir: str | None = None) -> Path | None:
+    """A directory holding every file of ``name``, or ``None`` if it must be downloaded.
+
+    Local paths are returned as they are; hub ids resolve to the cached
+    snapshot for ``main``, so loading a fetched model needs no network round trip.
+    """
+
+    path = Path(name).expanduser()
+    if path.is_dir():
+        return path if all((path / file).is_file() for file in MODEL_FILES) else None
+    repo = _repo_dir(name, cache_dir)
+    try:
+        revision = (repo / "refs" / "main").read_text().strip()
+    except OSError:
+        return None
+    snapshot = repo / "snapshots" / revision
+    return snapshot if all((snapshot / file).is_file() for file in MODEL_FILES) else None
+
+
+def fetch_model(name: str, cache_dir: str | None = None) -> Path:
+    """Download ``name`` into the hub cache if needed and return its snapshot directory."""
+
+    if (path := local_model_path(name, cache_dir)) is not None:
+        return path
+
+    from huggingface_hub import hf_hub_download
+
+    for file in MODEL_FILES:
+        downloaded = hf_hub_download(name, file, cache_dir=cache_dir)
+    return Path(downloaded).parent
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as model_file:
+        while block := model_file.read(1024 * 1024):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _git_blob_sha1(path: Path) -> str:
+    digest = hashlib.sha1(f"blob {path.stat().st_size}\0".encode())
+    with path.open("rb") as model_file:
+        while block := model_file.read(1024 * 1024):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def verify_model(path: Path) -> list[str]:
+    """Check a model directory's files against their recorded digests.
+
+    Returns one message per missing or corrupted file; an empty list means the
+    model is intact. Plain local directories have no digests, so only their
+    files' presence is checked.
+    """
+
+    manifest_path = path / SNAPSHOT_MANIFEST
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.is_file() else {}
+    problems = []
+    for file in MODEL_FILES:
+        file_path = path / file
+        if not file_path.is_file():
+            problems.append(f"{file}: missing")
+            continue
+        if expected := manifest.get("files", {}).get(file):
+            actual = _sha256(file_path)
+        elif file_path.is_symlink():
+            expected = file_path.resolve().name
+            # LFS blobs are named by SHA-256, small files by their git blob SHA-1.
+            if len(expected) == 64:
+                actual = _sha256(file_path)
+            else:
+                actual = _git_blob_sha1(file_path)
+        else:
+            continue
+        if actual != expected:
+            problems.append(f"{file}: checksum mismatch (expected {expected}, got {actual})")
+    return problems
+
+
+def list_models(cache_dir: str | None = None) -> list[CachedModel]:
+    """Models in the hub cache with their size on disk."""
+
+    models = []
+    root = hub_cache_dir(cache_dir)
+    for repo in sorted(root.glob("models--*")):
+        name = repo.name.removeprefix("models--").replace("--", "/")
+        blobs = repo / "blobs"
+        size = sum(blob.stat().st_size for blob in blobs.iterdir()) if blobs.is_dir() else 0
+        models.append(
+            CachedModel(
+                name=name,
+                path=repo,
+                size_bytes=size,
+                complete=local_model_path(name, cache_dir) is not None,
+            )
+        )
+    for variant in sorted(root.glob("paratran-quantized/*/*")):
+        models.append(
+            CachedModel(
+                name=f"{variant.parent.name.replace('--', '/')} ({variant.name})",
+                path=variant,
+                size_bytes=sum(path.stat().st_size for path in variant.iterdir()),
+                complete=local_model_path(str(variant)) is not None,
+            )
+        )
+    return models
+
+
+def quantized_model_dir(name: str, cache_dir: str | None, precision: str) -> Path:
+    """Where the ``precision`` variant of ``name`` is kept in the model cache."""
+
+    return (
+        hub_cache_dir(cache_dir)
+        / "paratran-quantized"
+        / name.strip("/").replace("/", "--")
+        / precision
+    )
+
+
+def _quantize(model: Any, bits: int) -> None:
+    from mlx import nn
+
+    # Only layers whose input width splits into whole groups can be quantized;
+    # the rest (and every convolution) stay in bf16.
+    nn.quantize(
+        model,
+        group_size=QUANTIZATION_GROUP_SIZE,
+        bits=bits,
+        class_predicate=lambda _path, module: (
+            hasattr(module, "to_quantized")
+            and module.weight.shape[-1] % QUANTIZATION_GROUP_SIZE == 0
+        ),
+    )
+
+
+def _write_model(model: Any, config: Path, output_dir: Path, **manifest: Any) -> None:
+    import mlx.core as mx
+    from mlx.utils import tree_flatten
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(config, output_dir / "config.json")
+    mx.save_safetensors(
+        str(output_dir / "model.safetensors"), dict(tree_flatten(model.parameters()))
+    )
+    manifest["files"] = {file: _sha256(output_dir / file) for file in MODEL_FILES}
+    (output_dir / SNAPSHOT_MANIFEST).write_text(json.dumps(manifest, indent=2) + "\n")
+
+
+def load_model(name: str, cache_dir: str | None = None, precision: str = DEFAULT_PRECISION):
+    """Load ``name`` with ``precision`` weights, quantizing and caching it on first use."""
+
+    import parakeet_mlx
+
+    # A fetched model loads from its snapshot directory, skipping the hub
+    # requests from_pretrained makes for every file of a hub id.
+    source = str(local_model_path(name, cache_dir) or name)
+    kwargs = {"cache_dir": cache_dir} if cache_dir else {}
+    if precision == DEFAULT_PRECISION:
+        return parakeet_mlx.from_pretrained(source, **kwargs)
+
+    bits = _QUANTIZATION_BITS[precision]
+    variant = quantized_model_dir(name, cache_dir, precision)
+    if local_model_path(str(variant)) is not None:
+        from parakeet_mlx.utils import from_config
+
+        model = from_config(json.loads((variant / "config.json").read_text()))
+        _quantize(model, bits)
+        model.load_weights(str(variant / "model.safetensors"))
+        return model
+
+    model = parakeet_mlx.from_pretrained(source, **kwargs)
+    _quantize(model, bits)
+    # Build in a sibling directory and rename, so a concurrent loader never
+    # sees a half-written variant.
+    variant.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{precision}-", dir=variant.parent))
+    _write_model(
+        model,
+        fetch_model(name, cache_dir) / "config.json",
+        staging,
+        source=name,
+        quantization={"bits": bits, "group_size": QUANTIZATION_GROUP_SIZE},
+    )
+    try:
+        staging.rename(variant)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+    return model
+
+
+def save_snapshot(name: str, output_dir: Path, cache_dir: str | None = None) -> Path:
+    """Load ``name`` and write its converted weights to ``output_dir``.
+
+    The snapshot holds weights already cast to the dtype Paratran runs in, so
+    loading it skips the hub lookup and the conversion. Point
+    ``PARATRAN_MODEL`` at the directory to use it.
+    """
+
+    from paratran.transcribe import get_model
+
+    source = fetch_model(name, cache_dir)
+    _write_model(get_model(name, cache_dir), source / "config.json", output_dir, source=name)
+    return output_dir
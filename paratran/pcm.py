@@ -0,0 +1,197 @@
+"""Read PCM WAV without ffmpeg, and store raw PCM uploads as WAV.
+
+Most uploads from recorders and telephony systems are already 16-bit or
+float32 PCM WAV at the model's 16 kHz mono. ``read_native_wav`` reads those
+straight into a NumPy array, skipping the ffmpeg subprocess and its copy of
+the audio through a pipe. Anything else returns ``None``, and the caller
+falls back to ffmpeg.
+
+Raw PCM with no container at all is described by its MIME type instead:
+``audio/L16;rate=16000;channels=1`` (big-endian, per RFC 2586) or
+``audio/x-raw;format=S16LE|F32LE;rate=16000;channels=1``. ``WavWriter``
+stores such a stream as a WAV file, so the rest of the server, the scheduler,
+and inference workers handle it like any other upload.
+"""
+
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+import numpy as np
+
+RAW_CONTENT_TYPES = ("audio/l16", "audio/x-raw")
+
+_PCM = 1
+_FLOAT = 3
+_EXTENSIBLE = 0xFFFE
+# Bytes per sample and the NumPy dtype of each sample encoding.
+_ENCODINGS = {"s16": (2, "<i2"), "f32": (4, "<f4")}
+_RAW_FORMATS = {"s16le": "s16", "f32le": "f32"}
+_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+
+
+@dataclass(frozen=True, slots=True)
+class WavFormat:
+    """Where the samples of a PCM WAV file are, and how they are encoded."""
+
+    encoding: str
+    sample_rate: int
+    channels: int
+    data_offset: int
+    data_size: int
+
+    @property
+    def frames(self) -> int:
+        return self.data_size // (_ENCODINGS[self.encoding][0] * self.channels)
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate
+
+
+def read_wav_format(path: Path) -> WavFormat | None:
+    """The format of a 16-bit integer or 32-bit float PCM WAV file, else ``None``."""
+
+    try:
+        with path.open("rb") as file:
+            if file.read(4) != b"RIFF" or file.read(8)[4:] != b"WAVE":
+                return None
+            encoding = sample_rate = channels = None
+            while len(header := file.read(8)) == 8:
+                chunk_id, size = struct.unpack("<4sI", header)
+                if chunk_id == b"fmt ":
+                    fmt = file.read(size + size % 2)
+                    if len(fmt) < 16:
+                        return None
+                    tag, channels, sample_rate, _, _, bits = struct.unpack("<HHIIHH", fmt[:16])
+                    if tag == _EXTENSIBLE and len(fmt) >= 26:
+                        # The sub-format GUID starts with the plain format tag.
+                        tag = struct.unpack("<H", fmt[24:26])[0]
+                    encoding = {(_PCM, 16): "s16", (_FLOAT, 32): "f32"}.get((tag, bits))
+                    if encoding is None or not channels or not sample_rate:
+                        return None
+                elif chunk_id == b"data":
+                    if encoding is None:
+                        return None
+                    offset = file.tell()
+                    # Streamed WAVs may leave the size unset; the file end bounds it.
+                    available = path.stat().st_size - offset
+                    return WavFormat(encoding, sample_rate, channels, offset, min(size, available))
+                else:
+                    file.seek(size + size % 2, 1)
+    except (OSError, struct.error):
+        return None
+    return None
+
+
+def read_native_wav(path: Path, sample_rate: int) -> np.ndarray | None:
+    """Float32 samples of a mono PCM WAV at ``sample_rate``, or ``None`` for other files."""
+
+    wav = read_wav_format(path)
+    if wav is None or wav.channels != 1 or wav.sample_rate != sample_rate:
+        return None
+    _, dtype = _ENCODINGS[wav.encoding]
+    samples = np.fromfile(path, dtype=dtype, count=wav.frames, offset=wav.data_offset)
+    if wav.encoding == "s16":
+        return samples.astype(np.float32) / 32768.0
+    return samples.astype(np.float32, copy=False)
+
+
+def wav_duration(path: Path) -> float | None:
+    """The length in seconds of a PCM WAV file, read from its header."""
+
+    wav = read_wav_format(path)
+    return None if wav is None else wav.duration
+
+
+@dataclass(frozen=True, slots=True)
+class RawFormat:
+    encoding: str
+    sample_rate: int
+    channels: int = 1
+    big_endian: bool = False
+
+
+def parse_raw_content_type(content_type: str | None) -> RawFormat | None:
+    """The PCM format named by a raw audio MIME type, or ``None`` for other types.
+
+    Raises ``ValueError`` when a raw audio type has missing or unsupported
+    parameters.
+    """
+
+    media_type, *params = (part.strip() for part in (content_type or "").split(";"))
+    media_type = media_type.lower()
+    if media_type not in RAW_CONTENT_TYPES:
+        return None
+    values = {}
+    for param in params:
+        name, _, value = param.partition("=")
+        values[name.strip().lower()] = value.strip().strip('"')
+    try:
+        sample_rate = int(values["rate"])
+        channels = int(values.get("channels", 1))
+    except (KeyError, ValueError):
+        raise ValueError(f"{media_type} needs an integer rate parameter, e.g. rate=16000")
+    if sample_rate < 1 or channels < 1:
+        raise ValueError("rate and channels must be positive")
+    if media_type == "audio/l16":
+        return RawFormat("s16", sample_rate, channels, big_endian=True)
+    encoding = _RAW_FORMATS.get(values.get("format", "").lower())
+    if encoding is None:
+        raise ValueError(f"audio/x-raw format must be one of: {', '.join(_RAW_FORMATS).upper()}")
+    return RawFormat(encoding, sample_rate, channels)
+
+
+class WavWriter:
+    """Write a raw PCM stream to ``file`` as a little-endian WAV.
+
+    The header is written with the final sizes on ``close``, so the stream
+    length need not be known up front.
+    """
+
+    def __init__(self, file: BinaryIO, raw: RawFormat):
+        self._file = file
+        self._raw = raw
+        self._width = _ENCODINGS[raw.encoding][0]
+        self._pending = b""
+        self._size = 0
+        file.write(bytes(_HEADER.size))
+
+    def write(self, chunk: bytes) -> None:
+        if self._raw.big_endian:
+            chunk = self._pending + chunk
+            whole = len(chunk) - len(chunk) % self._width
+            chunk, self._pending = chunk[:whole], chunk[whole:]
+            chunk = np.frombuffer(chunk, dtype=f">i{self._width}").astype(f"<i{self._width}")
+            chunk = chunk.tobytes()
+        self._file.write(chunk)
+        self._size += len(chunk)
+
+    def close(self) -> None:
+        raw = self._raw
+        block = self._width * raw.channels
+        # A trailing partial frame cannot be played; drop it.
+        self._size -= self._size % block
+        self._file.truncate(_HEADER.size + self._size)
+        self._file.seek(0)
+        self._file.write(
+            _HEADER.pack(
+                b"RIFF",
+                _HEADER.size - 8 + self._size,
+                b"WAVE",
+                b"fmt ",
+                16,
+                _PCM if raw.encoding == "s16" else _FLOAT,
+                raw.channels,
+                raw.sample_rate,
+                raw.sample_rate * block,
+                block,
+                self._width * 8,
+                b"data",
+                self._size,
+            )
+        )
+        self._file.seek(0, 2)
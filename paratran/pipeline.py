@@ -0,0 +1,221 @@
+"""Overlap audio decoding and output handling with inference across files.
+
+``transcribe_file`` decodes, infers, and returns one file at a time, so the
+accelerator idles while ffmpeg decodes the next file and while the previous
+file's outputs are written. ``TranscriptionPipeline`` runs the three stages
+on dedicated threads joined by bounded queues::
+
+    decode (ffmpeg, CPU) -> infer (model, one at a time) -> finish (callback)
+
+The queues hold at most ``queue_size`` decoded files, which bounds how far
+decoding runs ahead of inference.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import queue
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from paratran.contracts import TranscriptionOptions, TranscriptionProgress, TranscriptionResult
+
+DEFAULT_QUEUE_SIZE = 2
+
+Decoder = Callable[[Path, TranscriptionOptions], Any]
+Inferrer = Callable[
+    [Any, TranscriptionOptions, Callable[[], bool] | None, Callable | None], TranscriptionResult
+]
+
+
+@dataclass(slots=True, eq=False)
+class _Job:
+    path: Path
+    options: TranscriptionOptions
+    future: Future
+    is_cancelled: Callable[[], bool] | None
+    progress: Callable[[TranscriptionProgress], None] | None
+    finish: Callable[[TranscriptionResult], Any] | None
+    # The submitter's context, so each stage's trace spans join its trace.
+    context: contextvars.Context
+    audio: Any = None
+    result: TranscriptionResult | None = None
+
+
+def _default_decoder(model_name: str | None, model_dir: str | None) -> Decoder:
+    def decode(path: Path, options: TranscriptionOptions):
+        from paratran.transcribe import (
+            decode_audio,
+            get_model,
+            model_sample_rate,
+            validate_audio_path,
+        )
+
+        path = validate_audio_path(str(path))
+        # The job's own precision, so an int8 or int4 job never loads bf16 weights.
+        model = get_model(model_name, model_dir, options.precision)
+        return decode_audio(path, model_sample_rate(model))
+
+    return decode
+
+
+def _default_inferrer(model_name: str | None, model_dir: str | None) -> Inferrer:
+    def infer(audio, options, is_cancelled, progress) -> TranscriptionResult:
+        from paratran.transcribe import transcribe_decoded
+
+        return transcribe_decoded(
+            audio,
+            options,
+            model_name=model_name,
+            model_dir=model_dir,
+            is_cancelled=is_cancelled,
+            progress=progress,
+        )
+
+    return infer
+
+
+class TranscriptionPipeline:
+    """Decode, infer, and finish files on three threads joined by bounded queues.
+
+    ``decode`` and ``infer`` default to ffmpeg and the loaded model; tests and
+    other callers may pass their own stages. Each stage handles one file at a
+    time, so inference stays serialized on the model while the neighbouring
+    files are decoded and finished.
+    """
+
+    def __init__(
+        self,
+        *,
+        model_name: str | None = None,
+        model_dir: str | None = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        decode: Decoder | None = None,
+        infer: Inferrer | None = None,
+    ):
+        self._decode = decode or _default_decoder(model_name, model_dir)
+        self._infer = infer or _default_inferrer(model_name, model_dir)
+        self._submitted: queue.Queue[_Job | None] = queue.Queue()
+        self._decoded: queue.Queue[_Job | None] = queue.Queue(maxsize=max(queue_size, 1))
+        self._inferred: queue.Queue[_Job | None] = queue.Queue(maxsize=max(queue_size, 1))
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._decode_stage, name="paratran-decode", daemon=True),
+            threading.Thread(target=self._infer_stage, name="paratran-infer", daemon=True),
+            threading.Thread(target=self._finish_stage, name="paratran-finish", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(
+        self,
+        path: str | Path,
+        options: TranscriptionOptions,
+        *,
+        is_cancelled: Callable[[], bool] | None = None,
+        progress: Callable[[TranscriptionProgress], None] | None = None,
+        finish: Callable[[TranscriptionResult], Any] | None = None,
+    ) -> Future:
+        """Queue one file; the future resolves to ``finish(result)``, or the result.
+
+        ``finish`` runs on the finishing thread, so slow output writing for
+        this file overlaps inference of the next one. A future cancelled
+        before decoding starts is skipped.
+        """
+
+        if self._closed:
+            raise RuntimeError("TranscriptionPipeline is closed")
+        future: Future = Future()
+        self._submitted.put(
+            _Job(
+                Path(path),
+                options,
+                future,
+                is_cancelled,
+                progress,
+                finish,
+                contextvars.copy_context(),
+            )
+        )
+        return future
+
+    def transcribe(
+        self,
+        path: str | Path,
+        options: TranscriptionOptions,
+        is_cancelled: Callable[[], bool] | None = None,
+        progress: Callable[[TranscriptionProgress], None] | None = None,
+    ) -> TranscriptionResult:
+        """Blocking ``submit`` with the call shape of ``InferencePool.transcribe``."""
+
+        return self.submit(path, options, is_cancelled=is_cancelled, progress=progress).result()
+
+    def close(self) -> None:
+        """Finish the queued files, then stop the stage threads."""
+
+        if self._closed:
+            return
+        self._closed = True
+        self._submitted.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self) -> TranscriptionPipeline:
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        self.close()
+
+    def _decode_stage(self) -> None:
+        while (job := self._submitted.get()) is not None:
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            try:
+                job.audio = job.context.run(self._decode, job.path, job.options)
+            except Exception as exc:  # noqa: BLE001 - every failure belongs to its future
+                job.future.set_exception(exc)
+                continue
+            self._decoded.put(job)
+        self._decoded.put(None)
+
+    def _infer_stage(self) -> None:
+        while (job := self._decoded.get()) is not None:
+            try:
+                job.result = job.context.run(
+                    self._infer, job.audio, job.options, job.is_cancelled, job.progress
+                )
+            except Exception as exc:  # noqa: BLE001 - every failure belongs to its future
+                job.future.set_exception(exc)
+                continue
+            finally:
+                # Release the samples before blocking on either queue.
+                job.audio = None
+            self._inferred.put(job)
+        self._inferred.put(None)
+
+    def _finish_stage(self) -> None:
+        while (job := self._inferred.get()) is not None:
+            try:
+                value = job.context.run(job.finish, job.result) if job.finish else job.result
+            except Exception as exc:  # noqa: BLE001 - every failure belongs to its future
+                job.future.set_exception(exc)
+                continue
+            job.future.set_result(value)
+
+
+_shared: TranscriptionPipeline | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_pipeline() -> TranscriptionPipeline:
+    """The process-wide pipeline for the configured model, started on first use."""
+
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = TranscriptionPipeline()
+        return _shared
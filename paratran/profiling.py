@@ -0,0 +1,228 @@
+"""Opt-in, rate-limited CPU and memory profiles of single requests.
+
+A ``Capture`` samples the stack of every thread in the process every
+``SAMPLE_INTERVAL`` seconds and tracks allocations with ``tracemalloc``.
+Sampling rather than ``cProfile`` is used because a transcription runs on
+several threads (upload, decode, inference, output), and ``cProfile`` sees
+only the thread that starts it. Stopping a capture writes two files named
+by its id:
+
+``<id>.folded``
+    collapsed stacks, one ``thread;frame;frame count`` line per distinct
+    stack, for flamegraph.pl, speedscope, or inferno. Samples are wall-clock:
+    threads waiting on a queue or the model show up as waiting.
+``<id>.json``
+    the label, wall time, sample count, tracemalloc peak, and the largest
+    allocation sites.
+
+``Profiler`` hands out captures. It starts at most one at a time and at most
+one every ``min_interval`` seconds, so leaving profiling on in production
+costs at most one profiled request per interval. Requests can ask for a
+profile explicitly, or a ``rate`` fraction of requests is picked at random.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import secrets
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any
+
+PROFILE_DIR_ENV = "PARATRAN_PROFILE_DIR"
+PROFILE_RATE_ENV = "PARATRAN_PROFILE_RATE"
+PROFILE_INTERVAL_ENV = "PARATRAN_PROFILE_MIN_INTERVAL"
+DEFAULT_MIN_INTERVAL = 60.0
+SAMPLE_INTERVAL = 0.005
+TOP_ALLOCATIONS = 20
+# Frames kept per stack; deeper frames are dropped from the root end.
+_MAX_DEPTH = 128
+
+_active: ContextVar[str | None] = ContextVar("paratran_profile", default=None)
+
+
+def active_profile() -> str | None:
+    """The id of the capture covering the current request, to forward to workers."""
+
+    return _active.get()
+
+
+@contextmanager
+def covering(capture: Capture) -> Iterator[None]:
+    """Mark code inside as part of ``capture``'s request, for ``active_profile``."""
+
+    token = _active.set(capture.profile_id)
+    try:
+        yield
+    finally:
+        _active.reset(token)
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class Capture:
+    """One running profile; ``stop`` writes it out and returns the JSON path."""
+
+    def __init__(self, profiler: Profiler, profile_id: str, label: str):
+        self.profile_id = profile_id
+        self.label = label
+        self._profiler = profiler
+        self._stacks: Counter[str] = Counter()
+        self._samples = 0
+        self._stopped = threading.Event()
+        self._started_tracemalloc = not tracemalloc.is_tracing()
+        if self._started_tracemalloc:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self._started = time.time()
+        self._clock = time.perf_counter()
+        self._sampler = threading.Thread(target=self._sample, name="paratran-profiler", daemon=True)
+        self._sampler.start()
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        while not self._stopped.wait(self._profiler.sample_interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < _MAX_DEPTH:
+                    stack.append(_frame_name(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self._stacks[";".join(reversed(stack))] += 1
+            self._samples += 1
+
+    def stop(self) -> Path:
+        self._stopped.set()
+        self._sampler.join()
+        wall = time.perf_counter() - self._clock
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        try:
+            return self._write(wall, peak, snapshot.statistics("lineno")[:TOP_ALLOCATIONS])
+        finally:
+            self._profiler._release()
+
+    def _write(self, wall: float, peak: int, allocations: list) -> Path:
+        directory = self._profiler.directory
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"{self.profile_id}.folded").write_text(
+            "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common()),
+            encoding="utf-8",
+        )
+        summary: dict[str, Any] = {
+            "id": self.profile_id,
+            "label": self.label,
+            "pid": os.getpid(),
+            "started": self._started,
+            "wall_seconds": round(wall, 3),
+            "sample_interval": self._profiler.sample_interval,
+            "samples": self._samples,
+            "tracemalloc_peak_bytes": peak,
+            "top_allocations": [
+                {
+                    "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    "bytes": stat.size,
+                    "count": stat.count,
+                }
+                for stat in allocations
+            ],
+        }
+        path = directory / f"{self.profile_id}.json"
+        path.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+        return path
+
+
+class Profiler:
+    """Rate-limited source of ``Capture``s that write to ``directory``."""
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        rate: float = 0.0,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        sample_interval: float = SAMPLE_INTERVAL,
+    ):
+        if not 0 <= rate <= 1:
+            raise ValueError("profile rate must be between 0 and 1")
+        self.directory = directory
+        self.rate = rate
+        self.min_interval = max(min_interval, 0.0)
+        self.sample_interval = sample_interval
+        self._lock = threading.Lock()
+        self._busy = False
+        self._last_start: float | None = None
+
+    @classmethod
+    def from_environment(cls) -> Profiler | None:
+        directory = os.environ.get(PROFILE_DIR_ENV)
+        if not directory:
+            return None
+        try:
+            rate = float(os.environ.get(PROFILE_RATE_ENV, 0.0))
+            min_interval = float(os.environ.get(PROFILE_INTERVAL_ENV, DEFAULT_MIN_INTERVAL))
+        except ValueError:
+            rate, min_interval = 0.0, DEFAULT_MIN_INTERVAL
+        return cls(
+            Path(directory).expanduser(),
+            rate=min(max(rate, 0.0), 1.0),
+            min_interval=min_interval,
+        )
+
+    def start(
+        self, label: str, *, requested: bool = False, profile_id: str | None = None
+    ) -> Capture | None:
+        """A running capture if this request should be profiled, else ``None``.
+
+        Unrequested requests are picked with probability ``rate``. A
+        ``profile_id`` forwarded from a front end that already profiles this
+        request skips the interval check. Either way, a capture already in
+        progress means no new one.
+        """
+
+        if profile_id is None and not requested and random.random() >= self.rate:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            if self._busy:
+                return None
+            if (
+                profile_id is None
+                and self._last_start is not None
+                and now - self._last_start < self.min_interval
+            ):
+                return None
+            self._busy = True
+            self._last_start = now
+        if profile_id is None:
+            profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(4)}"
+        else:
+            profile_id = f"{profile_id}-worker{os.getpid()}"
+        try:
+            return Capture(self, profile_id, label)
+        except BaseException:
+            self._release()
+            raise
+
+    def _release(self) -> None:
+        with self._lock:
+            self._busy = False
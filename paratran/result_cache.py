@@ -0,0 +1,129 @@
+"""Content-addressed cache of finished transcriptions for the REST and MCP interfaces."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from paratran.contracts import DEFAULT_RESULT_CACHE_SIZE, TranscriptionOptions, TranscriptionResult
+
+SHA256_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+CacheKey = tuple[str, str | None, TranscriptionOptions]
+
+
+def file_sha256(path: Path) -> str:
+    """Hash a file in fixed-size blocks so large recordings are never fully buffered."""
+
+    digest = hashlib.sha256()
+    with path.open("rb") as audio_file:
+        while block := audio_file.read(1024 * 1024):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _key_name(key: CacheKey) -> str:
+    sha256, model, options = key
+    encoded = json.dumps([sha256, model, options.to_dict()], sort_keys=True)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class ResultCache:
+    """Bounded LRU mapping ``(sha256, model, options)`` to a transcription result.
+
+    With a ``directory``, results are also written there as JSON, so the HTTP
+    workers of a multi-worker server answer from each other's results. The
+    directory holds at most ``max_entries`` results too, the least recently
+    used removed first.
+    """
+
+    def __init__(self, max_entries: int, directory: Path | None = None):
+        self._max_entries = max(max_entries, 0)
+        self._entries: OrderedDict[CacheKey, TranscriptionResult] = OrderedDict()
+        self._lock = threading.Lock()
+        self.directory = directory
+        if directory is not None:
+            directory.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_environment(cls) -> ResultCache:
+        try:
+            size = int(os.environ.get("PARATRAN_RESULT_CACHE_SIZE", DEFAULT_RESULT_CACHE_SIZE))
+        except ValueError:
+            size = DEFAULT_RESULT_CACHE_SIZE
+        directory = os.environ.get("PARATRAN_RESULT_CACHE_DIR")
+        return cls(size, Path(directory) if directory else None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey) -> TranscriptionResult | None:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+        result = self._read(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, result)
+            return result
+
+    def put(self, key: CacheKey, result: TranscriptionResult) -> None:
+        if self._max_entries == 0:
+            return
+        with self._lock:
+            self._remember(key, result)
+        self._write(key, result)
+
+    def _remember(self, key: CacheKey, result: TranscriptionResult) -> None:
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def _read(self, key: CacheKey) -> TranscriptionResult | None:
+        if self.directory is None or self._max_entries == 0:
+            return None
+        path = self.directory / f"{_key_name(key)}.json"
+        try:
+            result = TranscriptionResult.from_dict(json.loads(path.read_text()))
+            # The modification time orders entries for eviction.
+            os.utime(path)
+        except (OSError, KeyError, TypeError, ValueError):
+            return None
+        return result
+
+    def _write(self, key: CacheKey, result: TranscriptionResult) -> None:
+        if self.directory is None:
+            return
+        path = self.directory / f"{_key_name(key)}.json"
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            temporary.write_text(json.dumps(result.to_dict()))
+            os.replace(temporary, path)
+            entries = sorted(self.directory.glob("*.json"), key=lambda item: item.stat().st_mtime)
+            for stale in entries[: max(len(entries) - self._max_entries, 0)]:
+                stale.unlink(missing_ok=True)
+        except OSError:
+            # The shared copy is an optimization; this worker still has the result.
+            temporary.unlink(missing_ok=True)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self._max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,212 @@
+"""OpenAI-compatible router that spreads transcriptions across Paratran servers."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from contextlib import asynccontextmanager, suppress
+from typing import BinaryIO
+from urllib.error import URLError
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from starlette.datastructures import UploadFile
+
+from paratran.client import RETRYABLE_STATUSES, BackendPool, http_request, post_multipart
+from paratran.contracts import DEFAULT_HTTP_TIMEOUT
+from paratran.http_common import max_upload_bytes, require_api_key
+from paratran.scheduler import BYTES_PER_AUDIO_SECOND
+
+DEFAULT_HEALTH_INTERVAL = 5.0
+DEFAULT_ROUTER_RETRIES = 2
+# Room for the form fields and multipart framing around the audio part.
+_FORM_OVERHEAD_BYTES = 1024 * 1024
+
+
+class _BodyTooLarge(Exception):
+    """Raised while reading a request body that cannot hold an upload within the limit."""
+
+
+def _upload_too_large() -> JSONResponse:
+    return JSONResponse(
+        status_code=413,
+        content={
+            "error": f"Uploaded file exceeds the {max_upload_bytes() // (1024 * 1024)} MB limit"
+        },
+    )
+
+
+def _capped_form_request(request: Request, limit: int) -> Request:
+    """``request`` with a body that raises ``_BodyTooLarge`` past ``limit`` plus form overhead.
+
+    Starlette spools file parts to disk without a size limit, so the cap
+    applies while the body is read, before the form is parsed.
+    """
+
+    receive = request.receive
+    received = 0
+
+    async def capped_receive():
+        nonlocal received
+        message = await receive()
+        received += len(message.get("body", b""))
+        if received > limit + _FORM_OVERHEAD_BYTES:
+            raise _BodyTooLarge
+        return message
+
+    return Request(request.scope, capped_receive)
+
+
+def _backend_healthy(url: str, headers: dict[str, str]) -> bool:
+    try:
+        status, _, body = http_request(
+            "GET", f"{url}/health", headers=headers, timeout=2.0, allow_status=frozenset({503})
+        )
+        return status == 200 and json.loads(body).get("status") == "ok"
+    except (URLError, OSError, ValueError):
+        return False
+
+
+def create_router(
+    backends: list[str],
+    *,
+    backend_api_key: str | None = None,
+    retries: int = DEFAULT_ROUTER_RETRIES,
+    health_interval: float = DEFAULT_HEALTH_INTERVAL,
+    timeout: float = DEFAULT_HTTP_TIMEOUT,
+) -> FastAPI:
+    """Build a router app; health checks run while the app's lifespan is active."""
+
+    pool = BackendPool(backends)
+    backend_headers = {"Authorization": f"Bearer {backend_api_key}"} if backend_api_key else {}
+
+    async def check_health() -> None:
+        results = await asyncio.gather(
+            *(
+                asyncio.to_thread(_backend_healthy, backend.url, backend_headers)
+                for backend in pool.backends
+            )
+        )
+        for backend, healthy in zip(pool.backends, results, strict=True):
+            pool.mark(backend, healthy)
+
+    async def health_loop() -> None:
+        while True:
+            await check_health()
+            await asyncio.sleep(health_interval)
+
+    @asynccontextmanager
+    async def lifespan(_application: FastAPI):
+        task = asyncio.create_task(health_loop()) if health_interval > 0 else None
+        try:
+            yield
+        finally:
+            if task is not None:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+
+    router = FastAPI(
+        title="Paratran router",
+        description="Load balancer for OpenAI-compatible Paratran transcription servers",
+        lifespan=lifespan,
+    )
+    router.state.pool = pool
+
+    @router.get("/health")
+    def health():
+        backends_state = pool.snapshot()
+        healthy = sum(backend["healthy"] for backend in backends_state)
+        return {
+            "status": "ok" if healthy else "unavailable",
+            "healthy_backends": healthy,
+            "backends": backends_state,
+        }
+
+    @router.post("/v1/audio/transcriptions", dependencies=[Depends(require_api_key)])
+    async def transcribe(request: Request):
+        limit = max_upload_bytes()
+        try:
+            declared = int(request.headers.get("content-length", 0))
+        except ValueError:
+            declared = 0
+        if declared > limit + _FORM_OVERHEAD_BYTES:
+            return _upload_too_large()
+        try:
+            form = await _capped_form_request(request, limit).form()
+        except _BodyTooLarge:
+            return _upload_too_large()
+        try:
+            upload = form.get("file")
+            if not isinstance(upload, UploadFile):
+                return JSONResponse(
+                    status_code=400, content={"error": "A 'file' upload is required"}
+                )
+            if upload.size is not None and upload.size > limit:
+                return _upload_too_large()
+            fields = {name: value for name, value in form.multi_items() if isinstance(value, str)}
+            # The spooled part is sent as is; backends probe the real duration,
+            # so balancing only needs a size estimate.
+            size = upload.size if upload.size is not None else 0
+            cost = size / BYTES_PER_AUDIO_SECOND
+            return await _forward(upload.file, upload.filename or "audio", fields, cost)
+        finally:
+            await form.close()
+
+    async def _forward(audio: BinaryIO, filename: str, fields: dict[str, str], cost: float):
+        tried: set[str] = set()
+        last_error = "No backends configured"
+        # Retry-After of backends that shed the request; used only if all did.
+        retry_after: list[int] = []
+        shed_by_all = True
+        for _attempt in range(max(retries, 0) + 1):
+            backend = pool.acquire(cost, tried)
+            if backend is None:
+                break
+            tried.add(backend.url)
+            try:
+                status, headers, body = await asyncio.to_thread(
+                    post_multipart,
+                    f"{backend.url}/v1/audio/transcriptions",
+                    audio,
+                    fields,
+                    headers=backend_headers,
+                    timeout=timeout,
+                    filename=filename,
+                )
+            except URLError as exc:
+                pool.release(backend, cost, ok=False)
+                last_error = f"{backend.url}: {exc.reason}"
+                shed_by_all = False
+                continue
+            retryable = status in RETRYABLE_STATUSES
+            pool.release(backend, cost, ok=not retryable)
+            if retryable:
+                last_error = f"{backend.url} returned {status}"
+                try:
+                    retry_after.append(int(headers.get("Retry-After", "")))
+                except ValueError:
+                    shed_by_all = False
+                continue
+            response_headers = {"X-Paratran-Backend": backend.url}
+            if cache := headers.get("X-Paratran-Cache"):
+                response_headers["X-Paratran-Cache"] = cache
+            return Response(
+                content=body,
+                status_code=status,
+                media_type=headers.get("Content-Type"),
+                headers=response_headers,
+            )
+        if shed_by_all and retry_after:
+            # Every backend is busy rather than down: their own estimate of
+            # when a slot frees up beats the health-check interval.
+            wait = max(min(retry_after), 1)
+        else:
+            wait = max(int(health_interval), 1)
+        return JSONResponse(
+            status_code=503,
+            content={"error": "No backend could handle the request", "detail": last_error},
+            headers={"Retry-After": str(wait)},
+        )
+
+    return router
@@ -0,0 +1,591 @@
+"""Priority and fair-share scheduling for REST transcription jobs."""
+
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import itertools
+import json
+import math
+import os
+import re
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from paratran.contracts import (
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_QUEUE,
+    DEFAULT_MAX_QUEUED_AUDIO_SECONDS,
+    PRIORITIES,
+    TranscriptionProgress,
+)
+from paratran.memory import MemoryGovernor
+
+# Assumed real-time factor (processing seconds per audio second) until the
+# server has finished a job of its own.
+DEFAULT_REAL_TIME_FACTOR = 0.05
+_RTF_SMOOTHING = 0.2
+# How often a job held back by another HTTP worker's slots checks them again.
+_SHARED_SLOT_POLL_SECONDS = 0.05
+# 128 kbps: the audio length assumed for a file whose duration is unknown.
+BYTES_PER_AUDIO_SECOND = 16_000
+
+
+def probe_audio_seconds(path: Path) -> float:
+    """Expected audio length for scheduling; falls back to a 128 kbps size estimate."""
+
+    from paratran.transcribe import _audio_duration
+
+    return _audio_duration(path, path.stat().st_size / BYTES_PER_AUDIO_SECOND)
+
+
+def _max_concurrency() -> int:
+    try:
+        return max(
+            int(os.environ.get("PARATRAN_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
+            1,
+        )
+    except ValueError:
+        return DEFAULT_MAX_CONCURRENCY
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return max(int(os.environ.get(name, default)), 0)
+    except ValueError:
+        return default
+
+
+def _float_env(name: str, default: float) -> float:
+    try:
+        return max(float(os.environ.get(name, default)), 0.0)
+    except ValueError:
+        return default
+
+
+def client_account(client: str) -> str:
+    """The identity fair share and per-client limits count ``client`` under.
+
+    ``tenant/label`` is a job labelled within ``tenant``, so rotating labels
+    gains a caller nothing.
+    """
+
+    return client.partition("/")[0]
+
+
+class AdmissionError(Exception):
+    """Raised when a job is shed instead of queued."""
+
+    def __init__(self, status_code: int, message: str, retry_after: int):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+@dataclass(slots=True, eq=False)
+class Job:
+    client: str
+    priority: str
+    audio_seconds: float
+    sequence: int
+    enqueued: float = field(default_factory=time.monotonic)
+    started_at: float | None = None
+    started: asyncio.Future | None = None
+    job_id: str = ""
+    memory_bytes: int = 0
+    # Replaced from the inference thread; a single attribute store needs no lock.
+    progress: TranscriptionProgress | None = None
+    # The ``SharedSlots`` slot file this job holds locked while it runs.
+    shared_slot: BinaryIO | None = None
+
+    def sort_key(self, usage: float, now: float) -> tuple[int, float, float, int]:
+        # Priority class first, then the client that has been served the least
+        # audio, then the shortest job. Waiting time is credited against the
+        # job length so a long recording cannot be starved indefinitely.
+        expected = max(self.audio_seconds - (now - self.enqueued), 0.0)
+        return (PRIORITIES.index(self.priority), usage, expected, self.sequence)
+
+
+class JobBoard:
+    """Job status files in a directory shared by the HTTP workers of one server.
+
+    A worker publishes the status of its own jobs, so ``GET /v1/jobs/{id}``
+    answers from whichever worker the request reaches.
+    """
+
+    _JOB_ID = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, job_id: str) -> Path | None:
+        return self.directory / f"{job_id}.json" if self._JOB_ID.match(job_id) else None
+
+    def publish(self, status: dict[str, Any]) -> None:
+        path = self._path(status["id"])
+        if path is None:
+            return
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            temporary.write_text(json.dumps({**status, "published": time.time()}))
+            os.replace(temporary, path)
+        except OSError:
+            temporary.unlink(missing_ok=True)
+
+    def withdraw(self, job_id: str) -> None:
+        if (path := self._path(job_id)) is not None:
+            path.unlink(missing_ok=True)
+
+    def read(self, job_id: str) -> dict[str, Any] | None:
+        path = self._path(job_id)
+        if path is None:
+            return None
+        try:
+            status = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        elapsed = max(time.time() - status.pop("published", time.time()), 0.0)
+        for clock in ("running_seconds", "waited_seconds"):
+            if clock in status:
+                status[clock] = round(status[clock] + elapsed, 3)
+        return status
+
+
+class SharedSlots:
+    """Concurrency slots in a directory shared by the HTTP workers of one server.
+
+    Each worker keeps its own queue, but a job starts only once it holds one
+    of ``count`` slot files with ``flock``, so the server as a whole runs at
+    most ``count`` jobs. A held slot records its job's memory estimate, so the
+    memory budget also holds across workers. A worker that exits releases its
+    slots with its file descriptors.
+    """
+
+    def __init__(self, directory: Path, count: int):
+        self.directory = directory
+        directory.mkdir(parents=True, exist_ok=True)
+        self._paths = [directory / f"slot-{index}" for index in range(max(count, 1))]
+        for path in self._paths:
+            path.touch()
+        self._guard = directory / "slots.lock"
+
+    def _held_bytes(self) -> tuple[list[Path], int]:
+        """Free slot files, and the memory recorded in the held ones."""
+
+        free, reserved = [], 0
+        for path in self._paths:
+            with path.open("rb") as slot_file:
+                try:
+                    fcntl.flock(slot_file, fcntl.LOCK_SH | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    reserved += int(slot_file.read() or 0)
+                    continue
+            free.append(path)
+        return free, reserved
+
+    def reserved_bytes(self) -> int:
+        return self._held_bytes()[1]
+
+    def acquire(self, memory_bytes: int, budget_bytes: int) -> BinaryIO | None:
+        """Lock a free slot for a job, or return ``None`` if none is free or it would not fit.
+
+        As in one process, a job always fits when no other job is running.
+        """
+
+        with self._guard.open("ab") as guard:
+            # Serializes the free-slot and budget check with taking the slot.
+            fcntl.flock(guard, fcntl.LOCK_EX)
+            free, reserved = self._held_bytes()
+            running = len(self._paths) - len(free)
+            if running and budget_bytes and reserved + memory_bytes > budget_bytes:
+                return None
+            for path in free:
+                slot_file = path.open("r+b")
+                try:
+                    fcntl.flock(slot_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    slot_file.close()
+                    continue
+                slot_file.truncate(0)
+                slot_file.write(str(memory_bytes).encode())
+                slot_file.flush()
+                return slot_file
+        return None
+
+    @staticmethod
+    def release(slot_file: BinaryIO) -> None:
+        slot_file.truncate(0)
+        slot_file.close()
+
+
+@dataclass(slots=True, eq=False)
+class Reservation:
+    """A queue place held for a request whose upload is still arriving."""
+
+    client: str
+    audio_seconds: float = 0.0
+
+
+class TranscriptionScheduler:
+    """Admit at most ``max_concurrency`` jobs, choosing the next one on every release.
+
+    ``max_queue``, ``max_queued_audio_seconds`` and ``max_queue_per_client``
+    bound the work allowed to wait; ``0`` disables a limit. A job that can
+    start immediately is never shed. A ``Reservation`` taken with ``reserve``
+    counts as a queued job until it is passed to ``acquire`` or cancelled.
+    With a ``memory`` budget, the next job
+    also waits until its estimated peak fits beside the running jobs; a job
+    always starts once nothing else is running. With ``slots``, both limits
+    hold across every scheduler sharing them.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        *,
+        max_queue: int = 0,
+        max_queued_audio_seconds: float = 0.0,
+        max_queue_per_client: int = 0,
+        memory: MemoryGovernor | None = None,
+        board: JobBoard | None = None,
+        slots: SharedSlots | None = None,
+    ):
+        self.max_concurrency = max(max_concurrency, 1)
+        self.memory = memory or MemoryGovernor(0, self.max_concurrency)
+        self.max_queue = max(max_queue, 0)
+        self.max_queued_audio_seconds = max(max_queued_audio_seconds, 0.0)
+        self.max_queue_per_client = max(max_queue_per_client, 0)
+        self.board = board
+        self.slots = slots
+        self._slot_retry: asyncio.TimerHandle | None = None
+        self.real_time_factor = DEFAULT_REAL_TIME_FACTOR
+        self.rejected = 0
+        self.cancelled = 0
+        self._queued: list[Job] = []
+        self._running: list[Job] = []
+        self._reservations: list[Reservation] = []
+        self._usage: defaultdict[str, float] = defaultdict(float)
+        self._sequence = itertools.count()
+
+    @classmethod
+    def from_environment(cls) -> TranscriptionScheduler:
+        """Limits shared by ``paratran serve`` and ``paratran-mcp``, read from the environment.
+
+        Each of ``PARATRAN_HTTP_WORKERS`` processes keeps its own queue, so the
+        queue length and queued-audio limits are split between them to hold
+        for the server as a whole. Concurrency and the memory budget are
+        enforced together through the slots in ``PARATRAN_SLOT_DIR``.
+        """
+
+        max_concurrency = _max_concurrency()
+        workers = max(_int_env("PARATRAN_HTTP_WORKERS", 1), 1)
+        board = os.environ.get("PARATRAN_JOB_STATUS_DIR")
+        slots = os.environ.get("PARATRAN_SLOT_DIR")
+        return cls(
+            max_concurrency,
+            max_queue=math.ceil(_int_env("PARATRAN_MAX_QUEUE", DEFAULT_MAX_QUEUE) / workers),
+            max_queued_audio_seconds=_float_env(
+                "PARATRAN_MAX_QUEUED_AUDIO_SECONDS", DEFAULT_MAX_QUEUED_AUDIO_SECONDS
+            )
+            / workers,
+            max_queue_per_client=_int_env("PARATRAN_MAX_QUEUE_PER_CLIENT", 0),
+            memory=MemoryGovernor(
+                _int_env("PARATRAN_MEMORY_BUDGET_MB", 0) * 1024 * 1024, max_concurrency
+            ),
+            board=JobBoard(Path(board)) if board else None,
+            slots=SharedSlots(Path(slots), max_concurrency) if slots else None,
+        )
+
+    @property
+    def queued(self) -> list[Job]:
+        return list(self._queued)
+
+    @property
+    def running(self) -> list[Job]:
+        return list(self._running)
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        client: str,
+        priority: str = "normal",
+        audio_seconds: float = 0.0,
+        job_id: str = "",
+        memory_bytes: int = 0,
+    ):
+        job = await self.acquire(client, priority, audio_seconds, job_id, memory_bytes)
+        try:
+            yield job
+        finally:
+            self.release(job)
+
+    async def acquire(
+        self,
+        client: str,
+        priority: str,
+        audio_seconds: float,
+        job_id: str = "",
+        memory_bytes: int = 0,
+        reservation: Reservation | None = None,
+    ) -> Job:
+        if priority not in PRIORITIES:
+            raise ValueError(
+                f"Invalid priority '{priority}'. Must be one of: {', '.join(PRIORITIES)}"
+            )
+        if reservation is not None:
+            # The job takes the reservation's place, now with the probed duration.
+            self.cancel_reservation(reservation)
+        self.check_admission(client, audio_seconds)
+        job = Job(
+            client=client,
+            priority=priority,
+            audio_seconds=max(audio_seconds, 0.0),
+            sequence=next(self._sequence),
+            started=asyncio.get_running_loop().create_future(),
+            job_id=job_id,
+            memory_bytes=memory_bytes,
+        )
+        self._queued.append(job)
+        self._dispatch()
+        try:
+            await job.started
+        except asyncio.CancelledError:
+            self.record_cancelled()
+            if job in self._queued:
+                self._queued.remove(job)
+                self._forget_idle(job.client)
+                self._publish()
+            else:
+                self.release(job)
+            if self.board is not None:
+                self.board.withdraw(job.job_id)
+            raise
+        return job
+
+    def reserve(self, client: str, audio_seconds: float = 0.0) -> Reservation:
+        """Admit a request before its body is read and hold its place in the queue.
+
+        ``audio_seconds`` is an estimate, typically from the request size.
+        Raises ``AdmissionError`` like ``check_admission``.
+        """
+
+        self.check_admission(client, audio_seconds)
+        reservation = Reservation(client, max(audio_seconds, 0.0))
+        self._reservations.append(reservation)
+        return reservation
+
+    def cancel_reservation(self, reservation: Reservation) -> None:
+        """Give up a reservation; does nothing if ``acquire`` already took it."""
+
+        if reservation in self._reservations:
+            self._reservations.remove(reservation)
+
+    def _waiting(self) -> list[Job | Reservation]:
+        """Queued jobs, and the reservations that will queue rather than start."""
+
+        free = max(self.max_concurrency - len(self._running) - len(self._queued), 0)
+        return [*self._queued, *self._reservations[free:]]
+
+    def check_admission(self, client: str, audio_seconds: float = 0.0) -> None:
+        """Raise ``AdmissionError`` if a new job from ``client`` would exceed a queue limit."""
+
+        if not self._queued and len(self._running) + len(self._reservations) < self.max_concurrency:
+            return
+        waiting = self._waiting()
+        queued_seconds = sum(item.audio_seconds for item in waiting)
+        if self.max_queue and len(waiting) >= self.max_queue:
+            self._reject(503, f"Transcription queue is full ({self.max_queue} jobs waiting)")
+        if self.max_queued_audio_seconds and (
+            queued_seconds + audio_seconds > self.max_queued_audio_seconds
+            or queued_seconds >= self.max_queued_audio_seconds
+        ):
+            self._reject(
+                503,
+                "Transcription queue holds too much audio "
+                f"({queued_seconds:.0f}s queued, limit {self.max_queued_audio_seconds:.0f}s)",
+            )
+        if self.max_queue_per_client and (
+            sum(client_account(item.client) == client_account(client) for item in waiting)
+            >= self.max_queue_per_client
+        ):
+            self._reject(
+                429, f"Client already has {self.max_queue_per_client} transcriptions queued"
+            )
+
+    def _reject(self, status_code: int, message: str) -> None:
+        self.rejected += 1
+        raise AdmissionError(status_code, message, self.retry_after())
+
+    def record_cancelled(self) -> None:
+        """Count a job abandoned by its client, whether queued or mid-inference."""
+
+        self.cancelled += 1
+
+    def retry_after(self) -> int:
+        """Seconds until a queue slot is likely to free up, from the observed speed."""
+
+        now = time.monotonic()
+        running = sum(
+            max(job.audio_seconds * self.real_time_factor - (now - (job.started_at or now)), 0.0)
+            for job in self._running
+        )
+        queued = sum(item.audio_seconds for item in self._waiting()) * self.real_time_factor
+        return max(math.ceil((running + queued) / self.max_concurrency), 1)
+
+    def observe(self, audio_seconds: float, processing_seconds: float) -> None:
+        """Fold a finished job into the moving real-time factor."""
+
+        if audio_seconds <= 0 or processing_seconds <= 0:
+            return
+        sample = processing_seconds / audio_seconds
+        self.real_time_factor += _RTF_SMOOTHING * (sample - self.real_time_factor)
+
+    def release(self, job: Job) -> None:
+        if job in self._running:
+            self._running.remove(job)
+            if job.shared_slot is not None:
+                SharedSlots.release(job.shared_slot)
+                job.shared_slot = None
+            self._forget_idle(job.client)
+            if self.board is not None:
+                self.board.withdraw(job.job_id)
+        self._dispatch()
+
+    def report_progress(self, job: Job, progress: TranscriptionProgress) -> None:
+        """Record inference progress; safe to call from the inference thread."""
+
+        job.progress = progress
+        if self.board is not None:
+            self.board.publish(self._running_status(job, time.monotonic()))
+
+    def _publish(self) -> None:
+        """Refresh the board after queue positions may have changed."""
+
+        if self.board is None:
+            return
+        now = time.monotonic()
+        for job in self._running:
+            self.board.publish(self._running_status(job, now))
+        for position, job in enumerate(self._ordered(now)):
+            self.board.publish(self._queued_status(job, position, now))
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        while self._queued and len(self._running) < self.max_concurrency:
+            job = min(self._queued, key=lambda item: self._sort_key(item, now))
+            if self._running and not self._fits_memory(job):
+                # Later jobs are not started ahead of it, so a large job is
+                # delayed until memory frees up rather than starved by small ones.
+                break
+            if self.slots is not None:
+                job.shared_slot = self.slots.acquire(job.memory_bytes, self.memory.budget_bytes)
+                if job.shared_slot is None:
+                    # Held by other workers, whose releases this one does not see.
+                    self._retry_shared_slots()
+                    break
+            self._queued.remove(job)
+            self._running.append(job)
+            job.started_at = now
+            self._usage[client_account(job.client)] += job.audio_seconds
+            if job.started is not None and not job.started.done():
+                job.started.set_result(None)
+        self._publish()
+
+    def _retry_shared_slots(self) -> None:
+        if self._slot_retry is not None and not self._slot_retry.cancelled():
+            return
+
+        def retry() -> None:
+            self._slot_retry = None
+            self._dispatch()
+
+        self._slot_retry = asyncio.get_running_loop().call_later(_SHARED_SLOT_POLL_SECONDS, retry)
+
+    def _reserved_bytes(self) -> int:
+        if self.slots is not None:
+            return self.slots.reserved_bytes()
+        return sum(job.memory_bytes for job in self._running)
+
+    def _fits_memory(self, job: Job) -> bool:
+        budget = self.memory.budget_bytes
+        return not budget or self._reserved_bytes() + job.memory_bytes <= budget
+
+    def _forget_idle(self, client: str) -> None:
+        # Usage only matters relative to clients that are competing right now;
+        # a client that returns after going idle starts level with everyone else.
+        account = client_account(client)
+        if not any(
+            client_account(job.client) == account for job in (*self._queued, *self._running)
+        ):
+            self._usage.pop(account, None)
+
+    def _sort_key(self, job: Job, now: float) -> tuple[int, float, float, int]:
+        return job.sort_key(self._usage[client_account(job.client)], now)
+
+    def _ordered(self, now: float) -> list[Job]:
+        return sorted(self._queued, key=lambda item: self._sort_key(item, now))
+
+    @staticmethod
+    def _running_status(job: Job, now: float) -> dict[str, Any]:
+        return {
+            "id": job.job_id,
+            "state": "running",
+            "priority": job.priority,
+            "audio_seconds": round(job.audio_seconds, 3),
+            "running_seconds": round(now - (job.started_at or now), 3),
+            "progress": job.progress.to_dict() if job.progress else None,
+        }
+
+    @staticmethod
+    def _queued_status(job: Job, position: int, now: float) -> dict[str, Any]:
+        return {
+            "id": job.job_id,
+            "state": "queued",
+            "priority": job.priority,
+            "audio_seconds": round(job.audio_seconds, 3),
+            "queue_position": position,
+            "waited_seconds": round(now - job.enqueued, 3),
+        }
+
+    def job_status(self, job_id: str) -> dict[str, Any] | None:
+        """Queue position or inference progress for a waiting or running job.
+
+        Jobs of other HTTP workers are answered from the shared ``board``.
+        """
+
+        now = time.monotonic()
+        for job in self._running:
+            if job.job_id == job_id:
+                return self._running_status(job, now)
+        for position, job in enumerate(self._ordered(now)):
+            if job.job_id == job_id:
+                return self._queued_status(job, position, now)
+        return self.board.read(job_id) if self.board is not None else None
+
+    def snapshot(self) -> dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "max_concurrency": self.max_concurrency,
+            "running": len(self._running),
+            "queued": len(self._queued),
+            "reserved": len(self._reservations),
+            "queued_audio_seconds": round(sum(job.audio_seconds for job in self._queued), 3),
+            "queued_by_priority": {
+                priority: sum(job.priority == priority for job in self._queued)
+                for priority in PRIORITIES
+            },
+            "oldest_wait_seconds": round(
+                max((now - job.enqueued for job in self._queued), default=0.0), 3
+            ),
+            "clients": len({client_account(job.client) for job in (*self._queued, *self._running)}),
+            "real_time_factor": round(self.real_time_factor, 4),
+            "estimated_wait_seconds": self.retry_after() if self._queued else 0,
+            "rejected": self.rejected,
+            "cancelled": self.cancelled,
+            "memory": self.memory.snapshot(self._reserved_bytes()),
+        }
@@ -0,0 +1,237 @@
+"""Phrase search with timestamps over saved ``.json`` transcripts.
+
+``paratran index`` records every sentence of each transcript in an SQLite
+FTS5 table, together with the start and end time of each of its words.
+``paratran search`` runs the phrase against the full-text index and then finds
+it among the sentence's words, so each hit names the transcript and the
+seconds at which the phrase was spoken. Phrases are matched within one
+sentence.
+
+Each transcript's modification time and size are recorded, so re-indexing a
+directory only reads files that changed. The CLI's ``--index`` option adds
+each JSON output as it is written.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import unicodedata
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from paratran.contracts import Sentence, TranscriptionResult
+
+DEFAULT_SEARCH_LIMIT = 20
+
+_TERM_PATTERN = re.compile(r"\w+")
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    duration REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sentences (
+    id INTEGER PRIMARY KEY,
+    transcript_id INTEGER NOT NULL REFERENCES transcripts (id),
+    start_time REAL NOT NULL,
+    end_time REAL NOT NULL,
+    text TEXT NOT NULL,
+    words TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sentences_by_transcript ON sentences (transcript_id);
+-- Shares rowids with sentences, so a transcript's rows are deleted by rowid.
+CREATE VIRTUAL TABLE IF NOT EXISTS sentence_text USING fts5(
+    text, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class SearchHit:
+    path: str
+    start: float
+    end: float
+    text: str
+
+    def to_dict(self) -> dict[str, str | float]:
+        return {"path": self.path, "start": self.start, "end": self.end, "text": self.text}
+
+
+@dataclass(slots=True)
+class IndexStats:
+    indexed: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    skipped: int = 0
+
+
+def default_index_path() -> Path:
+    """``PARATRAN_INDEX``, or ``paratran/index.db`` in the user cache directory."""
+
+    if configured := os.environ.get("PARATRAN_INDEX"):
+        return Path(configured).expanduser()
+    cache = os.environ.get("XDG_CACHE_HOME", "~/.cache")
+    return Path(cache).expanduser() / "paratran" / "index.db"
+
+
+def _terms(text: str) -> list[str]:
+    # Fold case and accents the way the unicode61 tokenizer does, so phrases
+    # found by FTS5 can be found again among the stored words.
+    text = text.casefold()
+    if not text.isascii():
+        decomposed = unicodedata.normalize("NFKD", text)
+        text = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _TERM_PATTERN.findall(text)
+
+
+def sentence_words(sentence: Sentence) -> list[tuple[str, float, float]]:
+    """``(term, start, end)`` for each term of ``sentence``, timed by its tokens.
+
+    Subword tokens are joined into words first: Parakeet marks the start of a
+    word with a leading space. Sentences without tokens share their own times.
+    """
+
+    if not sentence.tokens:
+        return [(term, sentence.start, sentence.end) for term in _terms(sentence.text)]
+    words: list[list] = []
+    for token in sentence.tokens:
+        if words and not token.text.startswith(" "):
+            words[-1][0] += token.text
+            words[-1][2] = token.end
+        else:
+            words.append([token.text, token.start, token.end])
+    return [(term, start, end) for text, start, end in words for term in _terms(text)]
+
+
+def _phrase_positions(words: list[list], terms: list[str]) -> Iterator[tuple[float, float]]:
+    for index in range(len(words) - len(terms) + 1):
+        if all(words[index + offset][0] == term for offset, term in enumerate(terms)):
+            yield words[index][1], words[index + len(terms) - 1][2]
+
+
+class TranscriptIndex:
+    """An SQLite full-text index of transcripts, keyed by their JSON file path."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        # WAL lets searches run while another process is indexing; with WAL,
+        # NORMAL sync can lose only the last commits on power loss, never corrupt.
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> TranscriptIndex:
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        self.close()
+
+    def add(self, path: Path, result: TranscriptionResult) -> None:
+        """Index ``result`` as the contents of ``path``, replacing any earlier version."""
+
+        path = path.resolve()
+        stat = path.stat()
+        with self._db:
+            self._delete(str(path))
+            transcript_id = self._db.execute(
+                "INSERT INTO transcripts (path, mtime_ns, size, duration) VALUES (?, ?, ?, ?)",
+                (str(path), stat.st_mtime_ns, stat.st_size, result.duration),
+            ).lastrowid
+            for sentence in result.sentences:
+                sentence_id = self._db.execute(
+                    "INSERT INTO sentences (transcript_id, start_time, end_time, text, words) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (
+                        transcript_id,
+                        sentence.start,
+                        sentence.end,
+                        sentence.text,
+                        json.dumps(sentence_words(sentence), separators=(",", ":")),
+                    ),
+                ).lastrowid
+                self._db.execute(
+                    "INSERT INTO sentence_text (rowid, text) VALUES (?, ?)",
+                    (sentence_id, sentence.text),
+                )
+
+    def update(self, paths: Iterable[Path]) -> IndexStats:
+        """Index the ``.json`` transcripts in ``paths`` (files or directories).
+
+        Files whose modification time and size are unchanged are skipped, and
+        files under an indexed directory that no longer exist are removed.
+        Files that are not Paratran transcripts count as ``skipped``.
+        """
+
+        stats = IndexStats()
+        known = {
+            path: (mtime_ns, size)
+            for path, mtime_ns, size in self._db.execute(
+                "SELECT path, mtime_ns, size FROM transcripts"
+            )
+        }
+        for root in paths:
+            root = root.resolve()
+            files = sorted(root.rglob("*.json")) if root.is_dir() else [root]
+            for file in files:
+                stat = file.stat()
+                if known.get(str(file)) == (stat.st_mtime_ns, stat.st_size):
+                    stats.unchanged += 1
+                    continue
+                try:
+                    result = TranscriptionResult.from_dict(json.loads(file.read_bytes()))
+                except (KeyError, TypeError, ValueError):
+                    stats.skipped += 1
+                    continue
+                self.add(file, result)
+                stats.indexed += 1
+            if root.is_dir():
+                for path in known:
+                    if Path(path).is_relative_to(root) and not Path(path).exists():
+                        with self._db:
+                            self._delete(path)
+                        stats.removed += 1
+        return stats
+
+    def _delete(self, path: str) -> None:
+        row = self._db.execute("SELECT id FROM transcripts WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            return
+        self._db.execute(
+            "DELETE FROM sentence_text WHERE rowid IN "
+            "(SELECT id FROM sentences WHERE transcript_id = ?)",
+            row,
+        )
+        self._db.execute("DELETE FROM sentences WHERE transcript_id = ?", row)
+        self._db.execute("DELETE FROM transcripts WHERE id = ?", row)
+
+    def search(self, phrase: str, limit: int = DEFAULT_SEARCH_LIMIT) -> list[SearchHit]:
+        """Where ``phrase`` was said, best matches first; case and punctuation are ignored."""
+
+        terms = _terms(phrase)
+        if not terms:
+            return []
+        rows = self._db.execute(
+            "SELECT transcripts.path, sentences.text, sentences.start_time, "
+            "sentences.end_time, sentences.words "
+            "FROM sentence_text "
+            "JOIN sentences ON sentences.id = sentence_text.rowid "
+            "JOIN transcripts ON transcripts.id = sentences.transcript_id "
+            "WHERE sentence_text MATCH ? ORDER BY sentence_text.rank LIMIT ?",
+            ('"' + " ".join(terms) + '"', limit),
+        )
+        hits: list[SearchHit] = []
+        for path, text, start, end, words in rows:
+            positions = list(_phrase_positions(json.loads(words), terms)) or [(start, end)]
+            hits.extend(SearchHit(path, first, last, text.strip()) for first, last in positions)
+        return hits[:limit]
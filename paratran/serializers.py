@@ -4,10 +4,14 @@ from __future__ import annotations
 
 import json
 from collections.abc import Iterable
+from itertools import islice
 from pathlib import Path
 from typing import Any
 
+from paratran import tracing
 from paratran.contracts import (
+    DEFAULT_TOKEN_PAGE_SIZE,
+    MCP_OUTPUT_MODES,
     OUTPUT_FORMATS,
     RESPONSE_FORMATS,
     Sentence,
@@ -26,6 +30,11 @@ def format_timestamp(seconds: float, separator: str) -> str:
     return f"{hours:02d}:{minutes:02d}:{whole_seconds:02d}{separator}{milliseconds:03d}"
 
 
+def _cue_text(sentence: Sentence) -> str:
+    text = sentence.text.strip()
+    return f"{sentence.speaker}: {text}" if sentence.speaker else text
+
+
 def to_srt(result: TranscriptionResult) -> str:
     lines: list[str] = []
     for index, sentence in enumerate(result.sentences, 1):
@@ -34,7 +43,7 @@ def to_srt(result: TranscriptionResult) -> str:
                 str(index),
                 f"{format_timestamp(sentence.start, ',')} --> "
                 f"{format_timestamp(sentence.end, ',')}",
-                sentence.text.strip(),
+                _cue_text(sentence),
                 "",
             ]
         )
@@ -48,7 +57,10 @@ def to_vtt(result: TranscriptionResult) -> str:
             [
                 f"{format_timestamp(sentence.start, '.')} --> "
                 f"{format_timestamp(sentence.end, '.')}",
-                sentence.text.strip(),
+                # WebVTT's voice span names the speaker.
+                f"<v {sentence.speaker}>{sentence.text.strip()}"
+                if sentence.speaker
+                else sentence.text.strip(),
                 "",
             ]
         )
@@ -56,17 +68,18 @@ def to_vtt(result: TranscriptionResult) -> str:
 
 
 def render_cli(result: TranscriptionResult, output_format: str) -> str:
-    if output_format == "txt":
-        return result.text + "\n"
-    if output_format == "json":
-        return json.dumps(result.to_dict(), indent=2, ensure_ascii=False) + "\n"
-    if output_format == "srt":
-        return to_srt(result)
-    if output_format == "vtt":
-        return to_vtt(result)
-    raise ValueError(
-        f"Invalid output format '{output_format}'. Choose from {', '.join(OUTPUT_FORMATS)}."
-    )
+    with tracing.span("serialize", format=output_format):
+        if output_format == "txt":
+            return result.text + "\n"
+        if output_format == "json":
+            return json.dumps(result.to_dict(), indent=2, ensure_ascii=False) + "\n"
+        if output_format == "srt":
+            return to_srt(result)
+        if output_format == "vtt":
+            return to_vtt(result)
+        raise ValueError(
+            f"Invalid output format '{output_format}'. Choose from {', '.join(OUTPUT_FORMATS)}."
+        )
 
 
 def write_outputs(
@@ -83,48 +96,116 @@ def write_outputs(
     return output_paths
 
 
-def to_openai_response(result: TranscriptionResult, response_format: str) -> dict[str, Any] | str:
-    if response_format == "text":
-        return result.text
-    if response_format == "srt":
-        return to_srt(result)
-    if response_format == "vtt":
-        return to_vtt(result)
-    if response_format == "verbose_json":
-        segments = []
-        words = []
-        for index, sentence in enumerate(result.sentences):
-            segments.append(
+def to_mcp_output(
+    result: TranscriptionResult,
+    mode: str,
+    *,
+    token_offset: int = 0,
+    token_limit: int = DEFAULT_TOKEN_PAGE_SIZE,
+) -> str:
+    """Render a result for an MCP client, building only what ``mode`` returns."""
+
+    with tracing.span("serialize", format=mode):
+        if mode == "json":
+            return json.dumps(result.to_dict(), indent=2, ensure_ascii=False)
+        if mode == "text":
+            return result.text
+        if mode == "srt":
+            return to_srt(result)
+        if mode == "vtt":
+            return to_vtt(result)
+        if mode == "sentences":
+            return _compact_json(
                 {
-                    "id": index,
-                    "start": sentence.start,
-                    "end": sentence.end,
-                    "text": sentence.text,
+                    "duration": result.duration,
+                    "sentences": [
+                        {
+                            "start": sentence.start,
+                            "end": sentence.end,
+                            "text": sentence.text,
+                            **({"speaker": sentence.speaker} if sentence.speaker else {}),
+                        }
+                        for sentence in result.sentences
+                    ],
                 }
             )
-            words.extend(
+        if mode == "tokens":
+            if token_offset < 0 or token_limit < 1:
+                raise ValueError("token_offset must be 0 or greater and token_limit at least 1")
+            total = sum(len(sentence.tokens) for sentence in result.sentences)
+            indexed = (
+                {"sentence": index, **token.to_dict()}
+                for index, sentence in enumerate(result.sentences)
+                for token in sentence.tokens
+            )
+            page = list(islice(indexed, token_offset, token_offset + token_limit))
+            next_offset = token_offset + len(page)
+            return _compact_json(
                 {
-                    "word": token.text,
-                    "start": token.start,
-                    "end": token.end,
-                    **({"duration": token.duration} if token.duration is not None else {}),
-                    **({"confidence": token.confidence} if token.confidence is not None else {}),
+                    "total_tokens": total,
+                    "offset": token_offset,
+                    "next_offset": next_offset if next_offset < total else None,
+                    "tokens": page,
                 }
-                for token in sentence.tokens
             )
-        return {
-            "task": "transcribe",
-            "duration": result.duration,
-            "processing_time": result.processing_time,
-            "text": result.text,
-            "segments": segments,
-            "words": words,
-        }
-    if response_format == "json":
-        return {"text": result.text}
-    raise ValueError(
-        f"Invalid response format '{response_format}'. Choose from {', '.join(RESPONSE_FORMATS)}."
-    )
+        raise ValueError(
+            f"Invalid output mode '{mode}'. Choose from {', '.join(MCP_OUTPUT_MODES)}."
+        )
+
+
+def _compact_json(value: dict[str, Any]) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def to_openai_response(result: TranscriptionResult, response_format: str) -> dict[str, Any] | str:
+    with tracing.span("serialize", format=response_format):
+        if response_format == "text":
+            return result.text
+        if response_format == "srt":
+            return to_srt(result)
+        if response_format == "vtt":
+            return to_vtt(result)
+        if response_format == "verbose_json":
+            return _verbose_json(result)
+        if response_format == "json":
+            return {"text": result.text}
+        raise ValueError(
+            f"Invalid response format '{response_format}'. "
+            f"Choose from {', '.join(RESPONSE_FORMATS)}."
+        )
+
+
+def _verbose_json(result: TranscriptionResult) -> dict[str, Any]:
+    segments = []
+    words = []
+    for index, sentence in enumerate(result.sentences):
+        segments.append(
+            {
+                "id": index,
+                "start": sentence.start,
+                "end": sentence.end,
+                "text": sentence.text,
+                **({"speaker": sentence.speaker} if sentence.speaker else {}),
+            }
+        )
+        words.extend(
+            {
+                "word": token.text,
+                "start": token.start,
+                "end": token.end,
+                **({"duration": token.duration} if token.duration is not None else {}),
+                **({"confidence": token.confidence} if token.confidence is not None else {}),
+            }
+            for token in sentence.tokens
+        )
+    return {
+        "task": "transcribe",
+        "duration": result.duration,
+        "processing_time": result.processing_time,
+        "text": result.text,
+        "segments": segments,
+        "words": words,
+    }
 
 
 def from_openai_verbose_json(response: dict[str, Any]) -> TranscriptionResult:
@@ -158,6 +239,7 @@ def from_openai_verbose_json(response: dict[str, Any]) -> TranscriptionResult:
                 start=start,
                 end=end,
                 tokens=tuple(tokens),
+                speaker=segment.get("speaker"),
             )
         )
 
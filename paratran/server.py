@@ -3,95 +3,114 @@
 from __future__ import annotations
 
 import asyncio
-import hmac
+import hashlib
 import os
+import re
+import secrets
 import tempfile
+import threading
+from collections.abc import Callable
 from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Any
 
-from fastapi import Depends, FastAPI, File, Form, Header, HTTPException, UploadFile
-from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi import Depends, FastAPI, File, Form, Header, HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from starlette.requests import ClientDisconnect
 
+from paratran import profiling, tracing
 from paratran.contracts import (
     ALLOWED_EXTENSIONS,
     DEFAULT_BEAM_SIZE,
     DEFAULT_CHUNK_DURATION,
+    DEFAULT_CONFIDENCE_THRESHOLD,
     DEFAULT_DECODING,
     DEFAULT_DURATION_REWARD,
     DEFAULT_LENGTH_PENALTY,
-    DEFAULT_MAX_CONCURRENCY,
-    DEFAULT_MAX_UPLOAD_MB,
     DEFAULT_OVERLAP_DURATION,
     DEFAULT_PATIENCE,
+    DEFAULT_PRECISION,
+    PRIORITIES,
     RESPONSE_FORMATS,
     OptionValidationError,
+    TranscriptionCancelled,
     TranscriptionOptions,
+    TranscriptionProgress,
     TranscriptionResult,
 )
+from paratran.http_common import api_keys, authenticate, max_upload_bytes, require_api_key
+from paratran.pcm import WavWriter, parse_raw_content_type
+from paratran.profiling import Profiler
+from paratran.result_cache import SHA256_PATTERN, ResultCache
+from paratran.scheduler import (
+    BYTES_PER_AUDIO_SECOND,
+    AdmissionError,
+    Job,
+    Reservation,
+    TranscriptionScheduler,
+    probe_audio_seconds,
+)
 from paratran.serializers import to_openai_response
+from paratran.uploads import UploadError, UploadStore
+from paratran.workers import InferencePool
 
 
 def _load_model() -> None:
+    if _inference_pool() is not None:
+        return
     from paratran.transcribe import get_model
 
     get_model()
 
 
-def _transcribe_file(path: str, options: TranscriptionOptions) -> TranscriptionResult:
-    from paratran.transcribe import transcribe_file
+def _transcribe_file(
+    path: str,
+    options: TranscriptionOptions,
+    is_cancelled: Callable[[], bool] | None = None,
+    progress: Callable[[TranscriptionProgress], None] | None = None,
+) -> TranscriptionResult:
+    if (pool := _inference_pool()) is not None:
+        return pool.transcribe(path, options, is_cancelled, progress)
+    from paratran.pipeline import shared_pipeline
+
+    return shared_pipeline().transcribe(path, options, is_cancelled, progress)
+
 
-    return transcribe_file(path, options=options)
+_pool: InferencePool | None = None
+_pool_loaded = False
 
 
-def _model_status() -> dict[str, str | None]:
+def _inference_pool() -> InferencePool | None:
+    """The supervisor's inference sockets when this process is an HTTP front end."""
+
+    global _pool, _pool_loaded
+    if not _pool_loaded:
+        _pool = InferencePool.from_environment()
+        _pool_loaded = True
+    return _pool
+
+
+def _model_status() -> dict[str, Any]:
+    if (pool := _inference_pool()) is not None:
+        return {
+            "model": os.environ.get("PARATRAN_MODEL"),
+            "model_dir": os.environ.get("PARATRAN_MODEL_DIR"),
+            **pool.status(),
+        }
     from paratran.transcribe import model_status
 
     return model_status()
 
 
-def _max_upload_bytes() -> int:
-    try:
-        megabytes = int(os.environ.get("PARATRAN_MAX_UPLOAD_MB", DEFAULT_MAX_UPLOAD_MB))
-    except ValueError:
-        megabytes = DEFAULT_MAX_UPLOAD_MB
-    return max(megabytes, 1) * 1024 * 1024
+_UPLOAD_EXPIRY_INTERVAL = 60.0
 
 
-def _max_concurrency() -> int:
-    try:
-        return max(
-            int(os.environ.get("PARATRAN_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
-            1,
-        )
-    except ValueError:
-        return DEFAULT_MAX_CONCURRENCY
-
-
-def _provided_api_key(
-    x_api_key: str | None,
-    authorization: str | None,
-) -> str | None:
-    if x_api_key:
-        return x_api_key
-    if authorization and authorization.lower().startswith("bearer "):
-        return authorization[7:].strip()
-    return None
-
-
-def require_api_key(
-    x_api_key: str | None = Header(default=None),
-    authorization: str | None = Header(default=None),
-) -> None:
-    expected = os.environ.get("PARATRAN_API_KEY")
-    if not expected:
-        return
-    provided = _provided_api_key(x_api_key, authorization)
-    if not provided or not hmac.compare_digest(provided, expected):
-        raise HTTPException(
-            status_code=401,
-            detail="A valid API key is required",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+async def _expire_uploads(store: UploadStore) -> None:
+    # Lookups expire stale sessions too; this also frees their disk space when
+    # no upload requests arrive at all.
+    while True:
+        await asyncio.sleep(_UPLOAD_EXPIRY_INTERVAL)
+        store.expire()
 
 
 @asynccontextmanager
@@ -100,8 +119,15 @@ async def lifespan(application: FastAPI):
     # initialization on the process thread, while request-time inference below
     # is moved off the event loop.
     _load_model()
-    application.state.transcription_semaphore = asyncio.Semaphore(_max_concurrency())
-    yield
+    application.state.scheduler = TranscriptionScheduler.from_environment()
+    application.state.result_cache = ResultCache.from_environment()
+    application.state.upload_store = UploadStore.from_environment()
+    expiry = asyncio.create_task(_expire_uploads(application.state.upload_store))
+    try:
+        yield
+    finally:
+        expiry.cancel()
+        application.state.upload_store.close()
 
 
 app = FastAPI(
@@ -111,28 +137,375 @@ app = FastAPI(
 )
 
 
+@app.exception_handler(OptionValidationError)
+async def _option_validation_error(_request: Request, exc: OptionValidationError):
+    return JSONResponse(status_code=422, content={"error": str(exc)})
+
+
+@app.exception_handler(AdmissionError)
+async def _admission_error(_request: Request, exc: AdmissionError):
+    return _overloaded(exc)
+
+
+def _overloaded(exc: AdmissionError) -> JSONResponse:
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"error": str(exc), "retry_after": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+_DISCONNECT_POLL_SECONDS = 0.5
+_JOB_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+# Routes that enqueue inference. They are checked against the queue limits
+# before FastAPI parses (and spools) the multipart body.
+_QUEUED_ROUTE = re.compile(r"^/v1/(?:audio/transcriptions|uploads/([^/]+)/transcriptions)$")
+
+
+def _estimated_audio_seconds(request: Request, upload_id: str | None) -> float:
+    """Audio length guessed from the upload size, before the body is read."""
+
+    if upload_id is not None:
+        try:
+            size = _upload_store().get(upload_id).length
+        except UploadError:
+            size = 0
+    else:
+        try:
+            size = int(request.headers.get("content-length", 0))
+        except ValueError:
+            size = 0
+    return size / BYTES_PER_AUDIO_SECOND
+
+
+class _ShedLoad:
+    """Reserve a queue place for a transcription request before its body is read.
+
+    The reservation counts against the queue limits while the upload arrives,
+    so concurrent uploads cannot all pass admission and then be rejected or
+    pile up once their bytes are on disk. ``_transcribe_stored`` turns it into
+    the job; any other end of the request gives it up. The API key is checked
+    first, so unauthenticated requests are refused without taking a place.
+    """
+
+    def __init__(self, application):
+        self.app = application
+
+    async def __call__(self, scope, receive, send):
+        route = (
+            _QUEUED_ROUTE.match(scope["path"])
+            if scope["type"] == "http" and scope["method"] == "POST"
+            else None
+        )
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+        request = Request(scope)
+        try:
+            authenticate(request.headers.get("x-api-key"), request.headers.get("authorization"))
+        except HTTPException as exc:
+            await JSONResponse(
+                status_code=exc.status_code, content={"detail": exc.detail}, headers=exc.headers
+            )(scope, receive, send)
+            return
+        client = _client_id(request, request.headers.get("x-paratran-client"))
+        scheduler = _scheduler()
+        try:
+            reservation = scheduler.reserve(
+                client, _estimated_audio_seconds(request, route.group(1))
+            )
+        except AdmissionError as exc:
+            await _overloaded(exc)(scope, receive, send)
+            return
+        request.state.reservation = reservation
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            scheduler.cancel_reservation(reservation)
+
+
+class _TraceRequests:
+    """Open a span per HTTP request, continuing the caller's ``traceparent``.
+
+    A plain ASGI wrapper, so with tracing off a request costs one check.
+    """
+
+    def __init__(self, application):
+        self.app = application
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracing.enabled():
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        parent = headers.get(b"traceparent", b"").decode("latin-1") or None
+        with (
+            tracing.continue_trace(parent),
+            tracing.span(
+                f"HTTP {scope['method']}",
+                **{"http.method": scope["method"], "http.target": scope["path"]},
+            ) as span,
+        ):
+
+            async def send_traced(message):
+                if message["type"] == "http.response.start":
+                    span.set(**{"http.status_code": message["status"]})
+                await send(message)
+
+            await self.app(scope, receive, send_traced)
+
+
+def _profiler() -> Profiler | None:
+    if not hasattr(app.state, "profiler"):
+        app.state.profiler = Profiler.from_environment()
+    return app.state.profiler
+
+
+class _ProfileRequests:
+    """Profile transcription requests that ask for it, or a sampled few.
+
+    ``X-Paratran-Profile: 1`` asks for a profile; the ``Profiler`` still
+    rate-limits it. A profiled response names its profile in the same header.
+    """
+
+    def __init__(self, application):
+        self.app = application
+
+    async def __call__(self, scope, receive, send):
+        profiler = _profiler() if scope["type"] == "http" else None
+        if profiler is None or scope["method"] != "POST" or not _QUEUED_ROUTE.match(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        requested = dict(scope["headers"]).get(b"x-paratran-profile", b"") in (b"1", b"true")
+        capture = profiler.start(f"POST {scope['path']}", requested=requested)
+        if capture is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_profiled(message):
+            if message["type"] == "http.response.start":
+                header = (b"x-paratran-profile", capture.profile_id.encode())
+                message = {**message, "headers": [*message.get("headers", []), header]}
+            await send(message)
+
+        try:
+            with profiling.covering(capture):
+                await self.app(scope, receive, send_profiled)
+        finally:
+            await asyncio.to_thread(capture.stop)
+
+
+app.add_middleware(_ShedLoad)
+app.add_middleware(_ProfileRequests)
+# Added last, so it is outermost and also times requests shed by _shed_load.
+app.add_middleware(_TraceRequests)
+
+
+@app.exception_handler(UploadError)
+async def _upload_error(_request: Request, exc: UploadError):
+    return JSONResponse(status_code=exc.status_code, content={"error": str(exc)})
+
+
+def _result_cache() -> ResultCache:
+    cache = getattr(app.state, "result_cache", None)
+    if cache is None:
+        cache = ResultCache.from_environment()
+        app.state.result_cache = cache
+    return cache
+
+
+def _scheduler() -> TranscriptionScheduler:
+    scheduler = getattr(app.state, "scheduler", None)
+    if scheduler is None:
+        scheduler = TranscriptionScheduler.from_environment()
+        app.state.scheduler = scheduler
+    return scheduler
+
+
+def _client_id(request: Request, label: str | None) -> str:
+    """Fair-share identity: the API key's client, else the client header or peer address.
+
+    With API keys configured, callers cannot choose their identity: an
+    ``X-Paratran-Client`` header only labels jobs within the key's client, as
+    ``client/label``, and the scheduler counts them as that client.
+    """
+
+    account = authenticate(request.headers.get("x-api-key"), request.headers.get("authorization"))
+    if account is None:
+        return label or (request.client.host if request.client else "unknown")
+    return f"{account}/{label}" if label else account
+
+
+def job_priority(
+    request: Request,
+    priority: str = Form("normal", description="Scheduling class: high, normal, or low"),
+    x_paratran_client: str | None = Header(default=None),
+    x_paratran_job_id: str | None = Header(default=None),
+) -> tuple[str, str, str]:
+    """Scheduling identity for a job: ``(client, priority, job_id)``."""
+
+    if priority not in PRIORITIES:
+        raise OptionValidationError(
+            f"Invalid priority '{priority}'. Must be one of: {', '.join(PRIORITIES)}"
+        )
+    if x_paratran_job_id is not None and not _JOB_ID_PATTERN.match(x_paratran_job_id):
+        raise OptionValidationError(
+            "X-Paratran-Job-Id must be 1-64 letters, digits, '.', '_' or '-'"
+        )
+    if priority == "high" and not api_keys():
+        # Without API keys every caller is anonymous, and any could jump the queue.
+        raise HTTPException(status_code=403, detail="Priority 'high' requires an API key")
+    job_id = x_paratran_job_id or secrets.token_hex(8)
+    return _client_id(request, x_paratran_client), priority, job_id
+
+
+def _upload_store() -> UploadStore:
+    store = getattr(app.state, "upload_store", None)
+    if store is None:
+        store = UploadStore.from_environment()
+        app.state.upload_store = store
+    return store
+
+
+def _upload_limit_exceeded() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"Uploaded file exceeds the {max_upload_bytes() // (1024 * 1024)} MB limit",
+    )
+
+
+def _unsupported_suffix(suffix: str) -> JSONResponse | None:
+    if suffix in ALLOWED_EXTENSIONS:
+        return None
+    return JSONResponse(
+        status_code=400,
+        content={
+            "error": (
+                f"Unsupported file type '{suffix}'. Allowed: "
+                f"{', '.join(sorted(ALLOWED_EXTENSIONS))}"
+            )
+        },
+    )
+
+
+def _cache_key(sha256: str, options: TranscriptionOptions):
+    return (sha256, _model_status()["model"], options)
+
+
+def transcription_options(
+    decoding: str = Form(DEFAULT_DECODING),
+    beam_size: int = Form(DEFAULT_BEAM_SIZE, ge=1),
+    length_penalty: float = Form(DEFAULT_LENGTH_PENALTY, ge=0),
+    patience: float = Form(DEFAULT_PATIENCE, gt=0),
+    duration_reward: float = Form(DEFAULT_DURATION_REWARD, ge=0, le=1),
+    max_words: int | None = Form(None, gt=0),
+    silence_gap: float | None = Form(None, gt=0),
+    max_duration: float | None = Form(None, gt=0),
+    chunk_duration: float | None = Form(DEFAULT_CHUNK_DURATION, ge=0),
+    overlap_duration: float = Form(DEFAULT_OVERLAP_DURATION, ge=0),
+    fp32: bool = Form(False),
+    precision: str = Form(DEFAULT_PRECISION),
+    confidence_threshold: float = Form(DEFAULT_CONFIDENCE_THRESHOLD, ge=0, le=1),
+    diarize: bool = Form(False),
+    num_speakers: int | None = Form(None, gt=0),
+) -> TranscriptionOptions:
+    """Paratran-specific form parameters shared by every transcription route."""
+
+    return TranscriptionOptions(
+        decoding=decoding,
+        beam_size=beam_size,
+        length_penalty=length_penalty,
+        patience=patience,
+        duration_reward=duration_reward,
+        max_words=max_words,
+        silence_gap=silence_gap,
+        max_duration=max_duration,
+        chunk_duration=chunk_duration,
+        overlap_duration=overlap_duration,
+        fp32=fp32,
+        precision=precision,
+        confidence_threshold=confidence_threshold,
+        diarize=diarize or num_speakers is not None,
+        num_speakers=num_speakers,
+    )
+
+
+def _invalid_response_format(response_format: str) -> JSONResponse | None:
+    if response_format in RESPONSE_FORMATS:
+        return None
+    return JSONResponse(
+        status_code=400,
+        content={
+            "error": (
+                f"Invalid response_format '{response_format}'. Must be one of: "
+                f"{', '.join(RESPONSE_FORMATS)}"
+            )
+        },
+    )
+
+
 @app.get("/health")
 def health():
     status = _model_status()
     return {
         "status": "ok" if status["model"] else "starting",
         **status,
+        "queue": _scheduler().snapshot(),
+        "result_cache": _result_cache().stats(),
     }
 
 
-def _response_for(result: TranscriptionResult, response_format: str):
+def _response_for(
+    result: TranscriptionResult,
+    response_format: str,
+    headers: dict[str, str] | None = None,
+):
     rendered = to_openai_response(result, response_format)
     if response_format == "text":
-        return PlainTextResponse(rendered, media_type="text/plain")
+        return PlainTextResponse(rendered, media_type="text/plain", headers=headers)
     if response_format == "srt":
-        return PlainTextResponse(rendered, media_type="application/x-subrip")
+        return PlainTextResponse(rendered, media_type="application/x-subrip", headers=headers)
     if response_format == "vtt":
-        return PlainTextResponse(rendered, media_type="text/vtt")
-    return JSONResponse(rendered)
+        return PlainTextResponse(rendered, media_type="text/vtt", headers=headers)
+    return JSONResponse(rendered, headers=headers)
+
+
+@app.get("/v1/jobs/{job_id}", dependencies=[Depends(require_api_key)])
+def job_status(job_id: str):
+    """Queue position or progress of a transcription sent with ``X-Paratran-Job-Id``."""
+
+    status = _scheduler().job_status(job_id)
+    if status is None:
+        return JSONResponse(
+            status_code=404, content={"error": f"No queued or running job '{job_id}'"}
+        )
+    return status
+
+
+@app.post("/v1/audio/lookup", dependencies=[Depends(require_api_key)])
+def lookup(
+    sha256: str = Form(..., description="Lowercase hex SHA-256 of the audio file"),
+    response_format: str = Form("json", description="json, text, srt, vtt, or verbose_json"),
+    options: TranscriptionOptions = Depends(transcription_options),
+):
+    """Return a cached transcription for already-uploaded audio, or ask for the upload."""
+
+    if invalid := _invalid_response_format(response_format):
+        return invalid
+    if not SHA256_PATTERN.match(sha256):
+        return JSONResponse(
+            status_code=400,
+            content={"error": "sha256 must be 64 lowercase hexadecimal characters"},
+        )
+    result = _result_cache().get(_cache_key(sha256, options))
+    if result is None:
+        return JSONResponse(status_code=404, content={"status": "upload_required"})
+    return _response_for(result, response_format, headers={"X-Paratran-Cache": "hit"})
 
 
 @app.post("/v1/audio/transcriptions", dependencies=[Depends(require_api_key)])
 async def transcribe(
+    request: Request,
     file: UploadFile = File(...),
     # OpenAI-compatible parameters. These are accepted for request compatibility;
     # model, language, prompt, and temperature are currently configured/auto-detected.
@@ -154,91 +527,247 @@ async def transcribe(
         description="Accepted for compatibility; temperature is not applied",
     ),
     # Paratran-specific parameters
-    decoding: str = Form(DEFAULT_DECODING),
-    beam_size: int = Form(DEFAULT_BEAM_SIZE, ge=1),
-    length_penalty: float = Form(DEFAULT_LENGTH_PENALTY, ge=0),
-    patience: float = Form(DEFAULT_PATIENCE, gt=0),
-    duration_reward: float = Form(DEFAULT_DURATION_REWARD, ge=0, le=1),
-    max_words: int | None = Form(None, gt=0),
-    silence_gap: float | None = Form(None, gt=0),
-    max_duration: float | None = Form(None, gt=0),
-    chunk_duration: float | None = Form(DEFAULT_CHUNK_DURATION, ge=0),
-    overlap_duration: float = Form(DEFAULT_OVERLAP_DURATION, ge=0),
-    fp32: bool = Form(False),
+    options: TranscriptionOptions = Depends(transcription_options),
+    job: tuple[str, str, str] = Depends(job_priority),
 ):
     del model, language, prompt, temperature
 
-    suffix = Path(file.filename).suffix.lower() if file.filename else ""
-    if suffix not in ALLOWED_EXTENSIONS:
-        return JSONResponse(
-            status_code=400,
-            content={
-                "error": (
-                    f"Unsupported file type '{suffix}'. Allowed: "
-                    f"{', '.join(sorted(ALLOWED_EXTENSIONS))}"
-                )
-            },
-        )
-    if response_format not in RESPONSE_FORMATS:
-        return JSONResponse(
-            status_code=400,
-            content={
-                "error": (
-                    f"Invalid response_format '{response_format}'. Must be one of: "
-                    f"{', '.join(RESPONSE_FORMATS)}"
-                )
-            },
-        )
+    try:
+        raw = parse_raw_content_type(file.content_type)
+    except ValueError as exc:
+        return JSONResponse(status_code=400, content={"error": str(exc)})
+    if raw is not None:
+        suffix = ".wav"
+    else:
+        suffix = Path(file.filename).suffix.lower() if file.filename else ""
+        if unsupported := _unsupported_suffix(suffix):
+            return unsupported
+    if invalid := _invalid_response_format(response_format):
+        return invalid
 
+    temp_path: Path | None = None
     try:
-        options = TranscriptionOptions(
-            decoding=decoding,
-            beam_size=beam_size,
-            length_penalty=length_penalty,
-            patience=patience,
-            duration_reward=duration_reward,
-            max_words=max_words,
-            silence_gap=silence_gap,
-            max_duration=max_duration,
-            chunk_duration=chunk_duration,
-            overlap_duration=overlap_duration,
-            fp32=fp32,
+        try:
+            with (
+                tracing.span("upload", raw=raw is not None) as span,
+                tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temporary_file,
+            ):
+                temp_path = Path(temporary_file.name)
+                total_bytes = 0
+                digest = hashlib.sha256()
+                # Raw PCM is stored as WAV; its format is part of the cache key.
+                writer = WavWriter(temporary_file, raw) if raw is not None else None
+                if raw is not None:
+                    digest.update(repr(raw).encode())
+                while chunk := await file.read(1024 * 1024):
+                    total_bytes += len(chunk)
+                    if total_bytes > max_upload_bytes():
+                        raise _upload_limit_exceeded()
+                    (writer or temporary_file).write(chunk)
+                    digest.update(chunk)
+                if writer is not None:
+                    writer.close()
+                span.set(bytes=total_bytes)
+        except OSError as exc:
+            return JSONResponse(
+                status_code=500,
+                content={"error": "Transcription failed", "detail": str(exc)},
+            )
+        return await _transcribe_stored(
+            request, temp_path, digest.hexdigest(), options, response_format, job
         )
-    except OptionValidationError as exc:
-        return JSONResponse(status_code=422, content={"error": str(exc)})
+    finally:
+        await file.close()
+        if temp_path:
+            temp_path.unlink(missing_ok=True)
 
-    temp_path: Path | None = None
+
+async def _watch_disconnect(request: Request, cancel: threading.Event) -> None:
+    while not await request.is_disconnected():
+        await asyncio.sleep(_DISCONNECT_POLL_SECONDS)
+    cancel.set()
+
+
+async def _acquire_unless_disconnected(
+    watcher: asyncio.Task,
+    client: str,
+    priority: str,
+    audio_seconds: float,
+    job_id: str,
+    memory_bytes: int = 0,
+    reservation: Reservation | None = None,
+) -> Job | None:
+    """Wait for a scheduler slot, giving up the queue position if the client leaves."""
+
+    acquiring = asyncio.create_task(
+        _scheduler().acquire(client, priority, audio_seconds, job_id, memory_bytes, reservation)
+    )
+    await asyncio.wait({acquiring, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    if not acquiring.done():
+        acquiring.cancel()
+        await asyncio.wait({acquiring})
+        return None
+    return acquiring.result()
+
+
+def _client_closed() -> JSONResponse:
+    # Nobody reads this response; the status only shows up in access logs.
+    return JSONResponse(status_code=499, content={"error": "Client closed the request"})
+
+
+async def _transcribe_stored(
+    request: Request,
+    path: Path,
+    sha256: str,
+    options: TranscriptionOptions,
+    response_format: str,
+    job: tuple[str, str, str],
+):
+    """Answer from the result cache or run inference on a fully received upload.
+
+    A client that disconnects while queued gives up its place; one that
+    disconnects during inference stops it at the next chunk boundary.
+    """
+
+    cache_key = _cache_key(sha256, options)
+    if (cached := _result_cache().get(cache_key)) is not None:
+        tracing.current().set(cache="hit")
+        return _response_for(cached, response_format, headers={"X-Paratran-Cache": "hit"})
+
+    client, priority, job_id = job
+    tracing.current().set(cache="miss", job_id=job_id, priority=priority)
+    cancel = threading.Event()
+    watcher = asyncio.create_task(_watch_disconnect(request, cancel))
     try:
-        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temporary_file:
-            temp_path = Path(temporary_file.name)
-            total_bytes = 0
-            while chunk := await file.read(1024 * 1024):
-                total_bytes += len(chunk)
-                if total_bytes > _max_upload_bytes():
-                    raise HTTPException(
-                        status_code=413,
-                        detail=(
-                            "Uploaded file exceeds the "
-                            f"{_max_upload_bytes() // (1024 * 1024)} MB limit"
-                        ),
-                    )
-                temporary_file.write(chunk)
-
-        semaphore = getattr(app.state, "transcription_semaphore", None)
-        if semaphore is None:
-            semaphore = asyncio.Semaphore(_max_concurrency())
-            app.state.transcription_semaphore = semaphore
-        async with semaphore:
-            result = await asyncio.to_thread(_transcribe_file, str(temp_path), options)
-        return _response_for(result, response_format)
-    except HTTPException:
-        raise
+        audio_seconds = await asyncio.to_thread(probe_audio_seconds, path)
+        # The result is cached under the requested options even when the
+        # memory budget forces a smaller chunk for this run.
+        run_options, memory_bytes = _scheduler().memory.plan(audio_seconds, options)
+        with tracing.span("queue", audio_seconds=audio_seconds, memory_bytes=memory_bytes):
+            slot = await _acquire_unless_disconnected(
+                watcher,
+                client,
+                priority,
+                audio_seconds,
+                job_id,
+                memory_bytes,
+                getattr(request.state, "reservation", None),
+            )
+        if slot is None:
+            return _client_closed()
+
+        def report(progress: TranscriptionProgress) -> None:
+            _scheduler().report_progress(slot, progress)
+
+        try:
+            result = await asyncio.to_thread(
+                _transcribe_file, str(path), run_options, cancel.is_set, report
+            )
+        finally:
+            _scheduler().release(slot)
+    except TranscriptionCancelled:
+        _scheduler().record_cancelled()
+        return _client_closed()
     except (OSError, RuntimeError, ValueError) as exc:
         return JSONResponse(
             status_code=500,
             content={"error": "Transcription failed", "detail": str(exc)},
         )
     finally:
-        await file.close()
-        if temp_path:
-            temp_path.unlink(missing_ok=True)
+        watcher.cancel()
+    _scheduler().observe(result.duration, result.processing_time)
+    _result_cache().put(cache_key, result)
+    return _response_for(result, response_format, headers={"X-Paratran-Job-Id": job_id})
+
+
+def _upload_headers(session) -> dict[str, str]:
+    return {
+        "Upload-Offset": str(session.offset),
+        "Upload-Length": str(session.length),
+        "Cache-Control": "no-store",
+    }
+
+
+@app.post("/v1/uploads", status_code=201, dependencies=[Depends(require_api_key)])
+def create_upload(
+    filename: str = Form(..., description="Original file name; its extension selects the decoder"),
+    length: int = Form(..., ge=1, description="Total size of the file in bytes"),
+):
+    """Start a resumable upload of ``length`` bytes."""
+
+    suffix = Path(filename).suffix.lower()
+    if unsupported := _unsupported_suffix(suffix):
+        return unsupported
+    if length > max_upload_bytes():
+        raise _upload_limit_exceeded()
+    session = _upload_store().create(length, suffix)
+    location = f"/v1/uploads/{session.upload_id}"
+    return JSONResponse(
+        status_code=201,
+        content={"id": session.upload_id, "offset": 0, "length": length},
+        headers={"Location": location, **_upload_headers(session)},
+    )
+
+
+@app.head("/v1/uploads/{upload_id}", dependencies=[Depends(require_api_key)])
+def upload_offset(upload_id: str):
+    """Report how many bytes of an upload have been received."""
+
+    return Response(status_code=200, headers=_upload_headers(_upload_store().get(upload_id)))
+
+
+@app.patch("/v1/uploads/{upload_id}", dependencies=[Depends(require_api_key)])
+async def append_upload(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset", ge=0),
+):
+    """Append the request body to an upload at ``Upload-Offset``."""
+
+    session = _upload_store().get(upload_id)
+    try:
+        await _upload_store().append(session, upload_offset, request.stream())
+    except ClientDisconnect:
+        # Bytes that arrived before the disconnect are kept; the client resumes
+        # from the offset reported by HEAD.
+        pass
+    return Response(status_code=204, headers=_upload_headers(session))
+
+
+@app.delete("/v1/uploads/{upload_id}", status_code=204, dependencies=[Depends(require_api_key)])
+def delete_upload(upload_id: str):
+    """Abandon an upload and discard its bytes."""
+
+    _upload_store().get(upload_id)
+    _upload_store().remove(upload_id)
+    return Response(status_code=204)
+
+
+@app.post(
+    "/v1/uploads/{upload_id}/transcriptions",
+    dependencies=[Depends(require_api_key)],
+)
+async def finalize_upload(
+    request: Request,
+    upload_id: str,
+    response_format: str = Form("json", description="json, text, srt, vtt, or verbose_json"),
+    options: TranscriptionOptions = Depends(transcription_options),
+    job: tuple[str, str, str] = Depends(job_priority),
+):
+    """Transcribe a completed upload; the upload is consumed either way."""
+
+    if invalid := _invalid_response_format(response_format):
+        return invalid
+    store = _upload_store()
+    session = store.take(upload_id)
+    try:
+        return await _transcribe_stored(
+            request,
+            session.path,
+            await store.sha256(session),
+            options,
+            response_format,
+            job,
+        )
+    finally:
+        session.path.unlink(missing_ok=True)
@@ -0,0 +1,278 @@
+"""Optional request tracing with OpenTelemetry-shaped spans.
+
+Set ``PARATRAN_TRACE`` to turn tracing on:
+
+``console``
+    one JSON line per finished span on stderr.
+``file:PATH``
+    the same lines appended to ``PATH``; works offline.
+``otlp``
+    export to an OpenTelemetry collector through the OTLP/HTTP exporter, which
+    reads the standard ``OTEL_EXPORTER_OTLP_*`` variables. Needs the ``otlp``
+    extra (``pip install 'paratran[otlp]'``).
+
+Any other exporter is a callable taking a finished ``Span``; pass it to
+``configure``. Spans use W3C trace and span ids, so a ``traceparent`` header
+on an HTTP request continues the caller's trace, and inference workers join
+the trace of the front end that sent them the job.
+
+With tracing off, ``span`` returns one shared no-op object, so instrumented
+code pays a global lookup and nothing else. The no-op span is falsy: guard
+attributes that are costly to compute with ``if span:``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any
+
+from paratran.contracts import TranscriptionOptions
+
+TRACE_ENV = "PARATRAN_TRACE"
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+class Span:
+    """One timed operation; ``attributes`` hold strings, numbers, and booleans."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "error",
+    )
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, attributes: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.attributes = attributes
+        self.error: str | None = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    @property
+    def duration(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "attributes": self.attributes,
+            "status": {"code": "ERROR", "message": self.error} if self.error else {"code": "OK"},
+        }
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __enter__(self) -> _NoopSpan:
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        return None
+
+    def set(self, **_attributes: Any) -> None:
+        return None
+
+
+_NOOP = _NoopSpan()
+_current: ContextVar[Span | None] = ContextVar("paratran_span", default=None)
+# A parent from another process, set by ``continue_trace``: (trace_id, span_id).
+_remote: ContextVar[tuple[str, str] | None] = ContextVar("paratran_remote_span", default=None)
+
+Exporter = Callable[[Span], None]
+
+
+class JsonLinesExporter:
+    """Write each finished span as one JSON line to a text stream or file."""
+
+    def __init__(self, stream=None, path: Path | None = None):
+        self._stream = stream
+        self._path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            if self._path is not None:
+                with self._path.open("a", encoding="utf-8") as file:
+                    file.write(line)
+            else:
+                (self._stream or sys.stderr).write(line)
+
+
+def otlp_exporter() -> Exporter:
+    """Batch spans to an OTLP/HTTP collector with the OpenTelemetry SDK."""
+
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import ReadableSpan
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.trace import SpanContext, Status, StatusCode, TraceFlags
+    except ImportError as exc:
+        raise RuntimeError(
+            f"{TRACE_ENV}=otlp needs the OpenTelemetry SDK: pip install 'paratran[otlp]'"
+        ) from exc
+
+    processor = BatchSpanProcessor(OTLPSpanExporter())
+    resource = Resource.create({"service.name": "paratran"})
+
+    def context(trace_id: str, span_id: str) -> SpanContext:
+        return SpanContext(
+            int(trace_id, 16), int(span_id, 16), is_remote=False, trace_flags=TraceFlags(1)
+        )
+
+    def export(span: Span) -> None:
+        processor.on_end(
+            ReadableSpan(
+                name=span.name,
+                context=context(span.trace_id, span.span_id),
+                parent=context(span.trace_id, span.parent_id) if span.parent_id else None,
+                resource=resource,
+                attributes=span.attributes,
+                start_time=span.start_ns,
+                end_time=span.end_ns,
+                status=Status(StatusCode.ERROR, span.error) if span.error else Status(),
+            )
+        )
+
+    return export
+
+
+def exporter_from_environment() -> Exporter | None:
+    """The exporter named by ``PARATRAN_TRACE``, or ``None`` when tracing is off."""
+
+    setting = os.environ.get(TRACE_ENV, "").strip()
+    if setting.lower() in ("", "0", "off", "none"):
+        return None
+    if setting.lower() == "console":
+        return JsonLinesExporter()
+    if setting.lower() == "otlp":
+        return otlp_exporter()
+    if setting.startswith("file:"):
+        return JsonLinesExporter(path=Path(setting[len("file:") :]).expanduser())
+    raise ValueError(f"{TRACE_ENV} must be console, file:PATH, or otlp; got '{setting}'")
+
+
+def _initial_exporter() -> Exporter | None:
+    try:
+        return exporter_from_environment()
+    except (RuntimeError, ValueError) as exc:
+        # Tracing is diagnostics; a bad setting must not stop transcription.
+        print(f"paratran: tracing disabled: {exc}", file=sys.stderr)
+        return None
+
+
+_exporter: Exporter | None = _initial_exporter()
+
+
+def configure(exporter: Exporter | None) -> None:
+    """Send finished spans to ``exporter``; ``None`` turns tracing off."""
+
+    global _exporter
+    _exporter = exporter
+
+
+def enabled() -> bool:
+    return _exporter is not None
+
+
+@contextmanager
+def _recording(name: str, attributes: dict[str, Any]) -> Iterator[Span]:
+    parent = _current.get()
+    if parent is not None:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    elif (remote := _remote.get()) is not None:
+        trace_id, parent_id = remote
+    else:
+        trace_id, parent_id = secrets.token_hex(16), None
+    span = Span(name, trace_id, parent_id, attributes)
+    token = _current.set(span)
+    try:
+        yield span
+    except BaseException as exc:
+        span.error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        _current.reset(token)
+        span.end_ns = time.time_ns()
+        exporter = _exporter
+        if exporter is not None:
+            exporter(span)
+
+
+def span(name: str, **attributes: Any):
+    """A context manager timing ``name`` as a child of the current span."""
+
+    if _exporter is None:
+        return _NOOP
+    return _recording(name, attributes)
+
+
+def current() -> Span | _NoopSpan:
+    """The innermost open span, or the no-op span."""
+
+    return _current.get() or _NOOP
+
+
+def traceparent() -> str | None:
+    """The W3C ``traceparent`` of the current span, to pass to another process."""
+
+    current = _current.get()
+    return current.traceparent if current is not None else None
+
+
+@contextmanager
+def continue_trace(header: str | None) -> Iterator[None]:
+    """Make spans opened inside children of the remote span in ``header``."""
+
+    match = _TRACEPARENT.match(header.strip().lower()) if header else None
+    if match is None or _exporter is None:
+        yield
+        return
+    token = _remote.set((match[1], match[2]))
+    try:
+        yield
+    finally:
+        _remote.reset(token)
+
+
+def option_attributes(options: TranscriptionOptions) -> dict[str, Any]:
+    """``options`` as span attributes, leaving out unset ones."""
+
+    return {
+        f"options.{key}": value for key, value in options.to_dict().items() if value is not None
+    }
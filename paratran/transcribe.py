@@ -8,9 +8,12 @@ import shutil
 import subprocess
 import threading
 import time
+from collections.abc import Callable
+from dataclasses import dataclass, replace
 from pathlib import Path
 from typing import Any
 
+from paratran import hybrid, incremental, tracing
 from paratran.contracts import (
     ALLOWED_EXTENSIONS,
     DEFAULT_BEAM_SIZE,
@@ -21,13 +24,18 @@ from paratran.contracts import (
     DEFAULT_MODEL,
     DEFAULT_OVERLAP_DURATION,
     DEFAULT_PATIENCE,
+    DEFAULT_PRECISION,
+    SAMPLE_RATE,
     Sentence,
     Token,
+    TranscriptionCancelled,
     TranscriptionOptions,
+    TranscriptionProgress,
     TranscriptionResult,
 )
+from paratran.incremental import Revision
 
-_model: Any = None
+_models: dict[tuple[str, str | None, str], Any] = {}
 _model_name: str | None = None
 _model_dir: str | None = None
 _model_lock = threading.Lock()
@@ -36,29 +44,38 @@ _model_lock = threading.Lock()
 def get_model(
     model_name: str | None = None,
     model_dir: str | None = None,
+    precision: str = DEFAULT_PRECISION,
 ):
-    """Load and cache one model, serializing concurrent first loads."""
+    """Load and cache one model per precision, serializing concurrent first loads."""
 
-    global _model, _model_name, _model_dir
+    global _model_name, _model_dir
     name = model_name or os.environ.get("PARATRAN_MODEL", DEFAULT_MODEL)
     cache = model_dir or os.environ.get("PARATRAN_MODEL_DIR")
+    key = (name, cache, precision)
 
     with _model_lock:
-        if _model is not None and _model_name == name and _model_dir == cache:
-            return _model
+        if (model := _models.get(key)) is not None:
+            return model
 
-        import parakeet_mlx
+        from paratran.models import load_model
 
-        kwargs = {"cache_dir": cache} if cache else {}
-        loaded_model = parakeet_mlx.from_pretrained(name, **kwargs)
-        _model = loaded_model
+        with tracing.span("get_model", model=name, precision=precision):
+            if (name, cache) != (_model_name, _model_dir):
+                # Only variants of the configured model stay resident together.
+                _models.clear()
+            loaded_model = load_model(name, cache, precision)
+        _models[key] = loaded_model
         _model_name = name
         _model_dir = cache
         return loaded_model
 
 
-def model_status() -> dict[str, str | None]:
-    return {"model": _model_name, "model_dir": _model_dir}
+def model_status() -> dict[str, Any]:
+    return {
+        "model": _model_name,
+        "model_dir": _model_dir,
+        "precisions": sorted(precision for *_, precision in _models),
+    }
 
 
 def _build_options(
@@ -74,6 +91,7 @@ def _build_options(
     chunk_duration: float | None,
     overlap_duration: float,
     fp32: bool,
+    precision: str,
 ) -> TranscriptionOptions:
     return TranscriptionOptions(
         decoding=decoding,
@@ -87,37 +105,460 @@ def _build_options(
         chunk_duration=chunk_duration,
         overlap_duration=overlap_duration,
         fp32=fp32,
+        precision=precision,
     )
 
 
 def _audio_duration(path: Path, fallback: float) -> float:
-    """Return the input duration when ffprobe is available, otherwise speech end."""
-
-    ffprobe = shutil.which("ffprobe")
-    if ffprobe is None:
-        return fallback
-
-    try:
-        completed = subprocess.run(
-            [
-                ffprobe,
-                "-v",
-                "error",
-                "-show_entries",
-                "format=duration",
-                "-of",
-                "default=noprint_wrappers=1:nokey=1",
-                str(path),
-            ],
-            capture_output=True,
-            text=True,
-            check=True,
-            timeout=15,
+    """Return the input duration from a WAV header or ffprobe, otherwise ``fallback``."""
+
+    from paratran.pcm import wav_duration
+
+    with tracing.span("audio_duration") as span:
+        if (duration := wav_duration(path)) is not None:
+            span.set(source="wav", audio_seconds=duration)
+            return duration
+        ffprobe = shutil.which("ffprobe")
+        if ffprobe is None:
+            span.set(source="fallback", audio_seconds=fallback)
+            return fallback
+
+        try:
+            completed = subprocess.run(
+                [
+                    ffprobe,
+                    "-v",
+                    "error",
+                    "-show_entries",
+                    "format=duration",
+                    "-of",
+                    "default=noprint_wrappers=1:nokey=1",
+                    str(path),
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=15,
+            )
+            duration = max(float(completed.stdout.strip()), 0.0)
+        except (OSError, ValueError, subprocess.SubprocessError):
+            span.set(source="fallback", audio_seconds=fallback)
+            return fallback
+        span.set(source="ffprobe", audio_seconds=duration)
+        return duration
+
+
+class _ChunkMonitor:
+    """parakeet's ``chunk_callback``: checks for cancellation and reports progress.
+
+    parakeet calls it with the end sample of each chunk just before decoding
+    that chunk, so everything before the previous end has been transcribed.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        options: TranscriptionOptions,
+        sample_rate: int,
+        is_cancelled: Callable[[], bool] | None,
+        progress: Callable[[TranscriptionProgress], None] | None,
+    ):
+        self._path = path
+        self._options = options
+        self._sample_rate = sample_rate
+        self._is_cancelled = is_cancelled
+        self._progress = progress
+        self._started = time.perf_counter()
+        self._chunks_started = 0
+        self._chunks_total = 0
+        self._position = 0
+        self._total = 0
+
+    def check_cancelled(self) -> None:
+        if self._is_cancelled is not None and self._is_cancelled():
+            raise TranscriptionCancelled(f"Transcription of {self._path.name} was cancelled")
+
+    def __call__(self, end: int, total: int) -> None:
+        self.check_cancelled()
+        self._chunks_started += 1
+        if self._progress is None:
+            return
+        if not self._total:
+            self._total = total
+            chunk = int((self._options.chunk_duration or 0) * self._sample_rate)
+            step = chunk - int(self._options.overlap_duration * self._sample_rate)
+            self._chunks_total = len(range(0, total, step)) if step > 0 else 1
+        self._emit(self._chunks_started - 1, self._position / self._sample_rate)
+        self._position = end
+
+    @property
+    def chunks(self) -> int:
+        """Chunks decoded so far; unchunked audio counts as one."""
+
+        return max(self._chunks_started, 1)
+
+    def finish(self, duration: float) -> None:
+        if self._progress is None:
+            return
+        self._chunks_total = max(self._chunks_started, 1)
+        total_seconds = self._total / self._sample_rate if self._total else duration
+        self._emit(self._chunks_total, total_seconds, total_seconds)
+
+    def _emit(self, chunks_done: int, seconds: float, total_seconds: float | None = None) -> None:
+        self._progress(
+            TranscriptionProgress(
+                chunks_done=chunks_done,
+                chunks_total=self._chunks_total,
+                audio_seconds=seconds,
+                total_audio_seconds=(
+                    self._total / self._sample_rate if total_seconds is None else total_seconds
+                ),
+                elapsed=time.perf_counter() - self._started,
+            )
         )
-        duration = float(completed.stdout.strip())
-        return max(duration, 0.0)
-    except (OSError, ValueError, subprocess.SubprocessError):
-        return fallback
+
+
+@dataclass(frozen=True, slots=True)
+class DecodedAudio:
+    """Mono float32 samples of one file at the model's sample rate."""
+
+    path: Path
+    samples: Any
+    sample_rate: int
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+
+def model_sample_rate(model: Any) -> int:
+    return getattr(getattr(model, "preprocessor_config", None), "sample_rate", SAMPLE_RATE)
+
+
+def decode_audio(path: Path, sample_rate: int = SAMPLE_RATE) -> DecodedAudio:
+    """Decode any ffmpeg-readable file to mono float32 samples, as parakeet does.
+
+    Mono PCM WAV already at ``sample_rate`` is read directly, without ffmpeg.
+    """
+
+    from paratran.pcm import read_native_wav
+
+    with tracing.span("decode_audio", path=str(path), sample_rate=sample_rate) as span:
+        if (samples := read_native_wav(path, sample_rate)) is not None:
+            span.set(decoder="wav", audio_seconds=len(samples) / sample_rate)
+            return DecodedAudio(path=path, samples=samples, sample_rate=sample_rate)
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("FFmpeg is not installed or not in your PATH.")
+        # fmt: off
+        command = [
+            ffmpeg, "-nostdin", "-i", str(path),
+            "-threads", "0", "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le",
+            "-ar", str(sample_rate), "-",
+        ]
+        # fmt: on
+        completed = subprocess.run(command, capture_output=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"Failed to load audio: {completed.stderr.decode(errors='replace')}")
+
+        import numpy as np
+
+        samples = np.frombuffer(completed.stdout, np.int16).astype(np.float32) / 32768.0
+        span.set(decoder="ffmpeg", audio_seconds=len(samples) / sample_rate)
+        return DecodedAudio(path=path, samples=samples, sample_rate=sample_rate)
+
+
+def _decoding_config(options: TranscriptionOptions, decoding: str | None = None):
+    """parakeet's config for ``decoding``, by default ``options.decoding``.
+
+    Hybrid decoding starts with a greedy pass.
+    """
+
+    from parakeet_mlx import Beam, DecodingConfig, Greedy, SentenceConfig
+
+    decoding_method = (
+        Beam(
+            beam_size=options.beam_size,
+            length_penalty=options.length_penalty,
+            patience=options.patience,
+            duration_reward=options.duration_reward,
+        )
+        if (decoding or options.decoding) == "beam"
+        else Greedy()
+    )
+    return DecodingConfig(
+        decoding=decoding_method,
+        sentence=SentenceConfig(
+            max_words=options.max_words,
+            silence_gap=options.silence_gap,
+            max_duration=options.max_duration,
+        ),
+    )
+
+
+def _infer(model: Any, audio: DecodedAudio, options: TranscriptionOptions, monitor: _ChunkMonitor):
+    """Decode ``audio`` with the configured method; hybrid adds a beam pass."""
+
+    import mlx.core as mx
+
+    samples = mx.array(audio.samples)
+    result = _decode_chunks(model, samples, audio, options, monitor)
+    if options.decoding == "hybrid":
+        result = _redecode_low_confidence(model, samples, audio, options, result, monitor)
+    return result
+
+
+def _decode_chunks(
+    model: Any,
+    samples: Any,
+    audio: DecodedAudio,
+    options: TranscriptionOptions,
+    monitor: _ChunkMonitor,
+):
+    """parakeet's ``BaseParakeet.transcribe`` loop, on samples decoded ahead of time."""
+
+    from parakeet_mlx.alignment import (
+        merge_longest_common_subsequence,
+        merge_longest_contiguous,
+        sentences_to_result,
+        tokens_to_sentences,
+    )
+    from parakeet_mlx.audio import get_logmel
+
+    preprocessor = model.preprocessor_config
+    config = _decoding_config(options)
+    total = len(audio.samples)
+    if total < preprocessor.hop_length:
+        raise ValueError(
+            f"Audio must contain at least {preprocessor.hop_length} decoded samples; "
+            f"got {total} from {audio.path}"
+        )
+
+    chunk_samples = int((options.chunk_duration or 0) * audio.sample_rate)
+    if not chunk_samples or total <= chunk_samples:
+        return model.generate(get_logmel(samples, preprocessor), decoding_config=config)[0]
+
+    overlap_samples = int(options.overlap_duration * audio.sample_rate)
+    tokens: list[Any] = []
+    for start in range(0, total, chunk_samples - overlap_samples):
+        end = min(start + chunk_samples, total)
+        monitor(end, total)
+        if end - start < preprocessor.hop_length:
+            break
+        chunk = model.generate(
+            get_logmel(samples[start:end], preprocessor), decoding_config=config
+        )[0]
+        offset = start / audio.sample_rate
+        for sentence in chunk.sentences:
+            for token in sentence.tokens:
+                token.start += offset
+                token.end = token.start + token.duration
+        if not tokens:
+            tokens = chunk.tokens
+            continue
+        try:
+            tokens = merge_longest_contiguous(
+                tokens, chunk.tokens, overlap_duration=options.overlap_duration
+            )
+        except RuntimeError:
+            tokens = merge_longest_common_subsequence(
+                tokens, chunk.tokens, overlap_duration=options.overlap_duration
+            )
+    return sentences_to_result(tokens_to_sentences(tokens, config.sentence))
+
+
+def _redecode_low_confidence(
+    model: Any,
+    samples: Any,
+    audio: DecodedAudio,
+    options: TranscriptionOptions,
+    result: Any,
+    monitor: _ChunkMonitor,
+):
+    """Beam-decode the low-confidence words of a greedy ``result`` and splice them in."""
+
+    from parakeet_mlx.alignment import sentences_to_result, tokens_to_sentences
+    from parakeet_mlx.audio import get_logmel
+
+    tokens = list(result.tokens)
+    spans = hybrid.low_confidence_spans(tokens, options.confidence_threshold)
+    tracing.current().set(hybrid_spans=len(spans))
+    if not spans:
+        return result
+
+    preprocessor = model.preprocessor_config
+    config = _decoding_config(options, "beam")
+    # Splice from the end so earlier spans keep their token indices.
+    for span in reversed(spans):
+        monitor.check_cancelled()
+        start, end = hybrid.decode_window(span, audio.duration)
+        window = samples[int(start * audio.sample_rate) : int(end * audio.sample_rate)]
+        if window.shape[0] < preprocessor.hop_length:
+            continue
+        beam = model.generate(get_logmel(window, preprocessor), decoding_config=config)[0]
+        replacement = beam.tokens
+        for token in replacement:
+            token.start += start
+            token.end = token.start + token.duration
+        tokens = hybrid.splice(tokens, span, replacement)
+    return sentences_to_result(tokens_to_sentences(tokens, config.sentence))
+
+
+def transcribe_decoded(
+    audio: DecodedAudio,
+    options: TranscriptionOptions,
+    *,
+    model_name: str | None = None,
+    model_dir: str | None = None,
+    is_cancelled: Callable[[], bool] | None = None,
+    progress: Callable[[TranscriptionProgress], None] | None = None,
+) -> TranscriptionResult:
+    """Run inference on audio from ``decode_audio``; the model-bound pipeline stage.
+
+    With ``options.diarize``, speakers are labelled from the same samples.
+    ``processing_time`` covers inference and diarization, not decoding.
+    """
+
+    model = get_model(model_name, model_dir, options.precision)
+    monitor = _ChunkMonitor(audio.path, options, audio.sample_rate, is_cancelled, progress)
+    monitor.check_cancelled()
+
+    start = time.perf_counter()
+    with tracing.span("inference", audio_seconds=audio.duration) as span:
+        if span:
+            span.set(**tracing.option_attributes(options))
+        result = _infer(model, audio, options, monitor)
+        span.set(chunks=monitor.chunks)
+    sentences = _to_sentences(result.sentences)
+    if options.diarize:
+        sentences = _diarize(audio, sentences, options)
+    elapsed = time.perf_counter() - start
+
+    monitor.finish(audio.duration)
+    return TranscriptionResult(
+        text=result.text,
+        duration=audio.duration,
+        processing_time=round(elapsed, 3),
+        sentences=sentences,
+    )
+
+
+def _diarize(
+    audio: DecodedAudio, sentences: tuple[Sentence, ...], options: TranscriptionOptions
+) -> tuple[Sentence, ...]:
+    from paratran.diarization import diarize
+
+    with tracing.span("diarize", audio_seconds=audio.duration) as span:
+        labelled = diarize(audio.samples, audio.sample_rate, sentences, options.num_speakers)
+        if span:
+            span.set(speakers=len({sentence.speaker for sentence in labelled}))
+        return labelled
+
+
+def _to_sentences(segments: Any) -> tuple[Sentence, ...]:
+    return tuple(
+        Sentence(
+            text=segment.text,
+            start=segment.start,
+            end=segment.end,
+            tokens=tuple(
+                Token(
+                    text=token.text,
+                    start=token.start,
+                    end=token.end,
+                    duration=getattr(token, "duration", None),
+                    confidence=getattr(token, "confidence", None),
+                )
+                for token in segment.tokens
+            ),
+        )
+        for segment in segments
+    )
+
+
+def revise_decoded(
+    audio: DecodedAudio,
+    previous: Revision | None,
+    options: TranscriptionOptions,
+    *,
+    model_name: str | None = None,
+    model_dir: str | None = None,
+    is_cancelled: Callable[[], bool] | None = None,
+    progress: Callable[[TranscriptionProgress], None] | None = None,
+) -> Revision:
+    """Bring ``previous`` up to date with ``audio``, decoding only what changed.
+
+    Without a previous revision the whole file is transcribed. ``progress``
+    covers the re-decoded window only.
+    """
+
+    from parakeet_mlx.alignment import tokens_to_sentences
+
+    fingerprint = incremental.fingerprint_audio(audio.samples, audio.sample_rate)
+    splice = None
+    if previous is not None:
+        splice = incremental.plan_splice(previous, audio.samples, audio.sample_rate)
+        if splice is None:
+            return Revision(previous.result, fingerprint)
+    if splice is None or (splice.before == 0 and splice.after == len(previous.result.sentences)):
+        result = transcribe_decoded(
+            audio,
+            options,
+            model_name=model_name,
+            model_dir=model_dir,
+            is_cancelled=is_cancelled,
+            progress=progress,
+        )
+        return Revision(result, fingerprint)
+
+    model = get_model(model_name, model_dir, options.precision)
+    window_start, window_end = splice.window(audio.duration)
+    window = DecodedAudio(
+        audio.path,
+        audio.samples[int(window_start * audio.sample_rate) : int(window_end * audio.sample_rate)],
+        audio.sample_rate,
+    )
+    monitor = _ChunkMonitor(audio.path, options, audio.sample_rate, is_cancelled, progress)
+    monitor.check_cancelled()
+
+    start = time.perf_counter()
+    with tracing.span(
+        "inference", audio_seconds=window.duration, window_start=window_start
+    ) as span:
+        if span:
+            span.set(**tracing.option_attributes(options))
+        decoded = _infer(model, window, options, monitor)
+        span.set(chunks=monitor.chunks)
+    tokens = decoded.tokens
+    for token in tokens:
+        token.start += window_start
+        token.end = token.start + token.duration
+    sentences = tokens_to_sentences(
+        incremental.inside(splice, tokens), _decoding_config(options).sentence
+    )
+    result = incremental.apply_splice(
+        previous.result, splice, _to_sentences(sentences), audio.duration, 0.0
+    )
+    if options.diarize:
+        # Speaker labels depend on the whole recording, so label it all again.
+        result = replace(result, sentences=_diarize(audio, result.sentences, options))
+    elapsed = time.perf_counter() - start
+
+    monitor.finish(window.duration)
+    return Revision(replace(result, processing_time=round(elapsed, 3)), fingerprint)
+
+
+def validate_audio_path(file_path: str) -> Path:
+    path = Path(file_path)
+    if not path.is_file():
+        raise FileNotFoundError(f"Audio file not found: {file_path}")
+
+    suffix = path.suffix.lower()
+    if suffix not in ALLOWED_EXTENSIONS:
+        raise ValueError(
+            f"Unsupported file type '{suffix}'. Allowed: {', '.join(sorted(ALLOWED_EXTENSIONS))}"
+        )
+    return path
 
 
 def transcribe_file(
@@ -137,17 +578,21 @@ def transcribe_file(
     chunk_duration: float | None = DEFAULT_CHUNK_DURATION,
     overlap_duration: float = DEFAULT_OVERLAP_DURATION,
     fp32: bool = False,
+    precision: str = DEFAULT_PRECISION,
+    is_cancelled: Callable[[], bool] | None = None,
+    progress: Callable[[TranscriptionProgress], None] | None = None,
 ) -> TranscriptionResult:
-    path = Path(file_path)
-    if not path.is_file():
-        raise FileNotFoundError(f"Audio file not found: {file_path}")
+    """Transcribe one file.
 
-    suffix = path.suffix.lower()
-    if suffix not in ALLOWED_EXTENSIONS:
-        raise ValueError(
-            f"Unsupported file type '{suffix}'. Allowed: {', '.join(sorted(ALLOWED_EXTENSIONS))}"
-        )
+    ``is_cancelled`` is polled before inference and before every chunk; once it
+    returns true the call raises ``TranscriptionCancelled``, so abandoned work
+    stops within one chunk instead of running to the end. ``progress`` is
+    called on the transcribing thread before each chunk and once at the end.
+    Runs decoding and inference back to back; ``paratran.pipeline`` overlaps
+    them across files.
+    """
 
+    path = validate_audio_path(file_path)
     if options is None:
         options = _build_options(
             decoding=decoding,
@@ -161,73 +606,50 @@ def transcribe_file(
             chunk_duration=chunk_duration,
             overlap_duration=overlap_duration,
             fp32=fp32,
+            precision=precision,
         )
 
-    model = get_model(model_name, model_dir)
-
-    from parakeet_mlx import Beam, DecodingConfig, Greedy, SentenceConfig
-
-    decoding_method = (
-        Beam(
-            beam_size=options.beam_size,
-            length_penalty=options.length_penalty,
-            patience=options.patience,
-            duration_reward=options.duration_reward,
+    with tracing.span("transcribe_file", path=str(path)) as span:
+        if span:
+            span.set(**tracing.option_attributes(options))
+        model = get_model(model_name, model_dir, options.precision)
+        if is_cancelled is not None and is_cancelled():
+            raise TranscriptionCancelled(f"Transcription of {path.name} was cancelled")
+        return transcribe_decoded(
+            decode_audio(path, model_sample_rate(model)),
+            options,
+            model_name=model_name,
+            model_dir=model_dir,
+            is_cancelled=is_cancelled,
+            progress=progress,
         )
-        if options.decoding == "beam"
-        else Greedy()
-    )
-    config = DecodingConfig(
-        decoding=decoding_method,
-        sentence=SentenceConfig(
-            max_words=options.max_words,
-            silence_gap=options.silence_gap,
-            max_duration=options.max_duration,
-        ),
-    )
 
-    import mlx.core as mx
-
-    dtype = mx.float32 if options.fp32 else mx.bfloat16
-    start = time.perf_counter()
-    result = model.transcribe(
-        str(path),
-        dtype=dtype,
-        decoding_config=config,
-        chunk_duration=options.chunk_duration,
-        overlap_duration=options.overlap_duration,
-    )
-    elapsed = time.perf_counter() - start
 
-    sentences: list[Sentence] = []
-    for segment in result.sentences:
-        tokens = tuple(
-            Token(
-                text=token.text,
-                start=token.start,
-                end=token.end,
-                duration=getattr(token, "duration", None),
-                confidence=getattr(token, "confidence", None),
-            )
-            for token in segment.tokens
-        )
-        sentences.append(
-            Sentence(
-                text=segment.text,
-                start=segment.start,
-                end=segment.end,
-                tokens=tokens,
-            )
+def revise_file(
+    file_path: str,
+    previous: Revision | None,
+    options: TranscriptionOptions,
+    *,
+    model_name: str | None = None,
+    model_dir: str | None = None,
+    is_cancelled: Callable[[], bool] | None = None,
+    progress: Callable[[TranscriptionProgress], None] | None = None,
+) -> Revision:
+    """Decode one file and update ``previous`` with ``revise_decoded``."""
+
+    path = validate_audio_path(file_path)
+    with tracing.span("revise_file", path=str(path), previous=previous is not None):
+        model = get_model(model_name, model_dir, options.precision)
+        return revise_decoded(
+            decode_audio(path, model_sample_rate(model)),
+            previous,
+            options,
+            model_name=model_name,
+            model_dir=model_dir,
+            is_cancelled=is_cancelled,
+            progress=progress,
         )
 
-    speech_end = sentences[-1].end if sentences else 0.0
-    return TranscriptionResult(
-        text=result.text,
-        duration=_audio_duration(path, speech_end),
-        processing_time=round(elapsed, 3),
-        sentences=tuple(sentences),
-    )
-
 
 def transcribe_file_json(file_path: str, **kwargs: Any) -> str:
     """Transcribe and return as a formatted JSON string."""
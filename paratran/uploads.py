@@ -0,0 +1,292 @@
+"""Resumable upload sessions for the REST interface.
+
+The protocol follows the shape of tus: a client creates a session with the
+total length, appends bytes with ``PATCH`` at an explicit offset, asks for the
+current offset with ``HEAD`` after a failure, and finalizes once every byte has
+arrived.
+
+A session is two files in the store's directory: ``<id>.session`` holds its
+declared length and suffix, and ``<id><suffix>`` its bytes, whose size is the
+current offset. Nothing else is kept in memory, so the HTTP workers of a
+multi-worker server share sessions through one directory, whichever worker
+each request reaches. An ``flock`` on the data file keeps appends exclusive
+across processes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import hashlib
+import json
+import os
+import re
+import secrets
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from paratran.result_cache import file_sha256
+
+DEFAULT_UPLOAD_TTL = 3600.0
+DEFAULT_MAX_UPLOADS = 64
+DEFAULT_UPLOAD_QUOTA_MB = 4096
+# Request body chunks are gathered into writes of this size, each done off the
+# event loop.
+WRITE_BYTES = 1024 * 1024
+_SESSION_SUFFIX = ".session"
+_UPLOAD_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class UploadError(Exception):
+    """Raised when an upload request conflicts with the session state."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass(slots=True)
+class UploadSession:
+    upload_id: str
+    path: Path
+    length: int
+    suffix: str
+    offset: int = 0
+    updated: float = 0.0
+
+    @property
+    def complete(self) -> bool:
+        return self.offset == self.length
+
+
+def _try_lock(upload_file: BinaryIO) -> bool:
+    try:
+        fcntl.flock(upload_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+class UploadStore:
+    """Create, append to, and expire resumable upload sessions kept in ``directory``."""
+
+    def __init__(
+        self,
+        directory: Path | None = None,
+        ttl: float = DEFAULT_UPLOAD_TTL,
+        *,
+        max_uploads: int = DEFAULT_MAX_UPLOADS,
+        max_bytes: int = DEFAULT_UPLOAD_QUOTA_MB * 1024 * 1024,
+    ):
+        self._owns_directory = directory is None
+        self.directory = directory or Path(tempfile.mkdtemp(prefix="paratran-uploads-"))
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._ttl = ttl
+        self.max_uploads = max_uploads
+        self.max_bytes = max_bytes
+        # SHA-256 of uploads this process has received from the first byte, so
+        # finalizing them needs no second read. ``{upload_id: (offset, digest)}``.
+        self._digests: dict[str, tuple[int, Any]] = {}
+
+    @classmethod
+    def from_environment(cls) -> UploadStore:
+        directory = os.environ.get("PARATRAN_UPLOAD_DIR")
+        try:
+            ttl = max(float(os.environ.get("PARATRAN_UPLOAD_TTL", DEFAULT_UPLOAD_TTL)), 1.0)
+        except ValueError:
+            ttl = DEFAULT_UPLOAD_TTL
+        try:
+            max_uploads = int(os.environ.get("PARATRAN_MAX_UPLOADS", DEFAULT_MAX_UPLOADS))
+        except ValueError:
+            max_uploads = DEFAULT_MAX_UPLOADS
+        try:
+            quota_mb = int(os.environ.get("PARATRAN_UPLOAD_QUOTA_MB", DEFAULT_UPLOAD_QUOTA_MB))
+        except ValueError:
+            quota_mb = DEFAULT_UPLOAD_QUOTA_MB
+        return cls(
+            Path(directory) if directory else None,
+            ttl,
+            max_uploads=max(max_uploads, 0),
+            max_bytes=max(quota_mb, 0) * 1024 * 1024,
+        )
+
+    def _session_path(self, upload_id: str) -> Path:
+        return self.directory / f"{upload_id}{_SESSION_SUFFIX}"
+
+    def _load(self, upload_id: str) -> UploadSession | None:
+        if not _UPLOAD_ID_PATTERN.match(upload_id):
+            return None
+        session_path = self._session_path(upload_id)
+        try:
+            state = json.loads(session_path.read_text())
+            path = self.directory / f"{upload_id}{state['suffix']}"
+            data = path.stat()
+            updated = max(data.st_mtime, session_path.stat().st_mtime)
+            return UploadSession(
+                upload_id=upload_id,
+                path=path,
+                length=int(state["length"]),
+                suffix=state["suffix"],
+                offset=data.st_size,
+                updated=updated,
+            )
+        except (OSError, KeyError, TypeError, ValueError):
+            return None
+
+    def _sessions(self) -> list[UploadSession]:
+        sessions = []
+        for session_path in self.directory.glob(f"*{_SESSION_SUFFIX}"):
+            session = self._load(session_path.name.removesuffix(_SESSION_SUFFIX))
+            if session is not None:
+                sessions.append(session)
+        return sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions())
+
+    @property
+    def reserved_bytes(self) -> int:
+        """Bytes declared by open sessions, whether or not they have arrived yet."""
+
+        return sum(session.length for session in self._sessions())
+
+    def create(self, length: int, suffix: str) -> UploadSession:
+        """Open a session, or raise ``UploadError`` if the store is at a limit.
+
+        ``max_uploads`` and ``max_bytes`` bound the open sessions and their
+        declared lengths (``0`` disables a limit), so callers cannot reserve
+        unbounded disk by creating uploads they never send.
+        """
+
+        self.expire()
+        sessions = self._sessions()
+        reserved = sum(session.length for session in sessions)
+        if self.max_uploads and len(sessions) >= self.max_uploads:
+            raise UploadError(429, f"Too many uploads in progress ({self.max_uploads})")
+        if self.max_bytes and reserved + length > self.max_bytes:
+            raise UploadError(
+                413,
+                f"Upload-Length {length} exceeds the space left for uploads in progress "
+                f"({max(self.max_bytes - reserved, 0)} bytes)",
+            )
+        upload_id = secrets.token_hex(16)
+        path = self.directory / f"{upload_id}{suffix}"
+        path.touch()
+        # Written last: a session is visible to other workers once complete.
+        self._session_path(upload_id).write_text(json.dumps({"length": length, "suffix": suffix}))
+        self._digests[upload_id] = (0, hashlib.sha256())
+        return UploadSession(
+            upload_id=upload_id, path=path, length=length, suffix=suffix, updated=time.time()
+        )
+
+    def get(self, upload_id: str) -> UploadSession:
+        self.expire()
+        session = self._load(upload_id)
+        if session is None:
+            raise UploadError(404, f"Unknown upload '{upload_id}'")
+        return session
+
+    async def append(self, session: UploadSession, offset: int, chunks) -> int:
+        """Write an async iterator of byte chunks at ``offset`` and return the new offset."""
+
+        upload_file = await asyncio.to_thread(session.path.open, "ab")
+        try:
+            if not _try_lock(upload_file):
+                raise UploadError(409, "Another request is already appending to this upload")
+            if not self._session_path(session.upload_id).exists():
+                raise UploadError(404, f"Unknown upload '{session.upload_id}'")
+            # Another worker may have appended since ``get``.
+            session.offset = os.fstat(upload_file.fileno()).st_size
+            if offset != session.offset:
+                raise UploadError(
+                    409, f"Upload-Offset {offset} does not match current offset {session.offset}"
+                )
+            tracked = self._digests.pop(session.upload_id, None)
+            digest = tracked[1] if tracked is not None and tracked[0] == session.offset else None
+            pending = bytearray()
+            try:
+                async for chunk in chunks:
+                    if session.offset + len(pending) + len(chunk) > session.length:
+                        raise UploadError(413, "Upload exceeds its declared Upload-Length")
+                    pending += chunk
+                    if len(pending) >= WRITE_BYTES:
+                        await self._write(session, upload_file, pending, digest)
+                        pending = bytearray()
+            finally:
+                # Keep what arrived before an error or a dropped connection, so
+                # the offset the client resumes from is accurate.
+                if pending:
+                    await self._write(session, upload_file, pending, digest)
+            return session.offset
+        finally:
+            upload_file.close()
+
+    async def _write(
+        self, session: UploadSession, upload_file: BinaryIO, data: bytearray, digest: Any
+    ) -> None:
+        def write() -> None:
+            upload_file.write(data)
+            # Other workers read the offset from the file size.
+            upload_file.flush()
+
+        await asyncio.to_thread(write)
+        session.offset += len(data)
+        session.updated = time.time()
+        if digest is not None:
+            digest.update(data)
+            self._digests[session.upload_id] = (session.offset, digest)
+
+    def take(self, upload_id: str) -> UploadSession:
+        """Detach a complete session so it cannot be appended to or finalized twice."""
+
+        session = self.get(upload_id)
+        with session.path.open("ab") as upload_file:
+            if not _try_lock(upload_file):
+                raise UploadError(409, "Upload is still receiving data")
+            session.offset = os.fstat(upload_file.fileno()).st_size
+            if not session.complete:
+                raise UploadError(
+                    409,
+                    f"Upload is incomplete: {session.offset} of {session.length} bytes received",
+                )
+            try:
+                # Only one worker can remove the session file; the others get 404.
+                self._session_path(upload_id).unlink()
+            except FileNotFoundError:
+                raise UploadError(404, f"Unknown upload '{upload_id}'") from None
+        return session
+
+    async def sha256(self, session: UploadSession) -> str:
+        """Hex SHA-256 of a taken session's bytes."""
+
+        digest = self._digests.pop(session.upload_id, None)
+        if digest is not None and digest[0] == session.length:
+            return digest[1].hexdigest()
+        # Some bytes arrived through another worker.
+        return await asyncio.to_thread(file_sha256, session.path)
+
+    def remove(self, upload_id: str) -> None:
+        session = self._load(upload_id)
+        self._digests.pop(upload_id, None)
+        if session is not None:
+            self._session_path(upload_id).unlink(missing_ok=True)
+            session.path.unlink(missing_ok=True)
+
+    def expire(self) -> None:
+        cutoff = time.time() - self._ttl
+        for session in self._sessions():
+            if session.updated >= cutoff:
+                continue
+            with session.path.open("ab") as upload_file:
+                if _try_lock(upload_file):
+                    self.remove(session.upload_id)
+
+    def close(self) -> None:
+        # Sessions in a shared or configured directory outlive this process and
+        # expire by age; only a private directory is removed.
+        if self._owns_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
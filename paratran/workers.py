@@ -0,0 +1,421 @@
+"""Dedicated inference processes reached over Unix domain sockets.
+
+``paratran serve --workers N`` runs N HTTP front ends that parse uploads and
+render responses, and forwards each stored upload to one of the inference
+processes started here. Only the inference processes load a model, so request
+handling scales with HTTP workers without multiplying model memory.
+"""
+
+from __future__ import annotations
+
+import functools
+import itertools
+import multiprocessing
+import os
+import secrets
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+from typing import Any
+
+from paratran import profiling, tracing
+from paratran.contracts import (
+    TranscriptionCancelled,
+    TranscriptionOptions,
+    TranscriptionProgress,
+    TranscriptionResult,
+)
+from paratran.incremental import Revision
+from paratran.profiling import Profiler
+
+_ERROR_TYPES: dict[str, type[Exception]] = {
+    "FileNotFoundError": FileNotFoundError,
+    "OSError": OSError,
+    "RuntimeError": RuntimeError,
+    "TranscriptionCancelled": TranscriptionCancelled,
+    "ValueError": ValueError,
+}
+_CANCEL_POLL_SECONDS = 0.25
+
+
+def _transcribe(
+    path: str,
+    options: TranscriptionOptions,
+    is_cancelled: Callable[[], bool] | None = None,
+    progress: Callable[[TranscriptionProgress], None] | None = None,
+) -> TranscriptionResult:
+    from paratran.pipeline import shared_pipeline
+
+    return shared_pipeline().transcribe(path, options, is_cancelled, progress)
+
+
+def _revise(
+    path: str,
+    options: TranscriptionOptions,
+    previous: Revision | None,
+    is_cancelled: Callable[[], bool] | None = None,
+    progress: Callable[[TranscriptionProgress], None] | None = None,
+) -> Revision:
+    from paratran.transcribe import revise_file
+
+    return revise_file(path, previous, options, is_cancelled=is_cancelled, progress=progress)
+
+
+@functools.cache
+def _profiler() -> Profiler | None:
+    """Profiles requests a profiling front end forwards, into the same directory."""
+
+    return Profiler.from_environment()
+
+
+def _load_model() -> None:
+    from paratran.transcribe import get_model
+
+    get_model()
+
+
+class InferenceServer:
+    """Answer transcription requests on one socket, each connection on its own thread.
+
+    Requests share the process's ``TranscriptionPipeline``, so one file decodes
+    while another runs through the model.
+
+    With ``idle_timeout`` set, the server closes itself once that many seconds
+    pass without a request.
+    """
+
+    def __init__(self, address: str, authkey: bytes, idle_timeout: float = 0.0):
+        self.address = address
+        self._listener = Listener(address, family="AF_UNIX", authkey=authkey)
+        self._closed = threading.Event()
+        self._idle_timeout = idle_timeout
+        self._active = 0
+        self._lock = threading.Lock()
+        self._last_active = time.monotonic()
+
+    def serve_forever(self) -> None:
+        if self._idle_timeout > 0:
+            threading.Thread(target=self._close_when_idle, daemon=True).start()
+        while not self._closed.is_set():
+            try:
+                connection = self._listener.accept()
+            except (AuthenticationError, EOFError, OSError):
+                continue
+            if self._closed.is_set():
+                connection.close()
+                return
+            with self._lock:
+                self._active += 1
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _serve(self, connection: Connection) -> None:
+        try:
+            with connection:
+                self._handle(connection)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._last_active = time.monotonic()
+
+    def _close_when_idle(self) -> None:
+        while not self._closed.wait(min(self._idle_timeout, 1.0)):
+            if not self._active and time.monotonic() - self._last_active >= self._idle_timeout:
+                self.close()
+                return
+
+    def _handle(self, connection: Connection) -> None:
+        try:
+            request = connection.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            reply = self.dispatch(request, connection)
+        except Exception as exc:  # noqa: BLE001 - every failure is reported to the caller
+            reply = {"ok": False, "error": type(exc).__name__, "message": str(exc)}
+        try:
+            connection.send(reply)
+        except OSError:
+            # The front end gave up on this request; nothing is waiting for the reply.
+            pass
+
+    def dispatch(
+        self, request: dict[str, Any], connection: Connection | None = None
+    ) -> dict[str, Any]:
+        if request.get("op") == "ping":
+            return {"ok": True, "pid": os.getpid()}
+        if request.get("op") not in ("transcribe", "revise"):
+            raise ValueError(f"Unknown inference request '{request.get('op')}'")
+        capture = None
+        if (profile_id := request.get("profile")) and (profiler := _profiler()) is not None:
+            capture = profiler.start(f"worker {request['op']}", profile_id=profile_id)
+        try:
+            with (
+                tracing.continue_trace(request.get("traceparent")),
+                tracing.span(f"worker.{request['op']}", pid=os.getpid()),
+            ):
+                return self._run(request, connection)
+        finally:
+            if capture is not None:
+                capture.stop()
+
+    def _run(self, request: dict[str, Any], connection: Connection | None) -> dict[str, Any]:
+        options = TranscriptionOptions(**request["options"])
+        is_cancelled = progress = None
+        if connection is not None:
+            is_cancelled = _peer_cancelled(connection)
+            if request.get("progress"):
+
+                def progress(update: TranscriptionProgress) -> None:
+                    connection.send({"progress": update.to_dict()})
+
+        if request["op"] == "revise":
+            previous = request.get("previous")
+            revision = _revise(
+                request["path"],
+                options,
+                Revision.from_dict(previous) if previous else None,
+                is_cancelled,
+                progress,
+            )
+            return {"ok": True, "revision": revision.to_dict()}
+        result = _transcribe(request["path"], options, is_cancelled, progress)
+        return {"ok": True, "result": result.to_dict()}
+
+    def close(self) -> None:
+        self._closed.set()
+        # Closing the listener does not interrupt a blocked accept(), so connect
+        # once to let serve_forever observe the closed flag.
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as waker:
+                waker.connect(self.address)
+        except OSError:
+            pass
+        self._listener.close()
+
+
+def _peer_cancelled(connection: Connection) -> Callable[[], bool]:
+    # The front end sends nothing after its request unless it wants to cancel,
+    # so any message, or a hang-up, means the result is no longer wanted.
+    def is_cancelled() -> bool:
+        try:
+            return connection.poll()
+        except (EOFError, OSError):
+            return True
+
+    return is_cancelled
+
+
+def request(
+    address: str,
+    authkey: bytes,
+    message: dict[str, Any],
+    is_cancelled: Callable[[], bool] | None = None,
+    progress: Callable[[TranscriptionProgress], None] | None = None,
+) -> dict[str, Any]:
+    """Send one message to an inference socket and re-raise remote failures locally.
+
+    Progress updates sent by the worker before its reply go to ``progress``.
+    """
+
+    with Client(address, family="AF_UNIX", authkey=authkey) as connection:
+        connection.send({**message, "progress": progress is not None})
+        cancel_sent = False
+        while True:
+            while not connection.poll(_CANCEL_POLL_SECONDS):
+                if not cancel_sent and is_cancelled is not None and is_cancelled():
+                    connection.send({"op": "cancel"})
+                    cancel_sent = True
+            reply = connection.recv()
+            if "progress" not in reply:
+                break
+            if progress is not None:
+                progress(TranscriptionProgress.from_dict(reply["progress"]))
+    if not reply.get("ok"):
+        error_type = _ERROR_TYPES.get(reply.get("error"), RuntimeError)
+        raise error_type(reply.get("message") or "Inference worker failed")
+    return reply
+
+
+class InferencePool:
+    """Forward jobs to the inference socket with the fewest requests outstanding."""
+
+    def __init__(self, addresses: list[str], authkey: bytes):
+        if not addresses:
+            raise ValueError("InferencePool needs at least one socket address")
+        self.addresses = addresses
+        self._authkey = authkey
+        self._outstanding = dict.fromkeys(addresses, 0)
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls) -> InferencePool | None:
+        sockets = os.environ.get("PARATRAN_INFERENCE_SOCKETS")
+        if not sockets:
+            return None
+        authkey = bytes.fromhex(os.environ["PARATRAN_INFERENCE_AUTHKEY"])
+        return cls(sockets.split(os.pathsep), authkey)
+
+    def transcribe(
+        self,
+        path: str,
+        options: TranscriptionOptions,
+        is_cancelled: Callable[[], bool] | None = None,
+        progress: Callable[[TranscriptionProgress], None] | None = None,
+    ) -> TranscriptionResult:
+        reply = self._request(
+            {"op": "transcribe", "path": path, "options": options.to_dict()},
+            is_cancelled,
+            progress,
+        )
+        return TranscriptionResult.from_dict(reply["result"])
+
+    def revise(
+        self,
+        path: str,
+        options: TranscriptionOptions,
+        previous: Revision | None,
+        is_cancelled: Callable[[], bool] | None = None,
+        progress: Callable[[TranscriptionProgress], None] | None = None,
+    ) -> Revision:
+        """Update ``previous`` for the current contents of ``path``, re-decoding only changes."""
+
+        reply = self._request(
+            {
+                "op": "revise",
+                "path": path,
+                "options": options.to_dict(),
+                "previous": previous.to_dict() if previous else None,
+            },
+            is_cancelled,
+            progress,
+        )
+        return Revision.from_dict(reply["revision"])
+
+    def _request(
+        self,
+        message: dict[str, Any],
+        is_cancelled: Callable[[], bool] | None,
+        progress: Callable[[TranscriptionProgress], None] | None,
+    ) -> dict[str, Any]:
+        with self._lock:
+            tiebreak = next(self._order)
+            address = min(
+                self.addresses,
+                key=lambda item: (
+                    self._outstanding[item],
+                    (self.addresses.index(item) - tiebreak) % len(self.addresses),
+                ),
+            )
+            self._outstanding[address] += 1
+        try:
+            with tracing.span("inference_pool.request", op=message["op"], socket=address):
+                if (parent := tracing.traceparent()) is not None:
+                    message = {**message, "traceparent": parent}
+                if (profile_id := profiling.active_profile()) is not None:
+                    message = {**message, "profile": profile_id}
+                return request(address, self._authkey, message, is_cancelled, progress)
+        finally:
+            with self._lock:
+                self._outstanding[address] -= 1
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "inference_workers": len(self.addresses),
+            "inference_ready": sum(Path(address).exists() for address in self.addresses),
+        }
+
+
+def _inference_main(address: str, authkey: bytes, ready: Connection | None) -> None:
+    _load_model()
+    server = InferenceServer(address, authkey)
+    if ready is not None:
+        ready.send(os.getpid())
+        ready.close()
+    server.serve_forever()
+
+
+class Supervisor:
+    """Start, watch, and restart inference processes for multi-worker serving."""
+
+    def __init__(self, count: int):
+        self.count = max(count, 1)
+        # AF_UNIX paths are limited to ~104 bytes on macOS, and the per-user
+        # temporary directory there is already long, so prefer /tmp.
+        base = "/tmp" if os.path.isdir("/tmp") else None
+        self.directory = Path(tempfile.mkdtemp(prefix="paratran-", dir=base))
+        self.authkey = secrets.token_bytes(32)
+        self.addresses = [str(self.directory / f"inference-{index}.sock") for index in range(count)]
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: list[multiprocessing.process.BaseProcess | None] = [None] * self.count
+        self._stopping = threading.Event()
+        self._monitor: threading.Thread | None = None
+
+    def _spawn(self, index: int, wait: bool) -> None:
+        Path(self.addresses[index]).unlink(missing_ok=True)
+        receiver, sender = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_inference_main,
+            args=(self.addresses[index], self.authkey, sender),
+            name=f"paratran-inference-{index}",
+            daemon=True,
+        )
+        process.start()
+        sender.close()
+        self._processes[index] = process
+        if wait:
+            # Model download and conversion can take minutes on a fresh node;
+            # only give up if the process dies before reporting ready.
+            while not receiver.poll(1.0):
+                if not process.is_alive():
+                    raise RuntimeError(
+                        f"Inference worker {index} exited with code {process.exitcode}"
+                    )
+        receiver.close()
+
+    def start(self) -> None:
+        for index in range(self.count):
+            self._spawn(index, wait=True)
+        self._monitor = threading.Thread(target=self._watch, daemon=True)
+        self._monitor.start()
+
+    def _watch(self) -> None:
+        while not self._stopping.wait(1.0):
+            for index, process in enumerate(self._processes):
+                if process is not None and not process.is_alive() and not self._stopping.is_set():
+                    self._spawn(index, wait=False)
+
+    def environment(self) -> dict[str, str]:
+        """Settings for the HTTP workers: inference sockets and state they share.
+
+        Upload sessions, cached results, job status, and the concurrency
+        slots live in this supervisor's directory, so any HTTP worker can
+        answer for them and the limits hold across workers. An upload
+        directory configured by the user is kept.
+        """
+
+        return {
+            "PARATRAN_INFERENCE_SOCKETS": os.pathsep.join(self.addresses),
+            "PARATRAN_INFERENCE_AUTHKEY": self.authkey.hex(),
+            "PARATRAN_UPLOAD_DIR": os.environ.get("PARATRAN_UPLOAD_DIR")
+            or str(self.directory / "uploads"),
+            "PARATRAN_RESULT_CACHE_DIR": str(self.directory / "results"),
+            "PARATRAN_JOB_STATUS_DIR": str(self.directory / "jobs"),
+            "PARATRAN_SLOT_DIR": str(self.directory / "slots"),
+        }
+
+    def stop(self) -> None:
+        self._stopping.set()
+        for process in self._processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+        for process in self._processes:
+            if process is not None:
+                process.join(timeout=10)
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,35 @@
+from paratran.benchmark import reference_set, run_benchmark, word_errors
+from paratran.contracts import TranscriptionOptions, TranscriptionResult
+
+
+def test_word_errors_ignore_case_and_punctuation():
+    assert word_errors("Hello, world. It's fine!", "hello world its fine") == (1, 4)
+    assert word_errors("a b c", "a x c d") == (2, 3)
+    assert word_errors("", "") == (0, 0)
+
+
+def test_benchmark_compares_precisions_on_a_reference_set(tmp_path):
+    for stem, text in (("one", "the quick brown fox"), ("two", "jumps over")):
+        (tmp_path / f"{stem}.wav").write_bytes(b"audio")
+        (tmp_path / f"{stem}.txt").write_text(text)
+    (tmp_path / "unlabelled.wav").write_bytes(b"audio")
+    loaded = []
+
+    def transcribe(path, options):
+        reference = tmp_path.joinpath(path).with_suffix(".txt").read_text()
+        text = reference if options.precision == "bf16" else reference.replace("fox", "box")
+        return TranscriptionResult(text=text, duration=10.0, processing_time=0.5)
+
+    samples = reference_set(tmp_path)
+    rows = run_benchmark(
+        samples,
+        ["bf16", "int4"],
+        TranscriptionOptions(),
+        transcribe=transcribe,
+        load=loaded.append,
+    )
+
+    assert [path.name for path, _ in samples] == ["one.wav", "two.wav"]
+    assert loaded == ["bf16", "int4"]
+    assert [(row.precision, row.wer) for row in rows] == [("bf16", 0.0), ("int4", 1 / 6)]
+    assert rows[0].realtime_factor == 20.0
@@ -1,71 +1,42 @@
-import json
-from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
-from pathlib import Path
-from threading import Thread
-from urllib.error import HTTPError
+import subprocess
+import sys
 
-import pytest
+# Cumulative import time for `import paratran.cli`, in microseconds. The CLI
+# itself costs a few milliseconds; this leaves headroom for slow CI machines
+# while still catching an eager import of the HTTP client, FastAPI, or MCP.
+IMPORT_BUDGET_US = 150_000
 
-from paratran.cli import _upload_file
 
-
-class UploadHandler(BaseHTTPRequestHandler):
-    status = 200
-    response = {"text": "ok"}
-    body = b""
-
-    def do_POST(self):  # noqa: N802
-        length = int(self.headers["Content-Length"])
-        type(self).body = self.rfile.read(length)
-        self.send_response(type(self).status)
-        self.send_header("Content-Type", "application/json")
-        self.end_headers()
-        self.wfile.write(json.dumps(type(self).response).encode())
-
-    def log_message(self, *_args):
-        return
-
-
-@pytest.fixture
-def upload_server():
-    server = ThreadingHTTPServer(("127.0.0.1", 0), UploadHandler)
-    thread = Thread(target=server.serve_forever, daemon=True)
-    thread.start()
-    try:
-        yield server
-    finally:
-        server.shutdown()
-        server.server_close()
-        thread.join(timeout=2)
-
-
-def test_upload_streams_multipart_fields_and_file(tmp_path: Path, upload_server):
-    audio = tmp_path / "sample.wav"
-    audio.write_bytes(b"audio-bytes")
-
-    result = _upload_file(
-        f"http://127.0.0.1:{upload_server.server_port}/transcribe",
-        audio,
-        {"response_format": "verbose_json"},
-        timeout=5,
+def _import_times(module: str) -> dict[str, int]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
     )
-
-    assert result == {"text": "ok"}
-    assert b'name="response_format"' in UploadHandler.body
-    assert b"audio-bytes" in UploadHandler.body
-
-
-def test_upload_exposes_http_errors_as_http_error(tmp_path: Path, upload_server):
-    audio = tmp_path / "sample.wav"
-    audio.write_bytes(b"audio")
-    UploadHandler.status = 413
-    try:
-        with pytest.raises(HTTPError) as error:
-            _upload_file(
-                f"http://127.0.0.1:{upload_server.server_port}/transcribe",
-                audio,
-                timeout=5,
-            )
-        assert error.value.code == 413
-    finally:
-        UploadHandler.status = 200
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _self, cumulative, name = line.removeprefix("import time:").split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_import_stays_cheap():
+    times = _import_times("paratran.cli")
+
+    eager = {
+        "concurrent.futures",
+        "fastapi",
+        "http.client",
+        "mcp",
+        "paratran.client",
+        "paratran.result_cache",
+        "paratran.serializers",
+        "paratran.transcribe",
+        "uvicorn",
+    } & times.keys()
+    assert not eager
+    assert times["paratran.cli"] < IMPORT_BUDGET_US
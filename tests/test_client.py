@@ -0,0 +1,197 @@
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Thread
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlsplit
+
+import pytest
+
+import paratran.client as client
+
+
+class UploadHandler(BaseHTTPRequestHandler):
+    status = 200
+    response = {"text": "ok"}
+    body = b""
+
+    def do_POST(self):  # noqa: N802
+        type(self).headers_seen = dict(self.headers)
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            type(self).body = self._read_chunked()
+        else:
+            length = int(self.headers["Content-Length"])
+            type(self).body = self.rfile.read(length)
+        self.send_response(type(self).status)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(json.dumps(type(self).response).encode())
+
+    def _read_chunked(self) -> bytes:
+        body = b""
+        while size := int(self.rfile.readline().strip(), 16):
+            body += self.rfile.read(size)
+            self.rfile.readline()
+        self.rfile.readline()
+        return body
+
+    def log_message(self, *_args):
+        return
+
+
+@pytest.fixture
+def upload_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), UploadHandler)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=2)
+
+
+def test_upload_streams_multipart_fields_and_file(tmp_path: Path, upload_server):
+    audio = tmp_path / "sample.wav"
+    audio.write_bytes(b"audio-bytes")
+
+    result = client.upload_file(
+        f"http://127.0.0.1:{upload_server.server_port}/transcribe",
+        audio,
+        {"response_format": "verbose_json"},
+        timeout=5,
+    )
+
+    assert result == {"text": "ok"}
+    assert b'name="response_format"' in UploadHandler.body
+    assert b"audio-bytes" in UploadHandler.body
+
+
+def test_upload_exposes_http_errors_as_http_error(tmp_path: Path, upload_server):
+    audio = tmp_path / "sample.wav"
+    audio.write_bytes(b"audio")
+    UploadHandler.status = 413
+    try:
+        with pytest.raises(HTTPError) as error:
+            client.upload_file(
+                f"http://127.0.0.1:{upload_server.server_port}/transcribe",
+                audio,
+                timeout=5,
+            )
+        assert error.value.code == 413
+    finally:
+        UploadHandler.status = 200
+
+
+def test_transcoded_upload_is_piped_as_a_chunked_body(tmp_path: Path, upload_server, monkeypatch):
+    audio = tmp_path / "sample.wav"
+    audio.write_bytes(b"original-wav")
+    monkeypatch.setattr(
+        client,
+        "transcode_command",
+        lambda _path, _codec: [sys.executable, "-c", "import sys; sys.stdout.write('flac-bytes')"],
+    )
+
+    client.upload_file(
+        f"http://127.0.0.1:{upload_server.server_port}/transcribe",
+        audio,
+        timeout=5,
+        transcode="flac",
+    )
+
+    assert UploadHandler.headers_seen["Transfer-Encoding"] == "chunked"
+    assert b'filename="sample.flac"' in UploadHandler.body
+    assert b"flac-bytes" in UploadHandler.body
+    assert b"original-wav" not in UploadHandler.body
+
+
+def test_transcode_errors_do_not_stall_the_upload(tmp_path: Path, upload_server, monkeypatch):
+    audio = tmp_path / "sample.wav"
+    audio.write_bytes(b"original-wav")
+    # More stderr than a pipe buffer holds, written before any audio.
+    script = "import sys; sys.stderr.write('x' * 1_000_000); sys.stderr.flush(); sys.exit(1)"
+    command = [sys.executable, "-c", script]
+    monkeypatch.setattr(client, "transcode_command", lambda _path, _codec: command)
+
+    with pytest.raises(ValueError, match="Could not transcode sample.wav: x+"):
+        client.upload_file(
+            f"http://127.0.0.1:{upload_server.server_port}/transcribe",
+            audio,
+            timeout=5,
+            transcode="flac",
+        )
+
+
+def test_transcode_command_targets_the_model_sample_format(tmp_path: Path):
+    command = client.transcode_command(tmp_path / "sample.wav", "opus")
+
+    assert command[command.index("-ar") + 1] == "16000"
+    assert command[command.index("-ac") + 1] == "1"
+    assert command[-1] == "pipe:1"
+    assert "-nostats" in command
+
+
+def test_lookup_miss_means_upload_required(upload_server):
+    UploadHandler.status = 404
+    try:
+        result = client.lookup_result(
+            f"http://127.0.0.1:{upload_server.server_port}/v1/audio/lookup",
+            "0" * 64,
+            {"response_format": "verbose_json"},
+            timeout=5,
+        )
+    finally:
+        UploadHandler.status = 200
+
+    assert result is None
+    assert b"sha256=" + b"0" * 64 in UploadHandler.body
+
+
+def test_resumable_upload_resumes_from_server_offset(tmp_path: Path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import paratran.server as server
+    from paratran.contracts import TranscriptionResult
+
+    audio = tmp_path / "sample.wav"
+    audio.write_bytes(b"0123456789" * 10)
+    received = []
+
+    def fake_transcribe(path: str, _options, _is_cancelled=None, _progress=None):
+        received.append(Path(path).read_bytes())
+        return TranscriptionResult(text="ok", duration=1.0, processing_time=0.1)
+
+    monkeypatch.setattr(server, "_load_model", lambda: None)
+    monkeypatch.setattr(server, "_model_status", lambda: {"model": "test", "model_dir": None})
+    monkeypatch.setattr(server, "_transcribe_file", fake_transcribe)
+    monkeypatch.setattr(client.time, "sleep", lambda _seconds: None)
+    dropped = []
+
+    with TestClient(server.app) as test_client:
+
+        def fake_request(method, url, body=b"", *, headers=None, timeout, allow_status=()):
+            path = urlsplit(url).path
+            if method == "PATCH" and not dropped:
+                # Deliver half of the first chunk, then lose the connection.
+                test_client.patch(path, content=body[: len(body) // 2], headers=headers)
+                dropped.append(path)
+                raise URLError("connection reset")
+            response = test_client.request(method, path, content=body, headers=headers)
+            if response.status_code >= 400 and response.status_code not in allow_status:
+                raise HTTPError(url, response.status_code, "", response.headers, None)
+            return response.status_code, response.headers, response.content
+
+        monkeypatch.setattr(client, "http_request", fake_request)
+        result = client.resumable_upload(
+            "http://paratran.test",
+            audio,
+            {"response_format": "verbose_json"},
+            timeout=5,
+            chunk_size=40,
+        )
+
+    assert result["text"] == "ok"
+    assert dropped
+    assert received == [audio.read_bytes()]
@@ -37,6 +37,10 @@ def test_zero_chunk_duration_disables_chunking():
         ("patience", float("nan")),
         ("length_penalty", float("inf")),
         ("overlap_duration", float("nan")),
+        ("precision", "fp16"),
+        ("decoding", "sampling"),
+        ("confidence_threshold", 1.5),
+        ("num_speakers", 0),
     ],
 )
 def test_invalid_options_are_rejected(field, value):
@@ -0,0 +1,56 @@
+from threading import Thread
+
+import paratran.daemon as daemon
+import paratran.workers as workers
+from paratran.contracts import TranscriptionOptions, TranscriptionResult
+
+
+def test_cli_runs_share_one_daemon(tmp_path, monkeypatch):
+    paths = daemon.DaemonPaths(
+        socket=tmp_path / "d.sock",
+        key=tmp_path / "d.key",
+        lock=tmp_path / "d.lock",
+        log=tmp_path / "d.log",
+    )
+    spawned = []
+
+    class Running:
+        def poll(self):
+            return None
+
+    def fake_spawn(paths, model, _cache_dir, idle_timeout):
+        paths.key.write_text("00" * 32)
+        server = workers.InferenceServer(str(paths.socket), bytes(32), idle_timeout=idle_timeout)
+        spawned.append(server)
+        Thread(target=server.serve_forever, daemon=True).start()
+        return Running()
+
+    monkeypatch.setattr(daemon, "daemon_paths", lambda _model, _cache_dir: paths)
+    monkeypatch.setattr(daemon, "_spawn", fake_spawn)
+    monkeypatch.setattr(
+        workers,
+        "_transcribe",
+        lambda path, _options, *_hooks: TranscriptionResult(
+            text=path, duration=1.0, processing_time=0.1
+        ),
+    )
+
+    try:
+        first = daemon.connect("model", None, idle_timeout=30)
+        second = daemon.connect("model", None, idle_timeout=30)
+        result = second.transcribe("/audio/a.wav", TranscriptionOptions())
+    finally:
+        for server in spawned:
+            server.close()
+
+    assert len(spawned) == 1
+    assert first.addresses == second.addresses == [str(paths.socket)]
+    assert result.text == "/audio/a.wav"
+
+
+def test_daemon_files_are_keyed_by_model_and_private():
+    one = daemon.daemon_paths("model-a", None)
+    other = daemon.daemon_paths("model-b", "/models")
+
+    assert one.socket != other.socket
+    assert one.socket.parent.stat().st_mode & 0o077 == 0
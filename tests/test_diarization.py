@@ -0,0 +1,119 @@
+import numpy as np
+
+from paratran.contracts import Sentence, Token, TranscriptionResult
+from paratran.diarization import (
+    SpeakerWindow,
+    assign_speakers,
+    cluster,
+    speaker_windows,
+    speech_regions,
+)
+from paratran.serializers import from_openai_verbose_json, to_openai_response, to_srt, to_vtt
+
+RATE = 16_000
+
+
+def voice(seconds, pitch, tilt, rng):
+    """A harmonic tone with vibrato: pitch and spectral tilt stand in for a voice."""
+
+    t = np.arange(int(seconds * RATE)) / RATE
+    phase = 2 * np.pi * np.cumsum(pitch * (1 + 0.05 * np.sin(2 * np.pi * 3 * t))) / RATE
+    tone = sum(np.sin(k * phase) / k**tilt for k in range(1, 30) if k * pitch < 7000)
+    return (0.1 * tone + 0.005 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def conversation(turns):
+    """Alternate two voices for ``turns`` four-second turns with short pauses between."""
+
+    rng = np.random.default_rng(0)
+    parts = []
+    for turn in range(turns):
+        pitch, tilt = (120, 1.0) if turn % 2 == 0 else (210, 1.6)
+        parts.append(voice(4, pitch, tilt, rng))
+        parts.append((0.002 * rng.standard_normal(RATE // 2)).astype(np.float32))
+    return np.concatenate(parts)
+
+
+def words(*timed):
+    return tuple(Token(f" {text}", start, end) for text, start, end in timed)
+
+
+def test_speech_regions_skip_pauses():
+    regions = speech_regions(conversation(4), RATE)
+
+    assert len(regions) == 4
+    assert abs(regions[1][0] / RATE - 4.5) < 0.05
+
+
+def test_two_voices_are_told_apart_and_named_in_order_of_appearance():
+    windows = speaker_windows(conversation(6), RATE)
+    by_turn = {(int(window.start // 4.5), window.speaker) for window in windows}
+
+    assert sorted(by_turn) == list(enumerate(["SPEAKER_00", "SPEAKER_01"] * 3))
+
+
+def test_unstructured_audio_stays_one_speaker():
+    noise = np.random.default_rng(1).standard_normal(20 * RATE).astype(np.float32)
+
+    assert {window.speaker for window in speaker_windows(noise, RATE)} == {"SPEAKER_00"}
+
+
+def test_num_speakers_fixes_the_cluster_count():
+    embeddings = np.random.default_rng(2).standard_normal((12, 8))
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+    assert len(set(cluster(embeddings, num_speakers=3))) == 3
+    assert len(set(cluster(embeddings, num_speakers=1))) == 1
+
+
+def test_sentences_are_split_at_speaker_turns():
+    windows = [SpeakerWindow(0.0, 3.0, "SPEAKER_00"), SpeakerWindow(3.0, 6.0, "SPEAKER_01")]
+    sentence = Sentence(
+        "",
+        0.0,
+        6.0,
+        words(("yes", 0.5, 1.0), ("right", 1.2, 2.0), ("so", 3.2, 3.6), ("then", 4.0, 5.0)),
+    )
+
+    first, second = assign_speakers([sentence], windows)
+
+    assert (first.text, first.speaker, first.end) == (" yes right", "SPEAKER_00", 2.0)
+    assert (second.text, second.speaker, second.start) == (" so then", "SPEAKER_01", 3.2)
+
+
+def test_brief_turns_are_absorbed_into_the_surrounding_speaker():
+    windows = [
+        SpeakerWindow(0.0, 3.0, "SPEAKER_00"),
+        SpeakerWindow(3.0, 3.4, "SPEAKER_01"),
+        SpeakerWindow(3.4, 6.0, "SPEAKER_00"),
+    ]
+    sentence = Sentence(
+        " one two three",
+        0.0,
+        6.0,
+        words(("one", 0.5, 2.0), ("two", 3.0, 3.3), ("three", 4.0, 5.0)),
+    )
+
+    (labelled,) = assign_speakers([sentence], windows)
+
+    assert labelled.speaker == "SPEAKER_00"
+    assert labelled.tokens == sentence.tokens
+
+
+def test_speakers_appear_in_subtitles_and_survive_verbose_json():
+    result = TranscriptionResult(
+        text="Hi. Hello.",
+        duration=4.0,
+        processing_time=0.1,
+        sentences=(
+            Sentence(" Hi.", 0.0, 1.0, words(("Hi.", 0.0, 1.0)), speaker="SPEAKER_00"),
+            Sentence(" Hello.", 2.0, 3.0, words(("Hello.", 2.0, 3.0)), speaker="SPEAKER_01"),
+        ),
+    )
+
+    assert "SPEAKER_01: Hello." in to_srt(result)
+    assert "<v SPEAKER_00>Hi." in to_vtt(result)
+    payload = to_openai_response(result, "verbose_json")
+    assert payload["segments"][1]["speaker"] == "SPEAKER_01"
+    assert from_openai_verbose_json(payload).sentences[1].speaker == "SPEAKER_01"
+    assert TranscriptionResult.from_dict(result.to_dict()) == result
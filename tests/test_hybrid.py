@@ -0,0 +1,53 @@
+from paratran.contracts import Token
+from paratran.hybrid import Span, decode_window, low_confidence_spans, splice
+
+
+def tokens(*pieces):
+    """Tokens from ``(text, start, confidence)``, each lasting 0.2 seconds."""
+
+    return [Token(text, start, start + 0.2, 0.2, confidence) for text, start, confidence in pieces]
+
+
+def test_spans_cover_whole_words_around_low_confidence_tokens():
+    greedy = tokens(
+        (" the", 0.0, 0.9),
+        (" qu", 0.4, 0.9),
+        ("ack", 0.6, 0.2),
+        ("ing", 0.8, 0.9),
+        (" duck", 5.0, 0.9),
+    )
+
+    assert low_confidence_spans(greedy, 0.5) == [Span(1, 4, 0.4, 1.0)]
+
+
+def test_nearby_words_share_a_span_and_distant_ones_do_not():
+    greedy = tokens(
+        (" one", 0.0, 0.1),
+        (" two", 1.0, 0.9),
+        (" three", 2.0, 0.1),
+        (" four", 9.0, 0.1),
+        (" five", 10.0, None),
+    )
+
+    assert low_confidence_spans(greedy, 0.5) == [Span(0, 3, 0.0, 2.2), Span(3, 4, 9.0, 9.2)]
+    assert low_confidence_spans(greedy, 0.05) == []
+
+
+def test_decode_window_adds_context_within_the_audio():
+    assert decode_window(Span(0, 3, 0.5, 2.2), duration=3.0) == (0.0, 3.0)
+    assert decode_window(Span(3, 4, 9.0, 9.2), duration=30.0) == (7.0, 11.2)
+
+
+def test_splice_keeps_only_beam_tokens_inside_the_span():
+    greedy = tokens((" the", 0.0, 0.9), (" quack", 0.4, 0.2), (" duck", 0.8, 0.9))
+    beam = tokens((" the", 0.0, 0.9), (" quick", 0.4, 0.8), (" duck", 0.8, 0.9))
+
+    spliced = splice(greedy, Span(1, 2, 0.4, 0.6), beam)
+
+    assert [token.text for token in spliced] == [" the", " quick", " duck"]
+
+
+def test_splice_keeps_greedy_tokens_when_beam_finds_nothing():
+    greedy = tokens((" the", 0.0, 0.9), (" quack", 0.4, 0.2))
+
+    assert splice(greedy, Span(1, 2, 0.4, 0.6), []) == greedy
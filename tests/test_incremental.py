@@ -0,0 +1,97 @@
+import json
+
+import numpy as np
+
+from paratran.contracts import Sentence, Token, TranscriptionOptions, TranscriptionResult
+from paratran.incremental import (
+    Revision,
+    Splice,
+    apply_splice,
+    fingerprint_audio,
+    inside,
+    load_revision,
+    plan_splice,
+    save_revision,
+)
+
+RATE = 100
+
+
+def audio(seconds, seed):
+    return np.random.default_rng(seed).standard_normal(int(seconds * RATE)).astype(np.float32)
+
+
+def transcript(duration):
+    """One 1.5 s sentence every 2 s, each named by its start time."""
+
+    sentences = tuple(
+        Sentence(f" s{start}", start, start + 1.5, (Token(f" s{start}", start, start + 1.5),))
+        for start in range(0, int(duration), 2)
+    )
+    return TranscriptionResult(
+        text="".join(sentence.text for sentence in sentences).strip(),
+        duration=duration,
+        processing_time=1.0,
+        sentences=sentences,
+    )
+
+
+def revision(samples):
+    return Revision(transcript(len(samples) / RATE), fingerprint_audio(samples, RATE))
+
+
+def test_unchanged_audio_needs_no_decoding():
+    samples = audio(30, seed=1)
+
+    assert plan_splice(revision(samples), samples.copy(), RATE) is None
+
+
+def test_appended_audio_re_decodes_only_the_tail():
+    samples = audio(30, seed=1)
+    grown = np.concatenate([samples, audio(7, seed=2)])
+
+    splice = plan_splice(revision(samples), grown, RATE)
+
+    # Sentences ending within the context of the old end are decoded again.
+    assert splice == Splice(before=14, after=15, start=27.5, end=37.0, shift=7.0)
+
+
+def test_an_insertion_keeps_both_ends_and_shifts_the_tail():
+    samples = audio(30, seed=1)
+    edited = np.concatenate([samples[: 12 * RATE], audio(3, seed=2), samples[12 * RATE :]])
+
+    splice = plan_splice(revision(samples), edited, RATE)
+
+    assert splice == Splice(before=4, after=9, start=7.5, end=21.0, shift=3.0)
+
+
+def test_splice_joins_kept_and_new_sentences_with_corrected_times():
+    previous = transcript(30)
+    splice = Splice(before=4, after=9, start=7.5, end=21.0, shift=3.0)
+    decoded = [Token(" new", 9.0, 10.0), Token(" context", 21.5, 22.0)]
+    kept = inside(splice, decoded)
+
+    result = apply_splice(
+        previous,
+        splice,
+        [Sentence(" new", 9.0, 10.0, tuple(kept))],
+        duration=33.0,
+        processing_time=0.2,
+    )
+
+    assert [token.text for token in kept] == [" new"]
+    assert result.text.split()[:6] == ["s0", "s2", "s4", "s6", "new", "s18"]
+    assert (result.sentences[5].start, result.sentences[5].tokens[0].end) == (21.0, 22.5)
+    assert result.duration == 33.0
+
+
+def test_revisions_are_reused_only_for_the_same_model_and_options(tmp_path):
+    samples = audio(10, seed=1)
+    saved = revision(samples)
+    options = TranscriptionOptions()
+    (tmp_path / "talk.json").write_text(json.dumps(saved.result.to_dict()))
+    save_revision(tmp_path, "talk", "model", options, saved)
+
+    assert load_revision(tmp_path, "talk", "model", options) == saved
+    assert load_revision(tmp_path, "talk", "other-model", options) is None
+    assert load_revision(tmp_path, "talk", "model", TranscriptionOptions(decoding="beam")) is None
@@ -1,4 +1,7 @@
+import asyncio
+import json
 import sys
+import time
 import types
 from pathlib import Path
 
@@ -6,7 +9,7 @@ import pytest
 from fastapi.testclient import TestClient
 
 import paratran.mcp_server as mcp_server
-from paratran.contracts import TranscriptionResult
+from paratran.contracts import Sentence, Token, TranscriptionResult
 
 
 def test_mcp_tool_requires_absolute_path_and_respects_allowed_root(tmp_path, monkeypatch):
@@ -16,22 +19,181 @@ def test_mcp_tool_requires_absolute_path_and_respects_allowed_root(tmp_path, mon
     audio.write_bytes(b"audio")
 
     fake_module = types.ModuleType("paratran.transcribe")
-    fake_module.transcribe_file = lambda path, options: TranscriptionResult(
+    fake_module.transcribe_file = lambda path, options, **_hooks: TranscriptionResult(
         text=Path(path).name,
         duration=1.0,
         processing_time=0.1,
         sentences=(),
     )
     monkeypatch.setitem(sys.modules, "paratran.transcribe", fake_module)
+    monkeypatch.setattr(mcp_server, "probe_audio_seconds", lambda _path: 1.0)
 
     mcp = mcp_server.create_mcp(allowed_root=str(root))
     tool = mcp._tool_manager._tools["transcribe"].fn
 
-    assert '"text": "sample.wav"' in tool(str(audio))
+    assert '"text": "sample.wav"' in asyncio.run(tool(str(audio)))
     with pytest.raises(ValueError, match="absolute"):
-        tool("sample.wav")
+        asyncio.run(tool("sample.wav"))
     with pytest.raises(ValueError, match="allowed root"):
-        tool(str(tmp_path / "outside.wav"))
+        asyncio.run(tool(str(tmp_path / "outside.wav")))
+
+
+def test_mcp_tool_calls_run_concurrently_within_the_limit(tmp_path, monkeypatch):
+    audio = tmp_path / "sample.wav"
+    audio.write_bytes(b"audio")
+    active = []
+    peak = []
+
+    def fake_transcribe(path, options, **_hooks):
+        active.append(path)
+        peak.append(len(active))
+        time.sleep(0.05)
+        active.remove(path)
+        return TranscriptionResult(text="ok", duration=1.0, processing_time=0.05)
+
+    fake_module = types.ModuleType("paratran.transcribe")
+    fake_module.transcribe_file = fake_transcribe
+    monkeypatch.setitem(sys.modules, "paratran.transcribe", fake_module)
+    monkeypatch.setattr(mcp_server, "probe_audio_seconds", lambda _path: 1.0)
+    monkeypatch.setenv("PARATRAN_MAX_CONCURRENCY", "2")
+    tool = mcp_server.create_mcp()._tool_manager._tools["transcribe"].fn
+
+    async def run():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        beat = asyncio.create_task(heartbeat())
+        results = await asyncio.gather(*(tool(str(audio)) for _ in range(5)))
+        beat.cancel()
+        return results, ticks
+
+    results, ticks = asyncio.run(run())
+
+    assert len(results) == 5
+    assert max(peak) == 2
+    assert ticks > 10
+
+
+def test_cancelled_mcp_call_keeps_its_slot_until_inference_stops(tmp_path, monkeypatch):
+    audio = tmp_path / "sample.wav"
+    audio.write_bytes(b"audio")
+    started = []
+    stopped = []
+
+    def fake_transcribe(path, options, is_cancelled, **_hooks):
+        started.append(path)
+        deadline = time.monotonic() + 1.0
+        while not is_cancelled() and time.monotonic() < deadline:
+            time.sleep(0.005)
+        # Inference only notices the cancellation at the end of a chunk.
+        time.sleep(0.1)
+        stopped.append(path)
+        return TranscriptionResult(text="ok", duration=1.0, processing_time=0.05)
+
+    fake_module = types.ModuleType("paratran.transcribe")
+    fake_module.transcribe_file = fake_transcribe
+    monkeypatch.setitem(sys.modules, "paratran.transcribe", fake_module)
+    monkeypatch.setattr(mcp_server, "probe_audio_seconds", lambda _path: 1.0)
+    schedulers = []
+    from_environment = mcp_server.TranscriptionScheduler.from_environment
+    monkeypatch.setattr(
+        mcp_server.TranscriptionScheduler,
+        "from_environment",
+        lambda: schedulers.append(from_environment()) or schedulers[0],
+    )
+    tool = mcp_server.create_mcp()._tool_manager._tools["transcribe"].fn
+
+    async def run():
+        call = asyncio.create_task(tool(str(audio)))
+        while not started:
+            await asyncio.sleep(0.005)
+        call.cancel()
+        await asyncio.sleep(0.02)
+        while_stopping = schedulers[0].snapshot()["running"], bool(stopped)
+        await asyncio.gather(call, return_exceptions=True)
+        return while_stopping, schedulers[0].snapshot()["running"]
+
+    (running, had_stopped), after = asyncio.run(run())
+
+    assert (running, had_stopped) == (1, False)
+    assert after == 0
+
+
+def test_mcp_batch_tool_walks_directories_and_writes_outputs(tmp_path, monkeypatch):
+    root = tmp_path / "audio"
+    (root / "day2").mkdir(parents=True)
+    for name in ("a.wav", "notes.txt", "broken.mp3", "day2/b.flac"):
+        (root / name).write_bytes(b"audio")
+
+    def fake_transcribe(path, options, **_hooks):
+        if path.endswith("broken.mp3"):
+            raise ValueError("Failed to load audio")
+        return TranscriptionResult(text=Path(path).stem, duration=1.0, processing_time=0.1)
+
+    fake_module = types.ModuleType("paratran.transcribe")
+    fake_module.transcribe_file = fake_transcribe
+    monkeypatch.setitem(sys.modules, "paratran.transcribe", fake_module)
+    monkeypatch.setattr(mcp_server, "probe_audio_seconds", lambda _path: 1.0)
+    tool = (
+        mcp_server.create_mcp(allowed_root=str(tmp_path))
+        ._tool_manager._tools["transcribe_batch"]
+        .fn
+    )
+
+    inline = json.loads(asyncio.run(tool(directory=str(root))))
+    written = json.loads(
+        asyncio.run(tool(directory=str(root), recursive=True, output_dir=str(tmp_path / "out")))
+    )
+
+    assert [entry.get("text") for entry in inline["files"]] == ["a", None]
+    assert inline["failed"] == 1
+    assert written["succeeded"] == 2
+    assert (tmp_path / "out" / "day2" / "b.txt").read_text().strip() == "b"
+    with pytest.raises(ValueError, match="allowed root"):
+        asyncio.run(tool(file_paths=["/etc/passwd"]))
+
+
+def test_mcp_output_modes_reuse_the_transcription_for_token_pages(tmp_path, monkeypatch):
+    audio = tmp_path / "sample.wav"
+    audio.write_bytes(b"audio")
+    calls = []
+
+    def fake_transcribe(path, options, **_hooks):
+        calls.append(path)
+        return TranscriptionResult(
+            text="hello world",
+            duration=1.0,
+            processing_time=0.1,
+            sentences=(
+                Sentence(
+                    "hello world",
+                    0.0,
+                    1.0,
+                    (Token("hello", 0.0, 0.5), Token(" world", 0.5, 1.0)),
+                ),
+            ),
+        )
+
+    fake_module = types.ModuleType("paratran.transcribe")
+    fake_module.transcribe_file = fake_transcribe
+    monkeypatch.setitem(sys.modules, "paratran.transcribe", fake_module)
+    monkeypatch.setattr(mcp_server, "probe_audio_seconds", lambda _path: 1.0)
+    tool = mcp_server.create_mcp()._tool_manager._tools["transcribe"].fn
+
+    text = asyncio.run(tool(str(audio), output="text"))
+    page = json.loads(asyncio.run(tool(str(audio), output="tokens", token_limit=1)))
+
+    assert text == "hello world"
+    assert page["tokens"][0]["text"] == "hello"
+    assert page["next_offset"] == 1
+    assert len(calls) == 1
+    with pytest.raises(ValueError, match="output must be one of"):
+        asyncio.run(tool(str(audio), output="xml"))
 
 
 def test_streamable_http_mcp_requires_bearer_token(tmp_path):
@@ -0,0 +1,46 @@
+from paratran.contracts import TranscriptionOptions
+from paratran.memory import MIN_CHUNK_DURATION, MemoryGovernor, estimate_peak_bytes
+
+HOUR = 3600.0
+
+
+def test_estimate_grows_with_window_and_dtype():
+    chunked = estimate_peak_bytes(HOUR, 120.0, fp32=False)
+
+    assert estimate_peak_bytes(HOUR, None, fp32=False) > 100 * chunked
+    assert estimate_peak_bytes(HOUR, 120.0, fp32=True) > chunked
+    assert estimate_peak_bytes(60.0, 120.0, fp32=False) < chunked
+
+
+def test_governor_enables_chunking_to_fit_the_budget():
+    budget = 2 * estimate_peak_bytes(HOUR, 120.0, fp32=False)
+    governor = MemoryGovernor(budget, max_concurrency=2)
+
+    options, estimate = governor.plan(HOUR, TranscriptionOptions(chunk_duration=0))
+
+    assert MIN_CHUNK_DURATION <= options.chunk_duration <= 121.0
+    assert options.overlap_duration < options.chunk_duration
+    assert estimate <= budget // 2
+    assert governor.snapshot(0)["resized_jobs"] == 1
+
+
+def test_governor_keeps_options_that_fit_or_when_disabled():
+    options = TranscriptionOptions(chunk_duration=0)
+
+    assert MemoryGovernor(0).plan(HOUR, options)[0] is options
+    assert MemoryGovernor(10**12).plan(HOUR, TranscriptionOptions())[0] == TranscriptionOptions()
+
+
+def test_quantized_jobs_get_the_bf16_upper_bound_and_keep_their_precision():
+    budget = 2 * estimate_peak_bytes(HOUR, 120.0, fp32=False)
+    governor = MemoryGovernor(budget, max_concurrency=2)
+
+    bf16, bf16_estimate = governor.plan(HOUR, TranscriptionOptions(chunk_duration=0))
+    int8, int8_estimate = governor.plan(
+        HOUR, TranscriptionOptions(chunk_duration=0, precision="int8")
+    )
+
+    # Quantization shrinks weights, not activations, so the estimate is unchanged.
+    assert int8_estimate == bf16_estimate <= budget // 2
+    assert int8.chunk_duration == bf16.chunk_duration
+    assert int8.precision == "int8"
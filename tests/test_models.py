@@ -0,0 +1,62 @@
+import hashlib
+import json
+
+from paratran import models
+
+
+def _cached_repo(root, name="org/model"):
+    repo = root / ("models--" + name.replace("/", "--"))
+    blobs = repo / "blobs"
+    snapshot = repo / "snapshots" / "abc123"
+    blobs.mkdir(parents=True)
+    snapshot.mkdir(parents=True)
+    (repo / "refs").mkdir()
+    (repo / "refs" / "main").write_text("abc123")
+
+    config = b'{"target": "tdt"}'
+    config_blob = hashlib.sha1(b"blob %d\0" % len(config) + config).hexdigest()
+    weights = b"weights" * 100
+    weights_blob = hashlib.sha256(weights).hexdigest()
+    (blobs / config_blob).write_bytes(config)
+    (blobs / weights_blob).write_bytes(weights)
+    (snapshot / "config.json").symlink_to(f"../../blobs/{config_blob}")
+    (snapshot / "model.safetensors").symlink_to(f"../../blobs/{weights_blob}")
+    return repo, blobs / weights_blob
+
+
+def test_cached_model_resolves_locally_and_verifies(tmp_path):
+    repo, _ = _cached_repo(tmp_path)
+
+    path = models.local_model_path("org/model", str(tmp_path))
+
+    assert path == repo / "snapshots" / "abc123"
+    assert models.verify_model(path) == []
+    assert models.local_model_path("org/missing", str(tmp_path)) is None
+    [listed] = models.list_models(str(tmp_path))
+    assert (listed.name, listed.complete) == ("org/model", True)
+    assert listed.size_bytes == len(b'{"target": "tdt"}') + 700
+
+
+def test_verify_reports_corrupted_and_missing_files(tmp_path):
+    repo, weights = _cached_repo(tmp_path)
+    weights.write_bytes(b"truncated")
+    snapshot = repo / "snapshots" / "abc123"
+
+    [problem] = models.verify_model(snapshot)
+    assert problem.startswith("model.safetensors: checksum mismatch")
+
+    (snapshot / "config.json").unlink()
+    assert "config.json: missing" in models.verify_model(snapshot)
+    assert models.local_model_path("org/model", str(tmp_path)) is None
+
+
+def test_verify_uses_snapshot_manifest(tmp_path):
+    (tmp_path / "config.json").write_text("{}")
+    (tmp_path / "model.safetensors").write_bytes(b"weights")
+    manifest = {"files": {"config.json": hashlib.sha256(b"{}").hexdigest()}}
+    manifest["files"]["model.safetensors"] = hashlib.sha256(b"other").hexdigest()
+    (tmp_path / models.SNAPSHOT_MANIFEST).write_text(json.dumps(manifest))
+
+    assert models.local_model_path(str(tmp_path)) == tmp_path
+    [problem] = models.verify_model(tmp_path)
+    assert problem.startswith("model.safetensors: checksum mismatch")
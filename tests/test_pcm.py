@@ -0,0 +1,86 @@
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from paratran import transcribe
+from paratran.pcm import (
+    RawFormat,
+    WavWriter,
+    parse_raw_content_type,
+    read_native_wav,
+    read_wav_format,
+)
+
+
+def write_wav(path: Path, samples: np.ndarray, sample_rate=16_000, channels=1) -> Path:
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.astype("<i2").tobytes())
+    return path
+
+
+def test_native_wav_is_decoded_without_ffmpeg(monkeypatch, tmp_path: Path):
+    samples = np.array([0, 16384, -32768, 32767], dtype=np.int16)
+    path = write_wav(tmp_path / "native.wav", samples)
+    monkeypatch.setattr(transcribe.shutil, "which", lambda _name: None)
+
+    audio = transcribe.decode_audio(path, 16_000)
+
+    assert audio.samples.dtype == np.float32
+    assert audio.samples.tolist() == [0.0, 0.5, -1.0, 32767 / 32768]
+    assert transcribe._audio_duration(path, fallback=0.0) == 4 / 16_000
+
+
+@pytest.mark.parametrize(("sample_rate", "channels"), [(8_000, 1), (16_000, 2)])
+def test_other_wavs_are_left_to_ffmpeg(tmp_path: Path, sample_rate, channels):
+    path = write_wav(tmp_path / "other.wav", np.zeros(8, np.int16), sample_rate, channels)
+
+    assert read_wav_format(path).sample_rate == sample_rate
+    assert read_native_wav(path, 16_000) is None
+
+
+def test_non_wav_files_are_not_parsed(tmp_path: Path):
+    path = tmp_path / "audio.wav"
+    path.write_bytes(b"ID3 not really a wav file")
+
+    assert read_wav_format(path) is None
+
+
+def test_raw_content_types_are_parsed():
+    assert parse_raw_content_type("audio/L16; rate=16000") == RawFormat(
+        "s16", 16_000, 1, big_endian=True
+    )
+    assert parse_raw_content_type("audio/x-raw;format=F32LE;rate=8000;channels=2") == RawFormat(
+        "f32", 8_000, 2
+    )
+    assert parse_raw_content_type("audio/wav") is None
+    with pytest.raises(ValueError, match="rate"):
+        parse_raw_content_type("audio/L16")
+    with pytest.raises(ValueError, match="format"):
+        parse_raw_content_type("audio/x-raw;rate=16000;format=U8")
+
+
+@pytest.mark.parametrize(
+    ("raw", "encode"),
+    [
+        (RawFormat("s16", 16_000, big_endian=True), lambda x: (x * 32768).astype(">i2")),
+        (RawFormat("f32", 16_000), lambda x: x.astype("<f4")),
+    ],
+)
+def test_raw_streams_become_wavs_the_fast_path_reads(tmp_path: Path, raw, encode):
+    samples = np.array([0.0, 0.25, -0.5, 0.75, -1.0], dtype=np.float32)
+    body = encode(samples).tobytes()
+    path = tmp_path / "raw.wav"
+    with path.open("w+b") as file:
+        writer = WavWriter(file, raw)
+        # Odd-sized pieces split samples across writes.
+        for start in range(0, len(body), 3):
+            writer.write(body[start : start + 3])
+        writer.close()
+
+    assert read_native_wav(path, 16_000).tolist() == samples.tolist()
+    assert read_wav_format(path).frames == len(samples)
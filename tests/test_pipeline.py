@@ -0,0 +1,102 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import paratran.models as models
+import paratran.transcribe as transcribe
+from paratran.contracts import TranscriptionOptions, TranscriptionResult
+from paratran.pipeline import TranscriptionPipeline
+
+
+def test_decoding_the_next_file_overlaps_inference():
+    inferring = threading.Event()
+    second_decoded = threading.Event()
+    decoded = []
+
+    def decode(path, _options):
+        decoded.append(path.name)
+        if path.name == "second.wav":
+            second_decoded.set()
+        return path.name
+
+    def infer(audio, options, _is_cancelled, _progress):
+        if audio == "first.wav":
+            inferring.set()
+            # Inference of the first file only finishes once the second is decoded.
+            assert second_decoded.wait(2)
+        return TranscriptionResult(text=audio, duration=1.0, processing_time=0.1)
+
+    with TranscriptionPipeline(decode=decode, infer=infer) as pipeline:
+        first = pipeline.submit("/audio/first.wav", TranscriptionOptions())
+        second = pipeline.submit("/audio/second.wav", TranscriptionOptions())
+
+        assert first.result(timeout=2).text == "first.wav"
+        assert second.result(timeout=2).text == "second.wav"
+    assert inferring.is_set()
+    assert decoded == ["first.wav", "second.wav"]
+
+
+def test_failures_stay_with_their_file():
+    def decode(path, _options):
+        if path.name == "broken.wav":
+            raise ValueError("Failed to load audio")
+        return path.name
+
+    def infer(audio, _options, _is_cancelled, _progress):
+        return TranscriptionResult(text=audio, duration=1.0, processing_time=0.1)
+
+    with TranscriptionPipeline(decode=decode, infer=infer) as pipeline:
+        broken = pipeline.submit("/audio/broken.wav", TranscriptionOptions())
+        sample = pipeline.transcribe("/audio/sample.wav", TranscriptionOptions())
+
+    with pytest.raises(ValueError, match="Failed to load audio"):
+        broken.result()
+    assert sample.text == "sample.wav"
+
+
+def test_finish_runs_in_submission_order_off_the_inference_thread():
+    finished = []
+
+    def infer(audio, _options, _is_cancelled, _progress):
+        return TranscriptionResult(text=audio, duration=1.0, processing_time=0.1)
+
+    def finish(result):
+        finished.append((result.text, threading.current_thread().name))
+        return result.text.upper()
+
+    with TranscriptionPipeline(decode=lambda path, _options: path.name, infer=infer) as pipeline:
+        futures = [
+            pipeline.submit(f"/audio/{name}.wav", TranscriptionOptions(), finish=finish)
+            for name in ("a", "b", "c")
+        ]
+
+    assert [future.result() for future in futures] == ["A.WAV", "B.WAV", "C.WAV"]
+    assert finished == [(f"{name}.wav", "paratran-finish") for name in ("a", "b", "c")]
+    with pytest.raises(RuntimeError, match="closed"):
+        pipeline.submit("/audio/d.wav", TranscriptionOptions())
+
+
+def test_default_decoder_loads_only_the_requested_precision(monkeypatch, tmp_path):
+    audio = tmp_path / "sample.wav"
+    audio.write_bytes(b"audio")
+    loaded = []
+
+    def load_model(_name, _cache, precision):
+        loaded.append(precision)
+        return SimpleNamespace(preprocessor_config=SimpleNamespace(sample_rate=16000))
+
+    monkeypatch.setattr(transcribe, "_models", {})
+    monkeypatch.setattr(transcribe, "_model_name", None)
+    monkeypatch.setattr(transcribe, "_model_dir", None)
+    monkeypatch.setattr(models, "load_model", load_model)
+    monkeypatch.setattr(transcribe, "decode_audio", lambda path, sample_rate: sample_rate)
+
+    def infer(audio, _options, _is_cancelled, _progress):
+        return TranscriptionResult(text=str(audio), duration=1.0, processing_time=0.1)
+
+    with TranscriptionPipeline(infer=infer) as pipeline:
+        result = pipeline.transcribe(audio, TranscriptionOptions(precision="int8"))
+
+    assert result.text == "16000"
+    assert loaded == ["int8"]
@@ -0,0 +1,92 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+import paratran.server as server
+from paratran import profiling
+from paratran.contracts import TranscriptionResult
+from paratran.profiling import Profiler
+
+
+def busy_work(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_capture_writes_folded_stacks_and_a_memory_summary(tmp_path: Path):
+    profiler = Profiler(tmp_path, sample_interval=0.001)
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_work, args=(stop,), name="decode")
+
+    capture = profiler.start("paratran a.wav", requested=True)
+    with profiling.covering(capture):
+        assert profiling.active_profile() == capture.profile_id
+        worker.start()
+        kept = [bytearray(1024) for _ in range(100)]
+        time.sleep(0.05)
+    stop.set()
+    worker.join()
+    path = capture.stop()
+
+    summary = json.loads(path.read_text())
+    assert profiling.active_profile() is None
+    assert summary["label"] == "paratran a.wav" and summary["samples"] > 0
+    assert summary["tracemalloc_peak_bytes"] >= len(kept) * 1024
+    folded = (tmp_path / f"{capture.profile_id}.folded").read_text().splitlines()
+    assert any(line.startswith("decode;") and "busy_work" in line for line in folded)
+
+
+def test_profiler_takes_one_capture_at_a_time_and_rate_limits(tmp_path: Path):
+    profiler = Profiler(tmp_path, min_interval=60)
+
+    assert Profiler(tmp_path, rate=0.0).start("unrequested") is None
+    first = profiler.start("first", requested=True)
+    assert profiler.start("busy", requested=True) is None
+    forwarded = profiler.start("worker", profile_id="abc")
+    assert forwarded is None
+    first.stop()
+    assert profiler.start("too soon", requested=True) is None
+    forwarded = profiler.start("worker", profile_id="abc")
+    assert forwarded.profile_id.startswith("abc-worker")
+    forwarded.stop()
+
+
+def test_profiler_is_configured_from_the_environment(monkeypatch, tmp_path: Path):
+    monkeypatch.delenv(profiling.PROFILE_DIR_ENV, raising=False)
+    assert Profiler.from_environment() is None
+
+    monkeypatch.setenv(profiling.PROFILE_DIR_ENV, str(tmp_path))
+    monkeypatch.setenv(profiling.PROFILE_RATE_ENV, "0.25")
+    monkeypatch.setenv(profiling.PROFILE_INTERVAL_ENV, "5")
+    profiler = Profiler.from_environment()
+
+    assert (profiler.directory, profiler.rate, profiler.min_interval) == (tmp_path, 0.25, 5.0)
+
+
+def test_server_profiles_requests_that_ask_for_it(monkeypatch, tmp_path: Path):
+    def fake_transcribe(_path, _options, _is_cancelled=None, _progress=None):
+        return TranscriptionResult(text="ok", duration=2.0, processing_time=0.1, sentences=())
+
+    monkeypatch.setattr(server, "_load_model", lambda: None)
+    monkeypatch.setattr(server, "_model_status", lambda: {"model": "test", "model_dir": None})
+    monkeypatch.setattr(server, "_transcribe_file", fake_transcribe)
+    server.app.state.profiler = Profiler(tmp_path, min_interval=0)
+    request = {"files": {"file": ("sample.wav", b"audio", "audio/wav")}}
+    try:
+        with TestClient(server.app) as client:
+            plain = client.post("/v1/audio/transcriptions", **request)
+            profiled = client.post(
+                "/v1/audio/transcriptions", headers={"X-Paratran-Profile": "1"}, **request
+            )
+    finally:
+        del server.app.state.profiler
+
+    assert "x-paratran-profile" not in plain.headers
+    profile_id = profiled.headers["x-paratran-profile"]
+    assert profiled.json() == {"text": "ok"}
+    summary = json.loads((tmp_path / f"{profile_id}.json").read_text())
+    assert summary["label"] == "POST /v1/audio/transcriptions"
+    assert (tmp_path / f"{profile_id}.folded").exists()
@@ -0,0 +1,25 @@
+from pathlib import Path
+
+from paratran.contracts import TranscriptionOptions, TranscriptionResult
+from paratran.result_cache import ResultCache
+
+
+def result(text: str) -> TranscriptionResult:
+    return TranscriptionResult(text=text, duration=1.0, processing_time=0.1, sentences=())
+
+
+def test_caches_sharing_a_directory_answer_from_each_others_results(tmp_path: Path):
+    # Two caches on one directory stand in for two HTTP worker processes.
+    first, second = ResultCache(2, tmp_path), ResultCache(2, tmp_path)
+    options = TranscriptionOptions()
+
+    first.put(("a" * 64, "model", options), result("one"))
+    shared = second.get(("a" * 64, "model", options))
+    other_model = second.get(("a" * 64, "other", options))
+    first.put(("b" * 64, "model", options), result("two"))
+    first.put(("c" * 64, "model", options), result("three"))
+
+    assert shared == result("one")
+    assert other_model is None
+    assert second.stats()["hits"] == second.stats()["misses"] == 1
+    assert len(list(tmp_path.glob("*.json"))) == 2
@@ -0,0 +1,151 @@
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+import pytest
+from fastapi.testclient import TestClient
+
+from paratran.client import BackendPool
+from paratran.router import create_router
+
+
+def _backend_handler(status: int, name: str):
+    class Handler(BaseHTTPRequestHandler):
+        requests = 0
+        body = b""
+
+        def do_GET(self):  # noqa: N802
+            self._reply(200, {"status": "ok" if status == 200 else "loading"})
+
+        def do_POST(self):  # noqa: N802
+            type(self).requests += 1
+            type(self).body = self.rfile.read(int(self.headers["Content-Length"]))
+            self._reply(status, {"text": name} if status == 200 else {"error": "busy"})
+
+        def _reply(self, code: int, payload: dict):
+            body = json.dumps(payload).encode()
+            self.send_response(code)
+            if code == 503:
+                self.send_header("Retry-After", "42")
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_args):
+            return
+
+    return Handler
+
+
+@pytest.fixture
+def backends():
+    servers = [
+        ThreadingHTTPServer(("127.0.0.1", 0), _backend_handler(503, "busy")),
+        ThreadingHTTPServer(("127.0.0.1", 0), _backend_handler(200, "good")),
+    ]
+    threads = [Thread(target=server.serve_forever, daemon=True) for server in servers]
+    for thread in threads:
+        thread.start()
+    try:
+        yield servers
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+
+def test_router_fails_over_to_a_healthy_backend(monkeypatch, backends):
+    monkeypatch.delenv("PARATRAN_API_KEY", raising=False)
+    busy, good = (f"http://127.0.0.1:{server.server_port}" for server in backends)
+    router = create_router([busy, good], health_interval=0)
+
+    with TestClient(router) as client:
+        response = client.post(
+            "/v1/audio/transcriptions",
+            files={"file": ("sample.wav", b"audio", "audio/wav")},
+            data={"response_format": "json"},
+        )
+        health = client.get("/health").json()
+
+    assert response.status_code == 200
+    assert response.json() == {"text": "good"}
+    assert response.headers["X-Paratran-Backend"] == good
+    assert backends[0].RequestHandlerClass.requests == 1
+    # Both attempts sent the whole upload, not just the first.
+    assert b"\r\n\r\naudio\r\n" in backends[1].RequestHandlerClass.body
+    assert health["healthy_backends"] == 1
+    assert [backend["healthy"] for backend in health["backends"]] == [False, True]
+
+
+def test_router_reports_unavailable_when_every_backend_fails(monkeypatch, backends):
+    monkeypatch.delenv("PARATRAN_API_KEY", raising=False)
+    busy = f"http://127.0.0.1:{backends[0].server_port}"
+    router = create_router([busy, "http://127.0.0.1:9"], health_interval=0)
+
+    with TestClient(router) as client:
+        response = client.post(
+            "/v1/audio/transcriptions", files={"file": ("sample.wav", b"audio", "audio/wav")}
+        )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_router_passes_on_retry_after_when_every_backend_sheds(monkeypatch, backends):
+    monkeypatch.delenv("PARATRAN_API_KEY", raising=False)
+    busy = f"http://127.0.0.1:{backends[0].server_port}"
+    router = create_router([busy], health_interval=0)
+
+    with TestClient(router) as client:
+        response = client.post(
+            "/v1/audio/transcriptions", files={"file": ("sample.wav", b"audio", "audio/wav")}
+        )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "42"
+
+
+def test_router_rejects_files_over_the_upload_limit(monkeypatch, backends):
+    monkeypatch.delenv("PARATRAN_API_KEY", raising=False)
+    monkeypatch.setenv("PARATRAN_MAX_UPLOAD_MB", "1")
+    good = f"http://127.0.0.1:{backends[1].server_port}"
+    router = create_router([good], health_interval=0)
+
+    with TestClient(router) as client:
+        # Just over the limit fits the form overhead, so the parsed part is checked.
+        over = client.post(
+            "/v1/audio/transcriptions",
+            files={"file": ("sample.wav", b"x" * (1024 * 1024 + 1), "audio/wav")},
+        )
+        # Without a Content-Length, a body far over the limit is refused as it arrives.
+        head = (
+            b'--cut\r\nContent-Disposition: form-data; name="file"; filename="sample.wav"'
+            b"\r\nContent-Type: audio/wav\r\n\r\n"
+        )
+        far_over = client.post(
+            "/v1/audio/transcriptions",
+            headers={"Content-Type": "multipart/form-data; boundary=cut"},
+            content=iter([head, *[b"x" * 1024 * 1024] * 3, b"\r\n--cut--\r\n"]),
+        )
+        within = client.post(
+            "/v1/audio/transcriptions",
+            files={"file": ("sample.wav", b"x" * (1024 * 1024), "audio/wav")},
+        )
+
+    assert (over.status_code, far_over.status_code) == (413, 413)
+    assert within.status_code == 200
+    assert backends[1].RequestHandlerClass.requests == 1
+
+
+def test_backend_pool_prefers_least_outstanding_audio():
+    pool = BackendPool(["http://a", "http://b"])
+
+    first = pool.acquire(600.0)
+    second = pool.acquire(5.0)
+    third = pool.acquire(5.0)
+
+    assert (first.url, second.url, third.url) == ("http://a", "http://b", "http://b")
+    pool.release(first, 600.0, ok=False)
+    assert pool.acquire(1.0).url == "http://b"
+    assert pool.acquire(1.0, {"http://b"}).url == "http://a"
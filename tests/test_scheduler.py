@@ -0,0 +1,260 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from paratran.contracts import TranscriptionProgress
+from paratran.memory import MemoryGovernor
+from paratran.scheduler import AdmissionError, JobBoard, TranscriptionScheduler
+
+
+async def run_in_order(scheduler, requests):
+    order = []
+    blocker = await scheduler.acquire("blocker", "normal", 0.0)
+
+    async def job(name, client, priority, seconds):
+        async with scheduler.slot(client, priority, seconds):
+            order.append(name)
+
+    tasks = []
+    for request in requests:
+        tasks.append(asyncio.create_task(job(*request)))
+        await asyncio.sleep(0)
+    scheduler.release(blocker)
+    await asyncio.gather(*tasks)
+    return order
+
+
+def test_priority_then_shortest_job_first():
+    scheduler = TranscriptionScheduler(1)
+    order = asyncio.run(
+        run_in_order(
+            scheduler,
+            [
+                ("three-hours", "a", "normal", 10_800.0),
+                ("clip", "b", "normal", 10.0),
+                ("urgent", "c", "high", 600.0),
+                ("batch", "d", "low", 1.0),
+            ],
+        )
+    )
+
+    assert order == ["urgent", "clip", "three-hours", "batch"]
+
+
+def test_fair_share_interleaves_clients():
+    scheduler = TranscriptionScheduler(1)
+    order = asyncio.run(
+        run_in_order(
+            scheduler,
+            [
+                ("a1", "a", "normal", 5.0),
+                ("a2", "a", "normal", 5.0),
+                ("a3", "a", "normal", 5.0),
+                ("b1", "b", "normal", 6.0),
+            ],
+        )
+    )
+
+    assert order == ["a1", "b1", "a2", "a3"]
+    assert scheduler.snapshot()["queued"] == 0
+
+
+def test_labels_share_their_clients_fair_share_and_queue_limit():
+    scheduler = TranscriptionScheduler(1, max_queue_per_client=2)
+    order = asyncio.run(
+        run_in_order(
+            scheduler,
+            [
+                ("a1", "a/one", "normal", 5.0),
+                ("a2", "a/two", "normal", 5.0),
+                ("b1", "b", "normal", 6.0),
+            ],
+        )
+    )
+
+    # A fresh label is still client "a", already served ahead of "b".
+    assert order == ["a1", "b1", "a2"]
+
+    async def queue_limit():
+        blocker = await scheduler.acquire("blocker", "normal", 0.0)
+        waiting = [scheduler.reserve(f"a/{label}") for label in ("one", "two")]
+        with pytest.raises(AdmissionError) as rotated:
+            scheduler.reserve("a/three")
+        other = scheduler.reserve("b/one")
+        for reservation in (*waiting, other):
+            scheduler.cancel_reservation(reservation)
+        scheduler.release(blocker)
+        return rotated.value
+
+    assert asyncio.run(queue_limit()).status_code == 429
+
+
+def test_full_queue_is_shed_with_retry_estimate():
+    async def scenario():
+        scheduler = TranscriptionScheduler(1, max_queue=1, max_queued_audio_seconds=100.0)
+        scheduler.observe(60.0, 30.0)
+        running = await scheduler.acquire("a", "normal", 60.0)
+        waiting = asyncio.create_task(scheduler.acquire("b", "normal", 40.0))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionError) as full:
+            scheduler.check_admission("c")
+        scheduler.max_queue = 0
+        with pytest.raises(AdmissionError) as too_much_audio:
+            await scheduler.acquire("c", "normal", 61.0)
+
+        scheduler.release(running)
+        scheduler.release(await waiting)
+        return full.value, too_much_audio.value, scheduler.snapshot()
+
+    full, too_much_audio, snapshot = asyncio.run(scenario())
+
+    assert full.status_code == 503
+    assert full.retry_after == 14  # (60 s running + 40 s queued) x smoothed RTF 0.14
+    assert too_much_audio.status_code == 503
+    assert snapshot["rejected"] == 2
+    assert snapshot["queued"] == 0
+
+
+def test_reservations_count_against_the_queue_until_acquired():
+    async def scenario():
+        scheduler = TranscriptionScheduler(1, max_queue=1)
+        first = scheduler.reserve("a", 60.0)
+        second = scheduler.reserve("b", 60.0)
+        with pytest.raises(AdmissionError):
+            scheduler.reserve("c")
+        scheduler.cancel_reservation(second)
+        third = scheduler.reserve("c")
+        job = await scheduler.acquire("a", "normal", 30.0, reservation=first)
+        reserved = scheduler.snapshot()["reserved"]
+        scheduler.cancel_reservation(third)
+        scheduler.release(job)
+        return reserved, scheduler.snapshot()
+
+    reserved, snapshot = asyncio.run(scenario())
+
+    assert reserved == 1
+    assert snapshot["reserved"] == snapshot["running"] == 0
+
+
+def test_job_status_reports_queue_position_and_progress():
+    scheduler = TranscriptionScheduler(1)
+
+    async def run():
+        running = await scheduler.acquire("a", "normal", 60.0, "first")
+        waiting = asyncio.create_task(scheduler.acquire("b", "normal", 30.0, "second"))
+        await asyncio.sleep(0)
+        running.progress = TranscriptionProgress(1, 2, 30.0, 60.0, 3.0)
+        statuses = scheduler.job_status("first"), scheduler.job_status("second")
+        scheduler.release(running)
+        scheduler.release(await waiting)
+        return statuses
+
+    running, queued = asyncio.run(run())
+
+    assert running["state"] == "running"
+    assert running["progress"]["eta_seconds"] == 3.0
+    assert queued["state"] == "queued"
+    assert queued["queue_position"] == 0
+    assert scheduler.job_status("first") is None
+
+
+def test_job_status_is_shared_between_http_workers(tmp_path: Path):
+    # Two schedulers on one board stand in for two HTTP worker processes.
+    owner = TranscriptionScheduler(1, board=JobBoard(tmp_path))
+    other = TranscriptionScheduler(1, board=JobBoard(tmp_path))
+
+    async def run():
+        running = await owner.acquire("a", "normal", 60.0, "first")
+        waiting = asyncio.create_task(owner.acquire("b", "normal", 30.0, "second"))
+        await asyncio.sleep(0)
+        owner.report_progress(running, TranscriptionProgress(1, 2, 30.0, 60.0, 3.0))
+        statuses = other.job_status("first"), other.job_status("second")
+        owner.release(running)
+        owner.release(await waiting)
+        return statuses
+
+    running, queued = asyncio.run(run())
+
+    assert running["state"] == "running"
+    assert running["progress"]["eta_seconds"] == 3.0
+    assert queued["state"] == "queued" and queued["queue_position"] == 0
+    assert other.job_status("first") is None and other.job_status("second") is None
+    assert other.job_status("../first") is None
+
+
+def test_queue_limits_are_split_between_http_workers(monkeypatch):
+    monkeypatch.setenv("PARATRAN_MAX_QUEUE", "10")
+    monkeypatch.setenv("PARATRAN_MAX_QUEUED_AUDIO_SECONDS", "3600")
+    monkeypatch.setenv("PARATRAN_HTTP_WORKERS", "4")
+
+    scheduler = TranscriptionScheduler.from_environment()
+
+    assert scheduler.max_queue == 3
+    assert scheduler.max_queued_audio_seconds == 900.0
+
+
+def test_concurrency_and_memory_hold_across_http_workers(monkeypatch, tmp_path: Path):
+    monkeypatch.setenv("PARATRAN_HTTP_WORKERS", "2")
+    monkeypatch.setenv("PARATRAN_MAX_CONCURRENCY", "2")
+    monkeypatch.setenv("PARATRAN_MEMORY_BUDGET_MB", "1")
+    monkeypatch.setenv("PARATRAN_SLOT_DIR", str(tmp_path))
+    # Two schedulers from one environment stand in for two HTTP worker processes.
+    first = TranscriptionScheduler.from_environment()
+    second = TranscriptionScheduler.from_environment()
+    megabyte = 1024 * 1024
+
+    async def admitted(scheduler, memory_bytes):
+        task = asyncio.create_task(
+            scheduler.acquire("a", "normal", 10.0, memory_bytes=memory_bytes)
+        )
+        await asyncio.sleep(0.2)
+        return task
+
+    async def scenario():
+        running = [
+            await first.acquire("a", "normal", 10.0),
+            await second.acquire("a", "normal", 10.0),
+        ]
+        # Both slots are taken, one by each worker; a third job waits in either.
+        waiting = await admitted(first, 0)
+        full = waiting.done()
+        first.release(running[0])
+        started = await asyncio.wait_for(waiting, 1)
+        second.release(running[1])
+        first.release(started)
+
+        # Memory held by one worker's job counts against the other's.
+        large = await first.acquire("a", "normal", 10.0, memory_bytes=megabyte * 3 // 4)
+        over_budget = await admitted(second, megabyte // 2)
+        held = over_budget.done(), second.snapshot()["memory"]["reserved_bytes"]
+        first.release(large)
+        second.release(await asyncio.wait_for(over_budget, 1))
+        return full, held
+
+    full, held = asyncio.run(scenario())
+
+    assert not full
+    assert held == (False, 1024 * 1024 * 3 // 4)
+    assert first.snapshot()["memory"]["reserved_bytes"] == 0
+
+
+def test_memory_budget_holds_jobs_that_do_not_fit():
+    scheduler = TranscriptionScheduler(3, memory=MemoryGovernor(100, 3))
+
+    async def scenario():
+        first = await scheduler.acquire("a", "normal", 10.0, memory_bytes=60)
+        waiting = asyncio.create_task(scheduler.acquire("b", "normal", 10.0, memory_bytes=60))
+        await asyncio.sleep(0)
+        held = scheduler.snapshot()
+        scheduler.release(first)
+        second = await waiting
+        return held, second
+
+    held, second = asyncio.run(scenario())
+
+    assert (held["running"], held["queued"]) == (1, 1)
+    assert held["memory"]["reserved_bytes"] == 60
+    assert second.memory_bytes == 60
+    assert scheduler.snapshot()["memory"]["reserved_bytes"] == 60
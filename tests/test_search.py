@@ -0,0 +1,78 @@
+import json
+import time
+
+from paratran.contracts import Sentence, Token, TranscriptionResult
+from paratran.search import TranscriptIndex, sentence_words
+
+
+def result(*sentences):
+    """A transcript with one sentence per ``(start, words)``; each word lasts 0.5 s."""
+
+    return TranscriptionResult(
+        text=" ".join(" ".join(words) for _start, words in sentences),
+        duration=60.0,
+        processing_time=1.0,
+        sentences=tuple(
+            Sentence(
+                text=" ".join(words),
+                start=start,
+                end=start + 0.5 * len(words),
+                tokens=tuple(
+                    Token(f" {word}", start + 0.5 * i, start + 0.5 * (i + 1))
+                    for i, word in enumerate(words)
+                ),
+            )
+            for start, words in sentences
+        ),
+    )
+
+
+def write(path, transcript):
+    path.write_text(json.dumps(transcript.to_dict()))
+    return path
+
+
+def test_subword_tokens_are_timed_as_whole_words():
+    sentence = Sentence(
+        "Hello, world.",
+        1.0,
+        2.0,
+        (Token(" Hel", 1.0, 1.2), Token("lo,", 1.2, 1.4), Token(" world.", 1.5, 2.0)),
+    )
+
+    assert sentence_words(sentence) == [("hello", 1.0, 1.4), ("world", 1.5, 2.0)]
+
+
+def test_phrase_search_returns_file_and_seconds(tmp_path):
+    first = write(tmp_path / "first.json", result((0.0, ["good", "morning"])))
+    write(tmp_path / "second.json", result((10.0, ["we", "said", "Good", "Morning!"])))
+
+    with TranscriptIndex(tmp_path / "index.db") as index:
+        index.update([tmp_path])
+        hits = index.search("good morning")
+        assert {(hit.path, hit.start, hit.end) for hit in hits} == {
+            (str(first), 0.0, 1.0),
+            (str(tmp_path / "second.json"), 11.0, 12.0),
+        }
+        assert index.search("morning good") == []
+
+
+def test_update_reads_only_changed_files_and_drops_deleted_ones(tmp_path):
+    outputs = tmp_path / "outputs"
+    outputs.mkdir()
+    kept = write(outputs / "kept.json", result((0.0, ["alpha"])))
+    gone = write(outputs / "gone.json", result((0.0, ["beta"])))
+    (outputs / "notes.json").write_text('{"not": "a transcript"}')
+
+    with TranscriptIndex(tmp_path / "index.db") as index:
+        first = index.update([outputs])
+        assert (first.indexed, first.skipped) == (2, 1)
+
+        gone.unlink()
+        time.sleep(0.01)
+        write(kept, result((0.0, ["gamma"])))
+        second = index.update([outputs])
+
+        assert (second.indexed, second.removed) == (1, 1)
+        assert index.search("beta") == index.search("alpha") == []
+        assert [hit.text for hit in index.search("gamma")] == ["gamma"]
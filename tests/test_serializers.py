@@ -7,6 +7,7 @@ from paratran.serializers import (
     format_timestamp,
     from_openai_verbose_json,
     render_cli,
+    to_mcp_output,
     to_openai_response,
     to_srt,
     to_vtt,
@@ -71,3 +72,29 @@ def test_write_outputs_uses_one_canonical_renderer(tmp_path):
 def test_invalid_output_format_fails_before_writing(tmp_path):
     with pytest.raises(ValueError, match="Invalid output format"):
         render_cli(sample_result(), "bogus")
+
+
+def test_mcp_output_modes_are_compact_and_tokens_are_paged():
+    result = sample_result()
+
+    sentences = json.loads(to_mcp_output(result, "sentences"))
+    first = json.loads(to_mcp_output(result, "tokens", token_limit=1))
+    second = json.loads(to_mcp_output(result, "tokens", token_offset=first["next_offset"]))
+
+    assert to_mcp_output(result, "text") == "Hello world."
+    assert sentences["sentences"] == [{"start": 0.25, "end": 1.5, "text": "Hello world."}]
+    assert first["total_tokens"] == 2
+    assert first["tokens"] == [
+        {
+            "sentence": 0,
+            "text": "Hello",
+            "start": 0.25,
+            "end": 0.75,
+            "duration": 0.5,
+            "confidence": 0.9,
+        }
+    ]
+    assert second["tokens"][0]["text"] == " world."
+    assert second["next_offset"] is None
+    with pytest.raises(ValueError, match="Invalid output mode"):
+        to_mcp_output(result, "xml")
@@ -1,9 +1,15 @@
+import asyncio
+import hashlib
+import os
+import time
 from pathlib import Path
+from types import SimpleNamespace
 
 from fastapi.testclient import TestClient
 
 import paratran.server as server
-from paratran.contracts import TranscriptionResult
+from paratran.contracts import TranscriptionCancelled, TranscriptionProgress, TranscriptionResult
+from paratran.scheduler import AdmissionError
 
 
 def fake_result() -> TranscriptionResult:
@@ -25,7 +31,7 @@ def run_client(monkeypatch, fake_transcribe):
 def test_transcription_route_uses_shared_defaults_and_response_contract(monkeypatch):
     calls = []
 
-    def fake_transcribe(path: str, options):
+    def fake_transcribe(path: str, options, _is_cancelled=None, _progress=None):
         calls.append((Path(path).exists(), options))
         return fake_result()
 
@@ -68,6 +74,41 @@ def test_api_key_is_required_when_configured(monkeypatch):
     assert response.status_code == 200
 
 
+def test_api_keys_decide_the_client_and_who_may_ask_for_high_priority(monkeypatch):
+    clients = []
+
+    def fake_transcribe(*_args):
+        clients.append(server._scheduler().running[0].client)
+        return fake_result()
+
+    request = {"files": {"file": ("sample.wav", b"audio", "audio/wav")}}
+    with run_client(monkeypatch, fake_transcribe) as client:
+        anonymous_high = client.post(
+            "/v1/audio/transcriptions", data={"priority": "high"}, **request
+        )
+        monkeypatch.setenv("PARATRAN_API_KEYS", "alice=key-a, bob=key-b")
+        for key, label in (("key-a", "bob"), ("key-b", None)):
+            headers = {"Authorization": f"Bearer {key}"}
+            if label:
+                headers["X-Paratran-Client"] = label
+            # Distinct audio, so the second request is not a cache hit.
+            response = client.post(
+                "/v1/audio/transcriptions",
+                headers=headers,
+                data={"priority": "high"},
+                files={"file": ("sample.wav", key.encode(), "audio/wav")},
+            )
+            assert response.status_code == 200
+        unknown = client.post(
+            "/v1/audio/transcriptions", headers={"Authorization": "Bearer key-c"}, **request
+        )
+
+    assert anonymous_high.status_code == 403
+    # The header only labels jobs within the key's client; it cannot claim another.
+    assert clients == ["alice/bob", "bob"]
+    assert unknown.status_code == 401
+
+
 def test_upload_limit_is_enforced(monkeypatch):
     monkeypatch.setenv("PARATRAN_MAX_UPLOAD_MB", "1")
     with run_client(monkeypatch, lambda *_args: fake_result()) as client:
@@ -77,3 +118,272 @@ def test_upload_limit_is_enforced(monkeypatch):
         )
 
     assert response.status_code == 413
+
+
+def test_lookup_returns_cached_result_only_after_upload(monkeypatch):
+    calls = []
+
+    def fake_transcribe(path: str, options, _is_cancelled=None, _progress=None):
+        calls.append(path)
+        return fake_result()
+
+    audio = b"audio"
+    lookup = {
+        "sha256": hashlib.sha256(audio).hexdigest(),
+        "response_format": "verbose_json",
+    }
+    with run_client(monkeypatch, fake_transcribe) as client:
+        assert client.post("/v1/audio/lookup", data=lookup).status_code == 404
+        for _ in range(2):
+            upload = client.post(
+                "/v1/audio/transcriptions",
+                files={"file": ("sample.wav", audio, "audio/wav")},
+            )
+            assert upload.status_code == 200
+        hit = client.post("/v1/audio/lookup", data=lookup)
+        other_options = client.post("/v1/audio/lookup", data={**lookup, "decoding": "beam"})
+
+    assert len(calls) == 1
+    assert upload.headers["X-Paratran-Cache"] == "hit"
+    assert hit.status_code == 200
+    assert hit.json()["text"] == "ok"
+    assert other_options.status_code == 404
+
+
+def test_resumable_upload_enforces_offsets_and_limits(monkeypatch):
+    monkeypatch.setenv("PARATRAN_MAX_UPLOAD_MB", "1")
+    with run_client(monkeypatch, lambda *_args: fake_result()) as client:
+        too_large = client.post(
+            "/v1/uploads", data={"filename": "big.wav", "length": str(1024 * 1024 + 1)}
+        )
+        created = client.post("/v1/uploads", data={"filename": "sample.wav", "length": "10"})
+        location = created.headers["Location"]
+        stale = client.patch(location, content=b"abc", headers={"Upload-Offset": "3"})
+        partial = client.patch(location, content=b"abc", headers={"Upload-Offset": "0"})
+        early = client.post(f"{location}/transcriptions")
+        client.patch(location, content=b"defghij", headers={"Upload-Offset": "3"})
+        finished = client.post(f"{location}/transcriptions")
+        consumed = client.head(location)
+
+    assert too_large.status_code == 413
+    assert created.status_code == 201
+    assert stale.status_code == 409
+    assert partial.headers["Upload-Offset"] == "3"
+    assert early.status_code == 409
+    assert finished.json() == {"text": "ok"}
+    assert consumed.status_code == 404
+
+
+def test_upload_sessions_are_capped_and_expire(monkeypatch):
+    monkeypatch.setenv("PARATRAN_MAX_UPLOADS", "2")
+    monkeypatch.setenv("PARATRAN_UPLOAD_QUOTA_MB", "1")
+    with run_client(monkeypatch, lambda *_args: fake_result()) as client:
+        store = server.app.state.upload_store
+        first = client.post("/v1/uploads", data={"filename": "a.wav", "length": "600000"})
+        over_quota = client.post("/v1/uploads", data={"filename": "b.wav", "length": "600000"})
+        client.post("/v1/uploads", data={"filename": "c.wav", "length": "10"})
+        too_many = client.post("/v1/uploads", data={"filename": "d.wav", "length": "10"})
+        stale = time.time() - 7200
+        for path in store.directory.iterdir():
+            os.utime(path, (stale, stale))
+        expired = client.head(first.headers["Location"])
+        leftover = list(store.directory.iterdir())
+
+    assert over_quota.status_code == 413
+    assert too_many.status_code == 429
+    assert expired.status_code == 404
+    assert len(store) == 0 and leftover == []
+
+
+def test_overloaded_server_sheds_before_reading_the_body(monkeypatch):
+    calls = []
+
+    class FullScheduler:
+        def reserve(self, _client, _audio_seconds=0.0):
+            raise AdmissionError(503, "Transcription queue is full", 42)
+
+    with run_client(monkeypatch, lambda *args: calls.append(args)) as client:
+        monkeypatch.setattr(server, "_scheduler", lambda: FullScheduler())
+        response = client.post(
+            "/v1/audio/transcriptions",
+            files={"file": ("sample.wav", b"audio", "audio/wav")},
+        )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "42"
+    assert calls == []
+
+
+def test_uploads_in_progress_hold_their_queue_place(monkeypatch):
+    seen = []
+
+    def fake_transcribe(*_args):
+        seen.append(server._scheduler().snapshot()["reserved"])
+        return fake_result()
+
+    try:
+        with run_client(monkeypatch, fake_transcribe) as client:
+            scheduler = server.TranscriptionScheduler(1, max_queue=1)
+            server.app.state.scheduler = scheduler
+            running = scheduler.reserve("other", 60.0)
+            waiting = scheduler.reserve("other", 60.0)
+            shed = client.post(
+                "/v1/audio/transcriptions",
+                files={"file": ("sample.wav", b"audio", "audio/wav")},
+            )
+            scheduler.cancel_reservation(running)
+            scheduler.cancel_reservation(waiting)
+            accepted = client.post(
+                "/v1/audio/transcriptions",
+                files={"file": ("sample.wav", b"audio", "audio/wav")},
+            )
+            reserved_after = scheduler.snapshot()["reserved"]
+    finally:
+        del server.app.state.scheduler
+
+    assert shed.status_code == 503
+    assert accepted.status_code == 200
+    # The request's own reservation became its job before inference started.
+    assert seen == [0]
+    assert reserved_after == 0
+
+
+def test_unauthenticated_requests_take_no_queue_place(monkeypatch):
+    monkeypatch.setenv("PARATRAN_API_KEY", "secret")
+    try:
+        with run_client(monkeypatch, lambda *_args: fake_result()) as client:
+            scheduler = server.TranscriptionScheduler(1, max_queue=2)
+            server.app.state.scheduler = scheduler
+            held = [scheduler.reserve("other", 60.0), scheduler.reserve("other", 60.0)]
+            reserved = []
+            original_reserve = scheduler.reserve
+
+            def reserve(*args):
+                reserved.append(original_reserve(*args))
+                return reserved[-1]
+
+            monkeypatch.setattr(scheduler, "reserve", reserve)
+            before = (scheduler.queued, scheduler.snapshot()["reserved"])
+            response = client.post(
+                "/v1/audio/transcriptions",
+                headers={"Authorization": "Bearer wrong"},
+                files={"file": ("sample.wav", b"audio", "audio/wav")},
+            )
+            after = (scheduler.queued, scheduler.snapshot()["reserved"])
+            for reservation in held:
+                scheduler.cancel_reservation(reservation)
+    finally:
+        del server.app.state.scheduler
+
+    # Refused before admission: no queue place taken and no queue state returned.
+    assert response.status_code == 401
+    assert "Retry-After" not in response.headers
+    assert reserved == []
+    assert before == after == ([], 2)
+
+
+def test_disconnected_client_stops_inference_and_frees_the_slot(monkeypatch, tmp_path: Path):
+    audio = tmp_path / "sample.wav"
+    audio.write_bytes(b"audio")
+    monkeypatch.setattr(server, "_DISCONNECT_POLL_SECONDS", 0.01)
+    monkeypatch.setattr(server, "probe_audio_seconds", lambda _path: 60.0)
+    server.app.state.scheduler = server.TranscriptionScheduler(1)
+
+    def fake_transcribe(_path, _options, is_cancelled, _progress):
+        while not is_cancelled():
+            time.sleep(0.01)
+        raise TranscriptionCancelled("cancelled")
+
+    class DisconnectingRequest:
+        def __init__(self):
+            self.deadline = time.monotonic() + 0.1
+            self.state = SimpleNamespace()
+
+        async def is_disconnected(self):
+            return time.monotonic() > self.deadline
+
+    monkeypatch.setattr(server, "_transcribe_file", fake_transcribe)
+
+    async def run():
+        return await asyncio.gather(
+            server._transcribe_stored(
+                DisconnectingRequest(),
+                audio,
+                "a" * 64,
+                server.TranscriptionOptions(),
+                "json",
+                ("one", "normal", "one"),
+            ),
+            server._transcribe_stored(
+                DisconnectingRequest(),
+                audio,
+                "b" * 64,
+                server.TranscriptionOptions(),
+                "json",
+                ("two", "normal", "two"),
+            ),
+        )
+
+    try:
+        responses = asyncio.run(run())
+        snapshot = server.app.state.scheduler.snapshot()
+    finally:
+        del server.app.state.scheduler
+
+    assert [response.status_code for response in responses] == [499, 499]
+    assert snapshot["running"] == snapshot["queued"] == 0
+    assert snapshot["cancelled"] == 2
+
+
+def test_job_status_tracks_progress_of_a_running_transcription(monkeypatch):
+    seen = []
+
+    def fake_transcribe(_path, _options, _is_cancelled, progress):
+        progress(TranscriptionProgress(1, 4, 30.0, 120.0, 1.5))
+        seen.append(server._scheduler().job_status("job-1"))
+        return fake_result()
+
+    with run_client(monkeypatch, fake_transcribe) as client:
+        response = client.post(
+            "/v1/audio/transcriptions",
+            files={"file": ("sample.wav", b"audio", "audio/wav")},
+            headers={"X-Paratran-Job-Id": "job-1"},
+        )
+        finished = client.get("/v1/jobs/job-1")
+        invalid = client.post(
+            "/v1/audio/transcriptions",
+            files={"file": ("sample.wav", b"audio", "audio/wav")},
+            headers={"X-Paratran-Job-Id": "no spaces"},
+        )
+
+    assert response.headers["X-Paratran-Job-Id"] == "job-1"
+    assert seen[0]["state"] == "running"
+    assert seen[0]["progress"]["chunks_done"] == 1
+    assert seen[0]["progress"]["eta_seconds"] == 4.5
+    assert finished.status_code == 404
+    assert invalid.status_code == 422
+
+
+def test_raw_pcm_parts_are_stored_as_wav(monkeypatch):
+    from paratran.pcm import read_wav_format
+
+    formats = []
+
+    def fake_transcribe(path: str, _options, _is_cancelled=None, _progress=None):
+        formats.append(read_wav_format(Path(path)))
+        return fake_result()
+
+    with run_client(monkeypatch, fake_transcribe) as client:
+        response = client.post(
+            "/v1/audio/transcriptions",
+            files={"file": ("pcm", bytes(6400), "audio/L16; rate=16000; channels=1")},
+        )
+        rejected = client.post(
+            "/v1/audio/transcriptions",
+            files={"file": ("pcm", bytes(6400), "audio/L16")},
+        )
+
+    assert response.status_code == 200
+    stored = formats[0]
+    assert (stored.encoding, stored.sample_rate, stored.duration) == ("s16", 16_000, 0.2)
+    assert rejected.status_code == 400
@@ -0,0 +1,116 @@
+import json
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+import paratran.server as server
+from paratran import tracing
+from paratran.contracts import TranscriptionOptions, TranscriptionResult
+from paratran.pipeline import TranscriptionPipeline
+
+PARENT = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+
+@pytest.fixture
+def spans():
+    finished: list[tracing.Span] = []
+    tracing.configure(finished.append)
+    yield finished
+    tracing.configure(None)
+
+
+def test_disabled_tracing_hands_out_one_falsy_noop_span():
+    tracing.configure(None)
+
+    with tracing.span("decode_audio", path="a.wav") as span:
+        span.set(audio_seconds=1.0)
+
+    assert not span
+    assert span is tracing.span("other")
+    assert not tracing.current()
+    assert tracing.traceparent() is None
+
+
+def test_nested_spans_form_one_trace_and_record_errors(spans):
+    with pytest.raises(ValueError):
+        with tracing.span("outer") as outer:
+            with tracing.span("inner", chunks=3):
+                raise ValueError("bad audio")
+
+    inner, recorded = spans
+    assert recorded is outer
+    assert inner.trace_id == outer.trace_id and inner.parent_id == outer.span_id
+    assert inner.attributes == {"chunks": 3}
+    assert inner.to_dict()["status"] == {"code": "ERROR", "message": "ValueError: bad audio"}
+    assert outer.end_ns >= inner.end_ns >= inner.start_ns >= outer.start_ns
+
+
+def test_traceparent_continues_a_remote_trace(spans):
+    with tracing.continue_trace(PARENT), tracing.span("worker.transcribe") as span:
+        assert tracing.traceparent() == span.traceparent
+
+    assert span.trace_id == "0af7651916cd43dd8448eb211c80319c"
+    assert span.parent_id == "b7ad6b7169203331"
+
+
+def test_file_exporter_is_configured_from_the_environment(monkeypatch, tmp_path: Path):
+    path = tmp_path / "spans.jsonl"
+    monkeypatch.setenv(tracing.TRACE_ENV, f"file:{path}")
+    tracing.configure(tracing.exporter_from_environment())
+    try:
+        with tracing.span("get_model", model="test"):
+            pass
+    finally:
+        tracing.configure(None)
+
+    (line,) = path.read_text().splitlines()
+    assert json.loads(line)["attributes"] == {"model": "test"}
+    monkeypatch.setenv(tracing.TRACE_ENV, "jaeger")
+    with pytest.raises(ValueError, match="PARATRAN_TRACE"):
+        tracing.exporter_from_environment()
+
+
+def test_pipeline_stages_join_the_submitters_trace(spans):
+    def decode(path, _options):
+        with tracing.span("decode_audio"):
+            return path
+
+    def infer(_audio, _options, _is_cancelled, _progress):
+        with tracing.span("inference"):
+            return TranscriptionResult("ok", 1.0, 0.1)
+
+    with TranscriptionPipeline(decode=decode, infer=infer) as pipeline:
+        with tracing.span("request") as request:
+            pipeline.transcribe("a.wav", TranscriptionOptions())
+
+    stages = [span for span in spans if span is not request]
+    assert {span.name for span in stages} == {"decode_audio", "inference"}
+    assert all(span.parent_id == request.span_id for span in stages)
+
+
+def test_server_request_spans_cover_upload_queue_and_serialization(monkeypatch, spans):
+    def fake_transcribe(_path, _options, _is_cancelled=None, _progress=None):
+        with tracing.span("transcribe_file"):
+            return TranscriptionResult("ok", 2.0, 0.1)
+
+    monkeypatch.setattr(server, "_load_model", lambda: None)
+    monkeypatch.setattr(server, "_model_status", lambda: {"model": "test", "model_dir": None})
+    monkeypatch.setattr(server, "_transcribe_file", fake_transcribe)
+    monkeypatch.setattr(server, "probe_audio_seconds", lambda _path: 2.0)
+    with TestClient(server.app) as client:
+        response = client.post(
+            "/v1/audio/transcriptions",
+            files={"file": ("sample.wav", b"audio", "audio/wav")},
+            headers={"traceparent": PARENT},
+        )
+
+    assert response.status_code == 200
+    by_name = {span.name: span for span in spans}
+    request = by_name["HTTP POST"]
+    assert request.parent_id == "b7ad6b7169203331"
+    assert request.attributes["http.status_code"] == 200
+    assert request.attributes["cache"] == "miss"
+    assert by_name["upload"].attributes == {"raw": False, "bytes": 5}
+    for name in ("upload", "queue", "transcribe_file", "serialize"):
+        assert by_name[name].parent_id == request.span_id
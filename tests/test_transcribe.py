@@ -3,6 +3,7 @@ from pathlib import Path
 import pytest
 
 import paratran.transcribe as transcribe
+from paratran.contracts import TranscriptionOptions
 
 
 def test_audio_duration_falls_back_without_ffprobe(monkeypatch, tmp_path: Path):
@@ -16,3 +17,37 @@ def test_audio_duration_falls_back_without_ffprobe(monkeypatch, tmp_path: Path):
 def test_directory_is_not_accepted_as_audio(tmp_path: Path):
     with pytest.raises(FileNotFoundError):
         transcribe.transcribe_file(str(tmp_path / "sample.wav"))
+
+
+def test_cancellation_token_stops_before_inference(monkeypatch, tmp_path: Path):
+    audio = tmp_path / "sample.wav"
+    audio.write_bytes(b"audio")
+    monkeypatch.setattr(transcribe, "get_model", lambda *_args: object())
+
+    with pytest.raises(transcribe.TranscriptionCancelled):
+        transcribe.transcribe_file(str(audio), is_cancelled=lambda: True)
+
+
+def test_chunk_monitor_reports_progress_before_each_chunk(tmp_path: Path):
+    updates = []
+    monitor = transcribe._ChunkMonitor(
+        tmp_path / "sample.wav",
+        TranscriptionOptions(chunk_duration=120.0, overlap_duration=15.0),
+        1,
+        None,
+        updates.append,
+    )
+
+    for end in (120, 225, 300):
+        monitor(end, 300)
+    monitor.finish(300.0)
+
+    assert [(update.chunks_done, update.audio_seconds) for update in updates] == [
+        (0, 0.0),
+        (1, 120.0),
+        (2, 225.0),
+        (3, 300.0),
+    ]
+    assert {update.chunks_total for update in updates} == {3}
+    assert updates[0].eta_seconds is None
+    assert updates[-1].fraction == 1.0
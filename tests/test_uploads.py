@@ -0,0 +1,70 @@
+import asyncio
+import hashlib
+from pathlib import Path
+
+import pytest
+
+from paratran.uploads import UploadError, UploadStore
+
+
+async def body(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+def test_workers_sharing_a_directory_see_the_same_sessions(tmp_path: Path):
+    # Two stores on one directory stand in for two HTTP worker processes.
+    first, second = UploadStore(tmp_path), UploadStore(tmp_path)
+
+    async def scenario():
+        session = first.create(6, ".wav")
+        await first.append(first.get(session.upload_id), 0, body(b"abc"))
+        resumed = second.get(session.upload_id)
+        await second.append(resumed, resumed.offset, body(b"def"))
+        taken = first.take(session.upload_id)
+        with pytest.raises(UploadError) as again:
+            second.take(session.upload_id)
+        return taken, await first.sha256(taken), again.value
+
+    taken, sha256, again = asyncio.run(scenario())
+
+    assert taken.path.read_bytes() == b"abcdef"
+    assert sha256 == hashlib.sha256(b"abcdef").hexdigest()
+    assert again.status_code == 404
+
+
+def test_appends_are_exclusive_across_stores(tmp_path: Path):
+    first, second = UploadStore(tmp_path), UploadStore(tmp_path)
+    session = first.create(6, ".wav")
+
+    async def scenario():
+        appending = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_body():
+            yield b"abc"
+            appending.set()
+            await release.wait()
+
+        task = asyncio.create_task(first.append(first.get(session.upload_id), 0, slow_body()))
+        await appending.wait()
+        with pytest.raises(UploadError) as busy:
+            await second.append(second.get(session.upload_id), 0, body(b"xyz"))
+        with pytest.raises(UploadError) as finalizing:
+            second.take(session.upload_id)
+        release.set()
+        return busy.value, finalizing.value, await task
+
+    busy, finalizing, offset = asyncio.run(scenario())
+
+    assert busy.status_code == finalizing.status_code == 409
+    assert offset == 3
+
+
+def test_unknown_or_malformed_upload_ids_are_not_found(tmp_path: Path):
+    store = UploadStore(tmp_path)
+
+    for upload_id in ("0" * 32, "../etc/passwd"):
+        with pytest.raises(UploadError) as missing:
+            store.get(upload_id)
+        assert missing.value.status_code == 404
@@ -0,0 +1,89 @@
+import threading
+import time
+from threading import Thread
+
+import pytest
+
+import paratran.workers as workers
+from paratran.contracts import (
+    Sentence,
+    Token,
+    TranscriptionCancelled,
+    TranscriptionOptions,
+    TranscriptionProgress,
+    TranscriptionResult,
+)
+
+
+@pytest.fixture
+def inference_server(tmp_path, monkeypatch):
+    def fake_transcribe(path: str, options: TranscriptionOptions, is_cancelled=None, progress=None):
+        if path.endswith("broken.wav"):
+            raise ValueError("Failed to load audio")
+        if progress is not None:
+            progress(TranscriptionProgress(0, 2, 0.0, 1.0, 0.0))
+        if path.endswith("long.wav"):
+            while not is_cancelled():
+                time.sleep(0.01)
+            raise TranscriptionCancelled("cancelled")
+        return TranscriptionResult(
+            text=options.decoding,
+            duration=1.0,
+            processing_time=0.1,
+            sentences=(Sentence("hi", 0.0, 0.5, (Token("hi", 0.0, 0.5, confidence=0.9),)),),
+        )
+
+    monkeypatch.setattr(workers, "_transcribe", fake_transcribe)
+    server = workers.InferenceServer(str(tmp_path / "inference.sock"), b"key")
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.close()
+        thread.join(timeout=2)
+
+
+def test_pool_round_trips_jobs_and_results(inference_server):
+    pool = workers.InferencePool([inference_server.address], b"key")
+
+    result = pool.transcribe("/audio/sample.wav", TranscriptionOptions(decoding="beam"))
+
+    assert result.text == "beam"
+    assert result.sentences[0].tokens[0].confidence == 0.9
+
+
+def test_pool_relays_progress_from_the_worker(inference_server):
+    pool = workers.InferencePool([inference_server.address], b"key")
+    updates = []
+
+    pool.transcribe("/audio/sample.wav", TranscriptionOptions(), progress=updates.append)
+
+    assert updates == [TranscriptionProgress(0, 2, 0.0, 1.0, 0.0)]
+
+
+def test_pool_reraises_worker_failures(inference_server):
+    pool = workers.InferencePool([inference_server.address], b"key")
+
+    with pytest.raises(ValueError, match="Failed to load audio"):
+        pool.transcribe("/audio/broken.wav", TranscriptionOptions())
+
+
+def test_pool_cancels_running_inference(inference_server):
+    pool = workers.InferencePool([inference_server.address], b"key")
+    cancel = threading.Event()
+    threading.Timer(0.1, cancel.set).start()
+
+    with pytest.raises(TranscriptionCancelled):
+        pool.transcribe("/audio/long.wav", TranscriptionOptions(), cancel.is_set)
+
+
+def test_idle_server_closes_itself(tmp_path):
+    server = workers.InferenceServer(str(tmp_path / "idle.sock"), b"key", idle_timeout=0.2)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    workers.request(server.address, b"key", {"op": "ping"})
+    thread.join(timeout=3)
+
+    assert not thread.is_alive()